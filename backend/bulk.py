@@ -0,0 +1,171 @@
+"""Bulk ingestion for posts, comments and contacts.
+
+Bodies are either a JSON array or an NDJSON stream (``application/x-ndjson``).
+NDJSON is parsed as it arrives, so memory stays bounded by the chunk size.
+A JSON array has to be read whole before it can be parsed, so its body is
+capped at ``max_bytes`` and larger imports are pointed at NDJSON.
+Items are validated one by one with the route's Pydantic model, written with
+unordered ``insert_many`` in chunks, and every rejected item is reported by its
+position in the input.
+"""
+import json
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import Request
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+
+# Each entry is (input index, item)
+Chunk = List[Tuple[int, dict]]
+
+
+class BulkPayloadError(ValueError):
+    pass
+
+
+class BulkResult:
+    def __init__(self):
+        self.ids: List[str] = []
+        self.errors: List[dict] = []
+
+    def reject(self, index: int, error):
+        self.errors.append({"index": index, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "inserted": len(self.ids),
+            "failed": len(self.errors),
+            "ids": self.ids,
+            "errors": sorted(self.errors, key=lambda e: e["index"]),
+        }
+
+
+async def iter_items(request: Request, max_items: int,
+                     max_bytes: int) -> AsyncIterator[Tuple[int, object, Optional[str]]]:
+    """Yield (index, raw item, parse error) from a JSON array or NDJSON body"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    index = 0
+    if content_type in NDJSON_TYPES:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield (index,) + _parse_line(line, index, max_items)
+                    index += 1
+        if buffer.strip():
+            yield (index,) + _parse_line(buffer, index, max_items)
+        return
+
+    body = await _read_body(request, max_bytes)
+    try:
+        items = json.loads(body)
+    except ValueError:
+        raise BulkPayloadError("Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise BulkPayloadError("Body must be a JSON array or NDJSON")
+    if len(items) > max_items:
+        raise BulkPayloadError(f"At most {max_items} items per request")
+    for index, item in enumerate(items):
+        yield index, item, None
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """Whole body of a JSON array upload, refused as soon as it is known to exceed ``max_bytes``"""
+    too_large = BulkPayloadError(f"JSON array bodies are limited to {max_bytes} bytes; "
+                                 f"send larger imports as NDJSON (application/x-ndjson)")
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise too_large
+    # Content-Length may be absent (chunked uploads) or wrong, so count as well
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+def _parse_line(line: bytes, index: int, max_items: int) -> Tuple[object, Optional[str]]:
+    if index >= max_items:
+        # Stop reading: the rest of an oversized upload is never buffered or parsed
+        raise BulkPayloadError(f"At most {max_items} items per request")
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {str(e)}"
+
+
+def validation_errors(error: ValidationError) -> List[dict]:
+    return [{"loc": list(err["loc"]), "msg": err["msg"]} for err in error.errors()]
+
+
+async def ingest(request: Request, model: Type[BaseModel], build: Callable[[BaseModel], dict],
+                 collection, chunk_size: int, max_items: int, max_bytes: int,
+                 check: Optional[Callable[[Chunk], Awaitable[Dict[int, str]]]] = None,
+                 on_inserted: Optional[Callable[[List[dict]], Awaitable[None]]] = None) -> BulkResult:
+    """Validate, build and insert every item; returns ids and per-item errors
+
+    ``check`` may reject items in a chunk (index -> reason) before writing, and
+    ``on_inserted`` runs after each chunk with the documents that were stored.
+    """
+    result = BulkResult()
+    chunk: Chunk = []
+
+    async def flush():
+        pending = list(chunk)
+        chunk.clear()
+        if check is not None and pending:
+            rejected = await check(pending)
+            for index, reason in rejected.items():
+                result.reject(index, reason)
+            pending = [(index, doc) for index, doc in pending if index not in rejected]
+        if not pending:
+            return
+        stored = await insert_chunk(collection, pending, result)
+        if on_inserted is not None and stored:
+            await on_inserted(stored)
+
+    try:
+        async for index, raw, parse_error in iter_items(request, max_items, max_bytes):
+            if parse_error:
+                result.reject(index, parse_error)
+                continue
+            try:
+                item = model.model_validate(raw)
+            except ValidationError as e:
+                result.reject(index, validation_errors(e))
+                continue
+            chunk.append((index, build(item)))
+            if len(chunk) >= chunk_size:
+                await flush()
+    except BulkPayloadError as e:
+        # An NDJSON stream only shows it is too long after earlier chunks were written
+        if result.ids:
+            raise BulkPayloadError(f"{e}; the {len(result.ids)} items stored before the limit are kept")
+        raise
+    await flush()
+    return result
+
+
+async def insert_chunk(collection, chunk: Chunk, result: BulkResult) -> List[dict]:
+    """Unordered insert_many; records ids and write errors, returns stored documents"""
+    docs = [doc for _, doc in chunk]
+    failed: Dict[int, str] = {}
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+    stored = []
+    for position, (index, doc) in enumerate(chunk):
+        doc.pop("_id", None)
+        if position in failed:
+            result.reject(index, failed[position])
+        else:
+            result.ids.append(doc["id"])
+            stored.append(doc)
+    return stored
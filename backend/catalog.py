@@ -0,0 +1,68 @@
+"""Static catalog for the portfolio and testimonials pages.
+
+The data lives in ``catalog.json`` and is loaded once at startup. Every
+response the two routes can produce (one per portfolio category, plus "all"
+and the testimonials list) is encoded to bytes up front, so a request is a
+dict lookup. Gzip and Brotli variants are compressed at maximum level at the
+same time, so compressed responses cost no CPU either. Call ``reload`` after
+editing the file.
+
+Every worker process holds its own copy. Under serve.py, POST
+/api/catalog/reload (or SIGHUP to the supervisor) makes every worker reload;
+without it, other workers keep the old catalog until they restart.
+"""
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from compression import precompress
+from response_cache import CachedResponse, make_etag, render_json
+
+logger = logging.getLogger(__name__)
+
+
+class Catalog:
+    def __init__(self, path: str, compress_min_size: int = 1024):
+        self.path = path
+        self.compress_min_size = compress_min_size
+        self.loaded_mtime: Optional[float] = None
+        self._projects: Dict[str, CachedResponse] = {}
+        self._no_projects = self._prebuilt({"projects": []})
+        self._testimonials = self._prebuilt({"testimonials": []})
+
+    def _prebuilt(self, content) -> CachedResponse:
+        body = render_json(content)
+        return CachedResponse(body, make_etag(body), precompress(body, self.compress_min_size))
+
+    def load(self):
+        """Read the data file and rebuild every pre-serialized response"""
+        with open(self.path) as f:
+            data = json.load(f)
+
+        projects = data.get("projects", [])
+        by_category: Dict[str, list] = {}
+        for project in projects:
+            by_category.setdefault(project["category"], []).append(project)
+
+        prebuilt = {category: self._prebuilt({"projects": items}) for category, items in by_category.items()}
+        prebuilt["all"] = self._prebuilt({"projects": projects})
+
+        # Swap in whole so concurrent readers never see a half-built catalog
+        self._projects = prebuilt
+        self._testimonials = self._prebuilt({"testimonials": data.get("testimonials", [])})
+        self.loaded_mtime = os.path.getmtime(self.path)
+        logger.info(f"Catalog loaded: {len(projects)} projects in {len(by_category)} categories")
+
+    def reload(self, force: bool = False) -> bool:
+        """Reload if the file changed since the last load; returns whether it did"""
+        if not force and os.path.getmtime(self.path) == self.loaded_mtime:
+            return False
+        self.load()
+        return True
+
+    def projects(self, category: Optional[str] = None) -> CachedResponse:
+        return self._projects.get(category or "all", self._no_projects)
+
+    def testimonials(self) -> CachedResponse:
+        return self._testimonials
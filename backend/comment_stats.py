@@ -0,0 +1,150 @@
+"""Denormalized comment totals and latest comments on blog post documents.
+
+Each post carries ``comment_count`` and ``recent_comments``, the newest
+approved comments (newest first, capped), so a post page needs one read
+instead of a post lookup, a comments query and a count. Both fields change in
+the same ``update_one`` as ``$inc`` plus a sliced ``$push``, so they never
+disagree with each other. ``CommentStatsReconciler`` periodically recomputes
+them from the comments collection to repair drift from partial failures or
+direct database edits.
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from pagination import sort_spec
+
+logger = logging.getLogger(__name__)
+
+RECENT_COMMENT_FIELDS = ["id", "post_id", "author_name", "content", "created_at", "approved", "likes"]
+
+
+def embedded_comment(comment: dict) -> dict:
+    """The copy of a comment kept on its post; never includes the email"""
+    return {field: comment.get(field) for field in RECENT_COMMENT_FIELDS}
+
+
+def _newest_first(comments: List[dict]) -> List[dict]:
+    return sorted(comments, key=lambda c: (c.get("created_at") or datetime.min, c.get("id") or ""), reverse=True)
+
+
+def comments_added_update(comments: List[dict], recent_limit: int) -> dict:
+    """Update document adding approved ``comments`` to one post"""
+    return {
+        "$inc": {"comment_count": len(comments)},
+        "$push": {"recent_comments": {
+            "$each": [embedded_comment(c) for c in _newest_first(comments)],
+            "$position": 0,
+            "$slice": recent_limit,
+        }},
+    }
+
+
+async def record_comments(posts_collection, comments: List[dict], recent_limit: int) -> int:
+    """Fold approved ``comments`` into their posts, one update per post"""
+    by_post: Dict[str, List[dict]] = defaultdict(list)
+    for comment in comments:
+        if comment.get("approved"):
+            by_post[comment["post_id"]].append(comment)
+    if not by_post:
+        return 0
+    if len(by_post) == 1:
+        post_id, added = next(iter(by_post.items()))
+        await posts_collection.update_one({"id": post_id}, comments_added_update(added, recent_limit))
+        return 1
+    await posts_collection.bulk_write(
+        [UpdateOne({"id": post_id}, comments_added_update(added, recent_limit)) for post_id, added in by_post.items()],
+        ordered=False,
+    )
+    return len(by_post)
+
+
+async def adjust_comment_counts(posts_collection, deltas: Dict[str, int],
+                                recent: Callable[[str], Awaitable[List[dict]]]) -> int:
+    """Apply per-post count changes from moderation and reload each post's latest comments
+
+    An approved old comment belongs in the middle of ``recent_comments`` and a
+    withdrawn one leaves a gap, so the list is re-read rather than pushed to.
+    """
+    operations = [
+        UpdateOne({"id": post_id},
+                  {"$inc": {"comment_count": delta}, "$set": {"recent_comments": await recent(post_id)}})
+        for post_id, delta in deltas.items()
+    ]
+    if operations:
+        await posts_collection.bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+class CommentStatsReconciler:
+    """Recomputes ``comment_count`` and ``recent_comments`` from the comments collection"""
+
+    def __init__(self, posts_collection, comments_collection, recent_limit: int = 5,
+                 interval: float = 3600.0):
+        self.posts_collection = posts_collection
+        self.comments_collection = comments_collection
+        self.recent_limit = recent_limit
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def recent(self, post_id: str) -> List[dict]:
+        cursor = self.comments_collection.find(
+            {"post_id": post_id, "approved": True}, {"_id": 0, "email": 0}
+        ).sort(sort_spec("created_at")).limit(self.recent_limit)
+        return [embedded_comment(c) async for c in cursor]
+
+    async def reconcile(self, full: bool = False) -> int:
+        """Repair posts whose stored totals differ from the comments; returns posts fixed
+
+        Only posts with a wrong count or a short ``recent_comments`` are
+        rewritten unless ``full`` is set. Each write is conditional on the
+        count read here, so a comment added meanwhile is never overwritten.
+        """
+        counts: Dict[str, int] = {}
+        async for row in self.comments_collection.aggregate([
+            {"$match": {"approved": True}},
+            {"$group": {"_id": "$post_id", "count": {"$sum": 1}}},
+        ]):
+            counts[row["_id"]] = row["count"]
+
+        operations = []
+        async for post in self.posts_collection.find({}, {"_id": 0, "id": 1, "comment_count": 1, "recent_comments": 1}):
+            actual = counts.get(post["id"], 0)
+            stored = post.get("comment_count")
+            recent = post.get("recent_comments")
+            if not full and stored == actual and recent is not None and len(recent) == min(actual, self.recent_limit):
+                continue
+            operations.append(UpdateOne(
+                {"id": post["id"], "comment_count": stored},
+                {"$set": {"comment_count": actual, "recent_comments": await self.recent(post["id"])}},
+            ))
+        if operations:
+            await self.posts_collection.bulk_write(operations, ordered=False)
+            logger.info(f"Comment stats reconciled on {len(operations)} posts")
+        return len(operations)
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        # The first pass also backfills posts created before these fields existed
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Comment stats reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.interval)
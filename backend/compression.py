@@ -0,0 +1,141 @@
+"""Content-negotiated gzip/Brotli response compression.
+
+``CompressionMiddleware`` compresses complete responses above a size
+threshold in the encoding the client prefers, Brotli first when the
+``brotli`` package is installed. Responses that already carry a
+Content-Encoding (pre-compressed catalog payloads, gzip exports) or ask for
+``Cache-Control: no-transform`` are passed through, as are streamed bodies,
+which would otherwise have to be buffered. Static payloads are compressed once
+at the highest levels with ``precompress``. The codecs are imported when the
+first body is compressed. A compressed body is a different representation, so
+its ETag gets the encoding as a suffix (``encoded_etag``).
+"""
+import importlib.util
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Whether the optional brotli package is installed, without importing it
+BROTLI_AVAILABLE = importlib.util.find_spec("brotli") is not None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "image/svg+xml")
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, most preferred first"""
+    return ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str]) -> Optional[str]:
+    """Pick the acceptable encoding with the highest q-value; ties go to the order of ``available``"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 4) -> bytes:
+    if encoding == "br":
+        import brotli
+        return brotli.compress(body, quality=brotli_quality)
+    import gzip
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+def precompress(body: bytes, minimum_size: int = 0) -> Dict[str, bytes]:
+    """Every available encoding of ``body`` at maximum compression, for payloads built once"""
+    if len(body) < minimum_size:
+        return {}
+    return {encoding: compress(body, encoding, gzip_level=9, brotli_quality=11) for encoding in available_encodings()}
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """``"abc"`` -> ``"abc-gzip"``; strong tags must differ between encodings of a body"""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+def add_vary(headers: MutableHeaders):
+    vary = headers.get("vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower():
+        headers["Vary"] = vary + ", Accept-Encoding"
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing whole responses of at least ``minimum_size`` bytes"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_wrapper(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until the first body chunk shows what we have
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._eligible(headers, body):
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            if "etag" in headers:
+                headers["ETag"] = encoded_etag(headers["etag"], encoding)
+            add_vary(headers)
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _eligible(self, headers: MutableHeaders, body: bytes) -> bool:
+        return (
+            len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and is_compressible(headers.get("content-type", ""))
+        )
@@ -0,0 +1,77 @@
+"""Cached collection totals for list endpoints.
+
+Totals are cached per collection and query shape for a short TTL. Unfiltered
+queries use ``estimated_document_count``, which reads collection metadata
+instead of scanning. Inserts bump the cached totals they affect, so a fresh
+post or comment shows up in the next listing without waiting for expiry.
+
+Filters such as tags come from the client, so each collection keeps at most
+``max_entries`` shapes, least recently used first out, and expired entries
+are dropped when they are next touched.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+
+def _shape_key(query: dict) -> str:
+    return json.dumps(query, sort_keys=True, default=str)
+
+
+def _is_equality_query(query: dict) -> bool:
+    return all(not key.startswith("$") and not isinstance(value, dict) for key, value in query.items())
+
+
+def _matches(doc_value, value) -> bool:
+    # An equality filter on an array field matches any element, as in Mongo
+    return doc_value == value or (isinstance(doc_value, list) and value in doc_value)
+
+
+class CountCache:
+    """Per-query-shape cache of ``count_documents`` results with a TTL"""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # collection name -> shape key -> (query, total, expires_at), oldest use first
+        self._entries: Dict[str, "OrderedDict[str, Tuple[dict, int, float]]"] = {}
+
+    async def count(self, collection, query: dict) -> int:
+        entries = self._entries.setdefault(collection.name, OrderedDict())
+        key = _shape_key(query)
+        cached = entries.get(key)
+        now = time.monotonic()
+        if cached is not None:
+            if cached[2] > now:
+                entries.move_to_end(key)
+                return cached[1]
+            del entries[key]
+
+        if query:
+            total = await collection.count_documents(query)
+        else:
+            total = await collection.estimated_document_count()
+        entries[key] = (query, total, now + self.ttl)
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+        return total
+
+    def record_insert(self, collection_name: str, doc: dict, count: int = 1):
+        """Increment cached totals whose query matches ``doc``; drop ones we cannot evaluate"""
+        entries = self._entries.get(collection_name)
+        if not entries:
+            return
+        now = time.monotonic()
+        for key, (query, total, expires_at) in list(entries.items()):
+            if expires_at <= now or not _is_equality_query(query):
+                del entries[key]
+            elif all(_matches(doc.get(field), value) for field, value in query.items()):
+                entries[key] = (query, total + count, expires_at)
+
+    def invalidate(self, collection_name: str):
+        self._entries.pop(collection_name, None)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,243 @@
+"""Durable outbound email queue.
+
+Messages are written to a Mongo ``email_outbox`` collection and delivered by a
+small pool of background workers. Each worker keeps its SMTP session open
+between batches, so STARTTLS and login are paid once per connection instead of
+once per message. Failed deliveries are retried with exponential backoff.
+``smtplib`` and the MIME classes are imported by the first delivery, not at
+startup, since most processes never send mail.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from pymongo import ReturnDocument
+
+from metrics import SMTP_DELIVERY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# Errors that leave the SMTP session unusable; anything else is per-message.
+# smtplib's SMTPServerDisconnected and SMTPConnectError are OSErrors too.
+CONNECTION_ERRORS = (OSError,)
+
+
+def build_message(sender: str, to_email: str, subject: str, body: str) -> str:
+    """Render a plain-text MIME message"""
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    return msg.as_string()
+
+
+class SMTPSession:
+    """A reusable SMTP connection, used from one worker at a time"""
+
+    def __init__(self, host: str, port: int, username: Optional[str] = None,
+                 password: Optional[str] = None, use_tls: bool = True, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None
+
+    def _connect(self):
+        import smtplib
+
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        self.connections_opened += 1
+
+    def send(self, sender: str, to_email: str, message: str):
+        """Send one message, opening the connection on first use"""
+        if self._smtp is None:
+            self._connect()
+        try:
+            self._smtp.sendmail(sender, to_email, message)
+        except CONNECTION_ERRORS:
+            self.close()
+            raise
+        self._last_used = time.monotonic()
+
+    def idle_for(self) -> float:
+        return time.monotonic() - self._last_used if self._smtp is not None else 0.0
+
+    def close(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+
+class EmailOutbox:
+    """Mongo-backed outbox with a pool of SMTP delivery workers"""
+
+    def __init__(self, collection, host: str, port: int, sender: str,
+                 username: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: bool = True, workers: int = 2, batch_size: int = 20,
+                 max_attempts: int = 5, retry_backoff: float = 30.0,
+                 poll_interval: float = 5.0, idle_timeout: float = 60.0,
+                 lock_timeout: float = 120.0):
+        self.collection = collection
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.lock_timeout = lock_timeout
+        self.sessions = [
+            SMTPSession(host, port, username=username, password=password, use_tls=use_tls)
+            for _ in range(workers)
+        ]
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = False
+
+    async def enqueue(self, to_email: str, subject: str, body: str) -> str:
+        """Persist a message for delivery and wake the workers"""
+        now = datetime.utcnow()
+        message_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": message_id,
+            "to": to_email,
+            "subject": subject,
+            "body": body,
+            "status": PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "last_error": None,
+        })
+        self._wakeup.set()
+        return message_id
+
+    async def start(self):
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(session)) for session in self.sessions]
+        logger.info(f"Email outbox started with {self.workers} workers")
+
+    async def stop(self):
+        """Let workers finish their current batch, then close SMTP sessions"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for session in self.sessions:
+            await asyncio.to_thread(session.close)
+        logger.info("Email outbox stopped")
+
+    async def drain(self) -> int:
+        """Deliver everything currently due using the first session; returns messages sent"""
+        sent = 0
+        while True:
+            batch = await self._claim_batch()
+            if not batch:
+                return sent
+            sent += await self._deliver_batch(self.sessions[0], batch)
+
+    async def _worker(self, session: SMTPSession):
+        while not self._stopping:
+            try:
+                batch = await self._claim_batch()
+                if batch:
+                    await self._deliver_batch(session, batch)
+                    continue
+                if session.connected and session.idle_for() > self.idle_timeout:
+                    await asyncio.to_thread(session.close)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim_batch(self) -> List[dict]:
+        """Atomically lease up to batch_size due messages"""
+        now = datetime.utcnow()
+        due = {
+            "$or": [
+                {"status": PENDING, "next_attempt_at": {"$lte": now}},
+                # Leases left behind by a crashed worker
+                {"status": SENDING, "locked_until": {"$lt": now}},
+            ]
+        }
+        lease = {"$set": {"status": SENDING, "locked_until": now + timedelta(seconds=self.lock_timeout)}}
+        batch = []
+        for _ in range(self.batch_size):
+            doc = await self.collection.find_one_and_update(
+                due, lease, sort=[("next_attempt_at", 1)], return_document=ReturnDocument.AFTER
+            )
+            if doc is None:
+                break
+            batch.append(doc)
+        return batch
+
+    async def _deliver_batch(self, session: SMTPSession, batch: List[dict]) -> int:
+        sent_ids = []
+        for doc in batch:
+            message = build_message(self.sender, doc["to"], doc["subject"], doc["body"])
+            start = time.perf_counter()
+            try:
+                await asyncio.to_thread(session.send, self.sender, doc["to"], message)
+                SMTP_DELIVERY_SECONDS.observe(time.perf_counter() - start, "sent")
+                sent_ids.append(doc["id"])
+            except Exception as e:
+                SMTP_DELIVERY_SECONDS.observe(time.perf_counter() - start, "failed")
+                await self._schedule_retry(doc, e)
+
+        if sent_ids:
+            await self.collection.update_many(
+                {"id": {"$in": sent_ids}},
+                {"$set": {"status": SENT, "sent_at": datetime.utcnow()}, "$unset": {"locked_until": ""}},
+            )
+            logger.info(f"Delivered {len(sent_ids)} queued emails")
+        return len(sent_ids)
+
+    async def _schedule_retry(self, doc: dict, error: Exception):
+        attempts = doc.get("attempts", 0) + 1
+        update = {"attempts": attempts, "last_error": str(error)}
+        if attempts >= self.max_attempts:
+            update["status"] = FAILED
+            logger.error(f"Giving up on email {doc['id']} after {attempts} attempts: {str(error)}")
+        else:
+            update["status"] = PENDING
+            update["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=self.retry_backoff * 2 ** (attempts - 1))
+            logger.warning(f"Email {doc['id']} failed (attempt {attempts}), retrying: {str(error)}")
+        await self.collection.update_one(
+            {"id": doc["id"]}, {"$set": update, "$unset": {"locked_until": ""}}
+        )
@@ -0,0 +1,91 @@
+"""Declarative index registry.
+
+Every index the API relies on is listed here, keyed by collection name, and
+applied at startup by ``ensure_indexes``. ``create_indexes`` is a no-op for
+indexes that already exist with the same spec, so this is safe to run on every
+boot. Add new query shapes here alongside the route that issues them.
+"""
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "blog_posts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        # get_blog_posts(published=True) in publication order, and its cursor
+        # pages; also covers the scheduler's due-post range query, since
+        # scheduled posts sit under published=false
+        IndexModel([("published", ASCENDING), ("publish_at", DESCENDING), ("id", DESCENDING)],
+                   name="published_publish_at"),
+        # get_blog_posts(tags=...); multikey, one entry per tag of each post,
+        # with the few unpublished posts filtered out of the fetched documents
+        IndexModel([("tags", ASCENDING), ("publish_at", DESCENDING), ("id", DESCENDING)], name="tags_publish_at"),
+        # get_blog_posts(published=False) lists everything
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at"),
+        # Search index sync watermark
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    # Materialized tag counts behind /api/blog/tags
+    "blog_tags": [
+        IndexModel([("tag", ASCENDING)], unique=True, name="tag_unique"),
+        IndexModel([("published_count", DESCENDING), ("tag", ASCENDING)], name="published_count"),
+        # /api/blog/tags?published=false
+        IndexModel([("post_count", DESCENDING), ("tag", ASCENDING)], name="post_count"),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("post_id", ASCENDING), ("approved", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="post_approved_created_at"),
+        # Search index sync watermark and streaming exports
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+        # Moderation queue listing and its cursor pages
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at"),
+        # Search sync of approvals and rejections; most comments are never moderated
+        IndexModel([("moderated_at", ASCENDING)], sparse=True, name="moderated_at"),
+    ],
+    "contacts": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("submitted_at", DESCENDING), ("id", DESCENDING)], name="submitted_at"),
+    ],
+    "users": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    "email_outbox": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+    ],
+    "response_cache": [
+        IndexModel([("key", ASCENDING)], unique=True, name="key_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    # Shared rate-limit buckets and submission fingerprints; the unique key
+    # is what makes their conditional upserts atomic
+    "rate_limits": [
+        IndexModel([("key", ASCENDING)], unique=True, name="key_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+    "submission_fingerprints": [
+        IndexModel([("key", ASCENDING)], unique=True, name="key_unique"),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+}
+
+
+async def ensure_indexes(db):
+    """Create any missing registry indexes; returns the names per collection
+
+    A collection whose indexes cannot be built (say, duplicates under a new
+    unique index) is logged and skipped, so the others still get theirs.
+    """
+    created = {}
+    for collection_name, models in INDEXES.items():
+        try:
+            created[collection_name] = await db[collection_name].create_indexes(models)
+        except Exception as e:
+            logger.error(f"Failed to create indexes on {collection_name}: {str(e)}")
+    logger.info(f"Indexes ensured on {len(created)} of {len(INDEXES)} collections")
+    return created
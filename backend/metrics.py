@@ -0,0 +1,299 @@
+"""Request, Mongo and SMTP metrics in Prometheus text format.
+
+A deliberately small in-process registry (counters, gauges and fixed-bucket
+histograms keyed by label tuples) so recording stays a couple of dict lookups
+and a bisect. pymongo's listeners record from driver threads, so each metric
+guards its values with a lock. Collectors registered with ``REGISTRY.add_collector`` are called
+at scrape time for values owned by other subsystems, such as cache hit counts.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from pymongo import monitoring
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def set(self, *labels, value: float):
+        """Overwrite a series, for totals tracked elsewhere and copied in at scrape time"""
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, *labels) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labels):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bucket] += 1
+            series[-1] += value
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._values.get(labels)
+            return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> List[str]:
+        # Copy under the lock so a scrape sees each series whole
+        with self._lock:
+            values = [(labels, list(series)) for labels, series in self._values.items()]
+        lines = []
+        for labels, series in values:
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += hits
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Run ``collector`` before each scrape to refresh gauges it owns"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ["method", "route"]))
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]))
+HTTP_ERRORS = REGISTRY.register(Counter(
+    "http_request_errors_total", "HTTP 5xx responses and unhandled exceptions by route", ["method", "route"]))
+MONGO_COMMAND_SECONDS = REGISTRY.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ["collection", "command"]))
+MONGO_COMMAND_FAILURES = REGISTRY.register(Counter(
+    "mongo_command_failures_total", "Failed MongoDB commands", ["collection", "command"]))
+SMTP_DELIVERY_SECONDS = REGISTRY.register(Histogram(
+    "smtp_delivery_duration_seconds", "Time to hand one message to the SMTP server", ["outcome"]))
+MONGO_POOL_CHECKOUT_SECONDS = REGISTRY.register(Histogram(
+    "mongo_pool_checkout_duration_seconds", "Time spent waiting for a pooled connection", ["address"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0)))
+MONGO_POOL_CHECKOUT_FAILURES = REGISTRY.register(Counter(
+    "mongo_pool_checkout_failures_total", "Connection checkouts that failed, e.g. on wait-queue timeout",
+    ["address", "reason"]))
+MONGO_POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "mongo_pool_connections", "Open connections per server", ["address"]))
+MONGO_POOL_CHECKED_OUT = REGISTRY.register(Gauge(
+    "mongo_pool_checked_out", "Connections in use per server", ["address"]))
+MONGO_POOL_WAITING = REGISTRY.register(Gauge(
+    "mongo_pool_waiting", "Operations waiting for a connection per server", ["address"]))
+MONGO_POOL_SATURATION = REGISTRY.register(Gauge(
+    "mongo_pool_saturation", "Connections in use as a fraction of maxPoolSize", ["address"]))
+SUBMISSIONS_REJECTED = REGISTRY.register(Counter(
+    "submission_rejections_total", "Public submissions refused before any write", ["route", "reason"]))
+COMMENTS_MODERATED = REGISTRY.register(Counter(
+    "comments_moderated_total", "Comment status changes", ["status", "by"]))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, counts and errors per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            # Templates, not raw paths, keep label cardinality bounded
+            template = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, template)
+            HTTP_REQUESTS.inc(method, template, str(status))
+            if status >= 500:
+                HTTP_ERRORS.inc(method, template)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener feeding MONGO_COMMAND_SECONDS"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple, str] = {}
+
+    def started(self, event):
+        # getMore names its collection separately; its own value is the cursor id
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        target = event.command.get(key)
+        self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def _finish(self, event) -> Tuple[str, str]:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        return collection, event.command_name
+
+    def succeeded(self, event):
+        collection, command = self._finish(event)
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, collection, command)
+
+    def failed(self, event):
+        collection, command = self._finish(event)
+        MONGO_COMMAND_SECONDS.observe(event.duration_micros / 1e6, collection, command)
+        MONGO_COMMAND_FAILURES.inc(collection, command)
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """pymongo pool listener tracking connections, checkouts and checkout waits per server
+
+    Events arrive on driver threads; a checkout's start and end happen on the
+    same thread, so the wait is timed with a thread-local start time.
+    """
+
+    def __init__(self, max_pool_size: int = 100):
+        self.max_pool_size = max_pool_size
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # address -> {"connections", "checked_out", "waiting"}
+        self._pools: Dict[str, Dict[str, int]] = {}
+
+    def _update(self, event, **deltas):
+        address = "%s:%s" % event.address
+        with self._lock:
+            pool = self._pools.setdefault(address, {"connections": 0, "checked_out": 0, "waiting": 0})
+            for field, delta in deltas.items():
+                pool[field] = max(0, pool[field] + delta)
+            MONGO_POOL_CONNECTIONS.set(address, value=pool["connections"])
+            MONGO_POOL_CHECKED_OUT.set(address, value=pool["checked_out"])
+            MONGO_POOL_WAITING.set(address, value=pool["waiting"])
+            MONGO_POOL_SATURATION.set(address, value=pool["checked_out"] / self.max_pool_size)
+        return address
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(pool) for address, pool in self._pools.items()}
+
+    def pool_created(self, event):
+        self._update(event)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop("%s:%s" % event.address, None)
+
+    def connection_created(self, event):
+        self._update(event, connections=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event, connections=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+        self._update(event, waiting=1)
+
+    def connection_check_out_failed(self, event):
+        address = self._update(event, waiting=-1)
+        MONGO_POOL_CHECKOUT_FAILURES.inc(address, str(event.reason))
+
+    def connection_checked_out(self, event):
+        address = self._update(event, waiting=-1, checked_out=1)
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started, address)
+            self._local.started = None
+
+    def connection_checked_in(self, event):
+        self._update(event, checked_out=-1)
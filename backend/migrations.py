@@ -0,0 +1,107 @@
+"""One-off data migrations applied at startup.
+
+Each migration runs once per database: when it completes, a marker document
+is written to the ``migrations`` collection, and later boots skip it after a
+single ``find_one``. Migrations must be safe to re-run in case a boot dies
+halfway through one.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+from pymongo import UpdateOne
+
+from tag_counts import rebuild as rebuild_tag_counts
+
+logger = logging.getLogger(__name__)
+
+# Timestamps that used to be stored as isoformat() strings
+DATE_FIELDS: Dict[str, List[str]] = {
+    "contacts": ["submitted_at"],
+    "blog_posts": ["created_at", "updated_at"],
+    "comments": ["created_at"],
+    "users": ["created_at"],
+}
+
+
+def _to_date(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+async def native_datetimes(db, batch_size: int = 1000) -> int:
+    """Convert string timestamps, including those in embedded recent_comments, to BSON dates"""
+    converted = 0
+    for collection_name, fields in DATE_FIELDS.items():
+        collection = db[collection_name]
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        if collection_name == "blog_posts":
+            query["$or"].append({"recent_comments.created_at": {"$type": "string"}})
+        projection = {field: 1 for field in fields + ["recent_comments"]}
+
+        operations = []
+        async for doc in collection.find(query, projection):
+            update = {field: _to_date(doc[field]) for field in fields if isinstance(doc.get(field), str)}
+            if doc.get("recent_comments"):
+                update["recent_comments"] = [dict(c, created_at=_to_date(c.get("created_at")))
+                                             for c in doc["recent_comments"]]
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            if len(operations) >= batch_size:
+                await collection.bulk_write(operations, ordered=False)
+                converted += len(operations)
+                operations = []
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+            converted += len(operations)
+    return converted
+
+
+async def backfill_tag_counts(db) -> int:
+    """Materialize tag counts for posts created before ``blog_tags`` was maintained"""
+    return await rebuild_tag_counts(db.blog_posts, db.blog_tags)
+
+
+async def comment_status(db) -> int:
+    """Give comments from before moderation a ``status`` matching their ``approved`` flag"""
+    approved = await db.comments.update_many(
+        {"status": {"$exists": False}, "approved": True}, {"$set": {"status": "approved"}})
+    pending = await db.comments.update_many(
+        {"status": {"$exists": False}, "approved": {"$ne": True}}, {"$set": {"status": "pending"}})
+    return approved.modified_count + pending.modified_count
+
+
+async def publish_at(db, batch_size: int = 1000) -> int:
+    """Date published posts from before scheduling by their creation; unpublished ones become drafts"""
+    operations = []
+    changed = 0
+    async for post in db.blog_posts.find({"publish_at": {"$exists": False}}, {"_id": 1, "published": 1, "created_at": 1}):
+        operations.append(UpdateOne({"_id": post["_id"]}, {"$set": {
+            "publish_at": post.get("created_at") if post.get("published") else None,
+        }}))
+        if len(operations) >= batch_size:
+            await db.blog_posts.bulk_write(operations, ordered=False)
+            changed += len(operations)
+            operations = []
+    if operations:
+        await db.blog_posts.bulk_write(operations, ordered=False)
+        changed += len(operations)
+    return changed
+
+
+MIGRATIONS = [
+    ("native_datetimes", native_datetimes),
+    ("tag_counts", backfill_tag_counts),
+    ("comment_status", comment_status),
+    ("publish_at", publish_at),
+]
+
+
+async def apply_migrations(db):
+    """Run every migration not yet recorded in the ``migrations`` collection"""
+    for name, migrate in MIGRATIONS:
+        if await db.migrations.find_one({"_id": name}):
+            continue
+        changed = await migrate(db)
+        await db.migrations.update_one(
+            {"_id": name}, {"$set": {"applied_at": datetime.utcnow(), "changed": changed}}, upsert=True
+        )
+        logger.info(f"Migration {name} applied to {changed} documents")
@@ -0,0 +1,231 @@
+"""Comment moderation: status changes in batches and background spam scoring.
+
+A comment's ``status`` is ``approved``, ``pending`` or ``rejected``, and its
+``approved`` flag, which readers and the denormalized post stats key on, is
+true only while it is approved. ``Moderator.set_status`` moves comment ids
+in batches, with one ``update_many`` per batch (two when withdrawing comments,
+to tell visible ones apart). Each update tags what it changed with a fresh
+token. Only those comments are then read back and adjust their posts'
+``comment_count`` and ``recent_comments``, however many moderators act at once.
+
+New comments are scored after the response is sent. ``create_comment`` hands
+them to a ``SpamScreen``, whose workers call the configured scorer and hold or
+reject comments above the thresholds. A moderator's decision is never
+overridden by the scorer. Comments the screen missed (queue full, process
+restarted) are swept up on a timer.
+"""
+import asyncio
+import importlib
+import logging
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from comment_stats import adjust_comment_counts
+
+logger = logging.getLogger(__name__)
+
+APPROVED = "approved"
+PENDING = "pending"
+REJECTED = "rejected"
+STATUSES = (APPROVED, PENDING, REJECTED)
+
+# Who made the last status change
+BY_MODERATOR = "moderator"
+BY_SCORER = "scorer"
+
+
+class HeuristicSpamScorer:
+    """Scores 0..1 from links, shouting, repetition and stock spam phrases"""
+
+    PHRASES = ("buy now", "click here", "free money", "casino", "viagra", "crypto giveaway", "earn $", "work from home",
+               "limited offer", "seo services", "whatsapp")
+    LINK = re.compile(r"https?://|www\.", re.IGNORECASE)
+
+    async def score(self, comment: dict) -> float:
+        text = f"{comment.get('author_name') or ''} {comment.get('content') or ''}"
+        lowered = text.lower()
+        score = 0.0
+        links = len(self.LINK.findall(text))
+        score += min(0.6, 0.25 * links)
+        score += min(0.6, 0.3 * sum(phrase in lowered for phrase in self.PHRASES))
+        letters = [c for c in text if c.isalpha()]
+        if len(letters) >= 20 and sum(c.isupper() for c in letters) / len(letters) > 0.7:
+            score += 0.2
+        if re.search(r"(.)\1{9,}", text):
+            score += 0.2
+        return min(1.0, score)
+
+
+def load_scorer(spec: str):
+    """Instantiate the scorer named ``module:Class``; it needs an ``async score(comment) -> float``"""
+    module_name, _, attribute = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)()
+
+
+def _batches(ids: List[str], size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+class Moderator:
+    """Batched status changes that keep post stats in step
+
+    ``recent(post_id)`` reloads a post's latest approved comments and
+    ``on_change(comments)`` receives every comment whose status changed, so
+    search indexes and caches can follow.
+    """
+
+    def __init__(self, comments_collection, posts_collection, recent: Callable[[str], Awaitable[List[dict]]],
+                 on_change: Optional[Callable[[List[dict]], Awaitable[None]]] = None, batch_size: int = 500):
+        self.comments_collection = comments_collection
+        self.posts_collection = posts_collection
+        self.recent = recent
+        self.on_change = on_change
+        self.batch_size = batch_size
+
+    async def set_status(self, ids: List[str], status: str, by: str = BY_MODERATOR) -> int:
+        """Move ``ids`` to ``status``; returns the number of comments changed
+
+        The scorer only acts on comments no moderator has decided on.
+        """
+        if status == APPROVED:
+            # Becoming visible: each one adds to its post's count
+            steps = [({"approved": {"$ne": True}}, 1)]
+        else:
+            # Withdrawn from readers, then moved between hidden states
+            steps = [({"approved": True}, -1), ({"approved": {"$ne": True}}, 0)]
+
+        changed = 0
+        for batch in _batches(list(dict.fromkeys(ids)), self.batch_size):
+            deltas: Dict[str, int] = Counter()
+            updated = []
+            for visibility, delta in steps:
+                query = {"id": {"$in": batch}, "status": {"$ne": status}, **visibility}
+                if by == BY_SCORER:
+                    query["moderated_by"] = {"$ne": BY_MODERATOR}
+                comments = await self._update(query, status, by)
+                for comment in comments:
+                    deltas[comment["post_id"]] += delta
+                updated.extend(comments)
+            if not updated:
+                continue
+            changed += len(updated)
+            await adjust_comment_counts(self.posts_collection, {p: d for p, d in deltas.items() if d}, self.recent)
+            if self.on_change is not None:
+                await self.on_change(updated)
+        return changed
+
+    async def _update(self, query: dict, status: str, by: str) -> List[dict]:
+        """``update_many`` then read back exactly the comments it changed, whatever ran in parallel"""
+        token = uuid.uuid4().hex
+        result = await self.comments_collection.update_many(query, {"$set": {
+            "status": status,
+            "approved": status == APPROVED,
+            "moderated_at": datetime.utcnow(),
+            "moderated_by": by,
+            "moderation_token": token,
+        }})
+        if not result.modified_count:
+            return []
+        return await self.comments_collection.find(
+            {"id": query["id"], "moderation_token": token}, {"_id": 0, "email": 0, "moderation_token": 0}
+        ).to_list(length=None)
+
+
+class SpamScreen:
+    """Scores new comments in background workers and holds or rejects the spammy ones"""
+
+    def __init__(self, comments_collection, moderator: Moderator, scorer, hold_threshold: float = 0.5,
+                 reject_threshold: float = 0.9, workers: int = 2, max_queue: int = 10000,
+                 sweep_interval: float = 300.0, sweep_window: float = 86400.0):
+        self.comments_collection = comments_collection
+        self.moderator = moderator
+        self.scorer = scorer
+        self.hold_threshold = hold_threshold
+        self.reject_threshold = reject_threshold
+        self.workers = workers
+        self.sweep_interval = sweep_interval
+        self.sweep_window = sweep_window
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: List[asyncio.Task] = []
+
+    def submit(self, comment: dict):
+        """Queue ``comment`` for scoring without waiting; the sweep catches any dropped here"""
+        try:
+            self._queue.put_nowait(comment)
+        except asyncio.QueueFull:
+            logger.warning(f"Spam screen queue full; comment {comment['id']} left for the sweep")
+
+    async def screen(self, comment: dict) -> Optional[str]:
+        """Score one comment and act on it; returns the status it was moved to, if any"""
+        score = float(await self.scorer.score(comment))
+        # Only the first scorer to get here decides, should a sweep overlap a worker
+        result = await self.comments_collection.update_one(
+            {"id": comment["id"], "spam_score": None}, {"$set": {"spam_score": score}}
+        )
+        if not result.modified_count:
+            return None
+        if score >= self.reject_threshold:
+            status = REJECTED
+        elif score >= self.hold_threshold and comment.get("approved"):
+            status = PENDING
+        else:
+            return None
+        if await self.moderator.set_status([comment["id"]], status, by=BY_SCORER):
+            logger.info(f"Comment {comment['id']} {status} by spam screen (score {score:.2f})")
+            return status
+        return None
+
+    async def sweep(self) -> int:
+        """Queue recent comments that were never scored; returns how many"""
+        since = datetime.utcnow() - timedelta(seconds=self.sweep_window)
+        queued = 0
+        async for comment in self.comments_collection.find(
+            {"created_at": {"$gte": since}, "spam_score": None}, {"_id": 0, "email": 0}
+        ).sort([("created_at", 1), ("id", 1)]):
+            if self._queue.full():
+                break
+            self._queue.put_nowait(comment)
+            queued += 1
+        return queued
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        if self.sweep_interval > 0:
+            self._tasks.append(asyncio.create_task(self._sweep_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def join(self):
+        """Wait until every queued comment has been screened"""
+        await self._queue.join()
+
+    async def _work(self):
+        while True:
+            comment = await self._queue.get()
+            try:
+                await self.screen(comment)
+            except Exception as e:
+                logger.error(f"Spam screening failed for comment {comment.get('id')}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _sweep_loop(self):
+        # The first pass picks up whatever a previous process left unscored
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Spam screen sweep failed: {str(e)}")
+            await asyncio.sleep(self.sweep_interval)
@@ -0,0 +1,63 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is an opaque, URL-safe token holding the sort key and ``id`` of the
+last document on a page. The next page is fetched with a range query on
+``(sort_field, id)`` instead of ``skip``, so deep pages cost the same as the
+first one.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, doc_id: str) -> str:
+    # Dates are tagged so the range query compares a BSON date, not a string
+    if isinstance(sort_value, datetime):
+        payload = [sort_value.isoformat(), doc_id, "date"]
+    else:
+        payload = [sort_value, doc_id]
+    raw = json.dumps(payload, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[object, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, doc_id, *kind = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if kind == ["date"]:
+            sort_value = datetime.fromisoformat(sort_value)
+    except Exception:
+        raise InvalidCursor("Invalid pagination cursor")
+    if not isinstance(doc_id, str) or len(kind) > 1:
+        raise InvalidCursor("Invalid pagination cursor")
+    return sort_value, doc_id
+
+
+def sort_spec(sort_field: str) -> List[Tuple[str, int]]:
+    """Newest first, with ``id`` as a tie-breaker so the order is total"""
+    return [(sort_field, -1), ("id", -1)]
+
+
+def after_cursor(query: dict, sort_field: str, cursor: Optional[str]) -> dict:
+    """Narrow ``query`` to the documents that come after ``cursor``"""
+    if not cursor:
+        return query
+    sort_value, doc_id = decode_cursor(cursor)
+    keyset = {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+def next_cursor(items: List[dict], sort_field: str, limit: int) -> Optional[str]:
+    """Cursor for the page after ``items``, or None on the last page"""
+    if limit <= 0 or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(last.get(sort_field), last.get("id"))
@@ -0,0 +1,89 @@
+"""Password hashing off the event loop.
+
+bcrypt/pbkdf2 at production cost burn 100ms+ of CPU per call, which would
+stall every other request if run on the event loop (or starve Starlette's
+threadpool). Hashing and verification run in a bounded ProcessPoolExecutor
+whose workers each hold their own passlib ``CryptContext``. Hashes made with
+a deprecated scheme or an older cost are replaced the next time their owner
+logs in. passlib and the process pool machinery are imported on first use.
+"""
+import asyncio
+import hmac
+import logging
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+    from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+# Worker-process context, set by the pool initializer
+_context: Optional["CryptContext"] = None
+
+
+def build_context(schemes: List[str], rounds: Optional[int] = None) -> "CryptContext":
+    """First scheme hashes new passwords; the rest are accepted and upgraded on login"""
+    from passlib.context import CryptContext
+
+    settings = {f"{schemes[0]}__rounds": rounds} if rounds else {}
+    return CryptContext(schemes=schemes, deprecated="auto", **settings)
+
+
+def _init_worker(schemes: List[str], rounds: Optional[int]):
+    global _context
+    _context = build_context(schemes, rounds)
+
+
+def _hash(password: str) -> str:
+    return _context.hash(password)
+
+
+def _verify(password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+    return _context.verify_and_update(password, stored_hash)
+
+
+class PasswordHasher:
+    def __init__(self, schemes: List[str], rounds: Optional[int] = None, workers: int = 2):
+        self.schemes = schemes
+        self.rounds = rounds
+        self.workers = workers
+        self._executor: Optional["ProcessPoolExecutor"] = None
+        # Bound the backlog so a registration burst queues here, not in the pool
+        self._slots = asyncio.Semaphore(workers * 4)
+
+    def start(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn: forking a process that already runs the event loop and driver
+        # threads can inherit held locks
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.schemes, self.rounds),
+        )
+        logger.info(f"Password hasher started with {self.workers} workers ({self.schemes[0]})")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify(self, password: str, stored_hash: str) -> Tuple[bool, Optional[str]]:
+        """Check ``password``; returns (ok, replacement hash if the stored one is outdated)"""
+        return await self._run(_verify, password, stored_hash)
+
+    async def verify_legacy(self, password: str, stored_password: str) -> Tuple[bool, Optional[str]]:
+        """Check a plain-text password stored before hashing existed, and hash it on success"""
+        if not hmac.compare_digest(password.encode(), stored_password.encode()):
+            return False, None
+        return True, await self.hash(password)
@@ -0,0 +1,180 @@
+"""Per-client rate limiting and duplicate suppression for public write routes.
+
+Limits are token buckets kept in GCRA form: each key stores only the time at
+which its bucket would be full again (the "theoretical arrival time"), so a
+check is one comparison and one write. ``MemoryBackend`` keeps that state per
+worker; ``MongoBackend`` shares it across workers through atomic conditional
+upserts. The same backends remember content fingerprints for a window so an
+identical resubmission is refused before any database or SMTP work.
+"""
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class Limit(NamedTuple):
+    capacity: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        """Seconds for one token to refill"""
+        return self.period / self.capacity
+
+
+def parse_limit(spec: str) -> Optional[Limit]:
+    """``"5/60"`` allows bursts of 5 refilled over 60 seconds; empty or ``"0"`` disables"""
+    spec = spec.strip()
+    if not spec or spec == "0":
+        return None
+    capacity, _, period = spec.partition("/")
+    return Limit(int(capacity), float(period or 60))
+
+
+def fingerprint(*parts) -> str:
+    """Stable hash of a submission's normalised content"""
+    text = "\x1f".join(" ".join(str(part or "").lower().split()) for part in parts)
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _admit(tat: Optional[float], now: float, limit: Limit):
+    """Return (new arrival time, None) if allowed, else (None, seconds to wait)"""
+    tat = max(tat or now, now)
+    allowed_at = tat - (limit.capacity - 1) * limit.interval
+    if allowed_at > now:
+        return None, allowed_at - now
+    return tat + limit.interval, None
+
+
+class MemoryBackend:
+    """Bucket and fingerprint state for a single worker"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, float] = {}
+        self._fingerprints: Dict[str, float] = {}
+
+    async def acquire(self, key: str, limit: Limit) -> Optional[float]:
+        now = time.monotonic()
+        tat, retry_after = _admit(self._buckets.get(key), now, limit)
+        if tat is not None:
+            self._buckets[key] = tat
+            if len(self._buckets) > self.max_keys:
+                self._prune(self._buckets, now)
+        return retry_after
+
+    async def remember(self, digest: str, window: float) -> bool:
+        now = time.monotonic()
+        if self._fingerprints.get(digest, 0.0) > now:
+            return False
+        self._fingerprints[digest] = now + window
+        if len(self._fingerprints) > self.max_keys:
+            self._prune(self._fingerprints, now)
+        return True
+
+    async def forget(self, digest: str):
+        self._fingerprints.pop(digest, None)
+
+    @staticmethod
+    def _prune(entries: Dict[str, float], now: float):
+        # A bucket whose arrival time has passed is full, the same as no entry
+        for key in [key for key, until in entries.items() if until <= now]:
+            del entries[key]
+
+    def clear(self):
+        self._buckets.clear()
+        self._fingerprints.clear()
+
+
+class MongoBackend:
+    """Bucket and fingerprint state shared by all workers
+
+    Both collections need a unique index on ``key`` (an upsert that loses the
+    race, or whose filter does not match an existing key, raises
+    DuplicateKeyError) and a TTL index on ``expires_at`` for cleanup.
+    """
+
+    def __init__(self, buckets_collection, fingerprints_collection):
+        self.buckets = buckets_collection
+        self.fingerprints = fingerprints_collection
+
+    async def acquire(self, key: str, limit: Limit) -> Optional[float]:
+        now = time.time()
+        burst = (limit.capacity - 1) * limit.interval
+        expires_at = datetime.utcnow() + timedelta(seconds=limit.period)
+        try:
+            # Full (or new) bucket: start from now
+            await self.buckets.update_one(
+                {"key": key, "tat": {"$lte": now}},
+                {"$set": {"tat": now + limit.interval, "expires_at": expires_at}},
+                upsert=True,
+            )
+            return None
+        except DuplicateKeyError:
+            pass
+        # Partly drained bucket: take a token if one is left
+        doc = await self.buckets.find_one_and_update(
+            {"key": key, "tat": {"$gt": now, "$lte": now + burst}},
+            {"$inc": {"tat": limit.interval}, "$set": {"expires_at": expires_at}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            return None
+        doc = await self.buckets.find_one({"key": key})
+        if doc is None:
+            return None
+        return max(doc["tat"] - burst - now, limit.interval / 10)
+
+    async def remember(self, digest: str, window: float) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self.fingerprints.update_one(
+                {"key": digest, "expires_at": {"$lte": now}},
+                {"$set": {"expires_at": now + timedelta(seconds=window)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False
+
+    async def forget(self, digest: str):
+        await self.fingerprints.delete_one({"key": digest})
+
+    def clear(self):
+        pass
+
+
+class RateLimiter:
+    """Per-route limits and a dedup window over a pluggable backend"""
+
+    def __init__(self, backend, limits: Dict[str, Limit], dedup_window: float = 600.0):
+        self.backend = backend
+        self.limits = limits
+        self.dedup_window = dedup_window
+
+    async def check(self, route: str, *clients: str) -> Optional[float]:
+        """Take a token from each client's bucket for ``route``; returns seconds to wait if any is empty"""
+        limit = self.limits.get(route)
+        if limit is None:
+            return None
+        for client in clients:
+            if client:
+                retry_after = await self.backend.acquire(f"{route}:{client}", limit)
+                if retry_after is not None:
+                    return retry_after
+        return None
+
+    async def first_submission(self, route: str, digest: str) -> bool:
+        """False if the same content was accepted within the dedup window"""
+        if self.dedup_window <= 0:
+            return True
+        return await self.backend.remember(f"{route}:{digest}", self.dedup_window)
+
+    async def forget_submission(self, route: str, digest: str):
+        """Release a fingerprint whose submission failed, so a retry is accepted"""
+        if self.dedup_window > 0:
+            await self.backend.forget(f"{route}:{digest}")
@@ -0,0 +1,198 @@
+"""Two-tier response cache with strong ETags.
+
+The first tier is an in-process LRU with a short TTL. An optional shared tier
+(``MongoCacheTier``) lets several uvicorn workers reuse each other's rendered
+pages. Entries hold the encoded JSON body and its ETag, so a hit costs no
+query and no serialization, and a matching ``If-None-Match`` gets a bodyless
+304. Writes invalidate by key prefix in both tiers.
+"""
+import hashlib
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from compression import available_encodings, encoded_etag, negotiate
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    # Pre-compressed variants of ``body`` by Content-Encoding, if any
+    encodings: Optional[Dict[str, bytes]] = None
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def cache_key(request: Request) -> str:
+    """Route path plus query params in a canonical order"""
+    params = sorted(request.query_params.multi_items())
+    query = "&".join(f"{name}={value}" for name, value in params)
+    return f"{request.url.path}?{query}"
+
+
+def render_json(content) -> bytes:
+    """Encode exactly as the app's default ORJSONResponse would"""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def etag_matches(request: Request, *etags: str) -> Optional[str]:
+    """The first of ``etags`` that If-None-Match names, if any"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = [tag.strip() for tag in header.split(",")]
+    if "*" in candidates:
+        return etags[0]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    sent = {tag.removeprefix("W/") for tag in candidates}
+    return next((etag for etag in etags if etag in sent), None)
+
+
+def cached_json_response(request: Request, entry: CachedResponse) -> Response:
+    accept_encoding = request.headers.get("accept-encoding")
+    # Each encoding is its own representation with its own tag
+    if entry.encodings:
+        encoding = negotiate(accept_encoding, entry.encodings)
+        etag = encoded_etag(entry.etag, encoding) if encoding else entry.etag
+        revalidates = (etag,)
+    else:
+        # CompressionMiddleware may compress this body and tag it so; a client
+        # revalidating that copy sends the encoded tag
+        encoding = None
+        etag = entry.etag
+        compressed = negotiate(accept_encoding, available_encodings())
+        revalidates = (etag, encoded_etag(etag, compressed)) if compressed else (etag,)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if entry.encodings:
+        headers["Vary"] = "Accept-Encoding"
+    matched = etag_matches(request, *revalidates)
+    if matched:
+        if matched != etag:
+            headers["ETag"] = matched
+            headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+        return Response(content=entry.encodings[encoding], media_type="application/json", headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+class MongoCacheTier:
+    """Shared cache tier stored in a Mongo collection with a TTL index"""
+
+    def __init__(self, collection, ttl: float = 60.0):
+        self.collection = collection
+        self.ttl = ttl
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        doc = await self.collection.find_one({"key": key, "expires_at": {"$gt": datetime.utcnow()}})
+        if doc is None:
+            return None
+        return CachedResponse(bytes(doc["body"]), doc["etag"])
+
+    async def set(self, key: str, entry: CachedResponse):
+        await self.collection.update_one(
+            {"key": key},
+            {"$set": {
+                "body": entry.body,
+                "etag": entry.etag,
+                "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl),
+            }},
+            upsert=True,
+        )
+
+    async def invalidate(self, prefix: str):
+        await self.collection.delete_many({"key": {"$regex": "^" + re.escape(prefix)}})
+
+
+class ResponseCache:
+    """In-process LRU with TTL in front of an optional shared tier"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 10.0, shared: Optional[MongoCacheTier] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.shared = shared
+        self.generation = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        cached = self._entries.get(key)
+        if cached is not None:
+            entry, expires_at = cached
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            del self._entries[key]
+
+        if self.shared is not None:
+            try:
+                entry = await self.shared.get(key)
+            except Exception as e:
+                logger.error(f"Shared cache read failed: {str(e)}")
+                entry = None
+            if entry is not None:
+                self._store(key, entry)
+                self.shared_hits += 1
+                return entry
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content, generation: Optional[int] = None) -> CachedResponse:
+        """Encode ``content`` and cache it unless an invalidation happened since ``generation``"""
+        body = render_json(content)
+        entry = CachedResponse(body, make_etag(body))
+        if generation is not None and generation != self.generation:
+            return entry
+        self._store(key, entry)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry)
+            except Exception as e:
+                logger.error(f"Shared cache write failed: {str(e)}")
+        return entry
+
+    def _store(self, key: str, entry: CachedResponse):
+        self._entries[key] = (entry, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, prefix: str):
+        """Drop every entry whose key starts with ``prefix``"""
+        self.generation += 1
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+        if self.shared is not None:
+            try:
+                await self.shared.invalidate(prefix)
+            except Exception as e:
+                logger.error(f"Shared cache invalidation failed: {str(e)}")
+
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self.hits = self.shared_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,97 @@
+"""Scheduled publishing of blog posts.
+
+A post is a draft (``published`` false, no ``publish_at``), scheduled
+(``published`` false, ``publish_at`` in the future) or published. Every tick
+``PublishScheduler`` finds the due posts with one range query on the
+``(published, publish_at)`` index, covered because it projects only ``id``,
+and flips them with ``update_many``. Each worker runs a scheduler; the flip is
+conditional and tagged with a token, so only the worker whose update changed
+a post reports it to ``on_published`` for the tag counts, search index and
+caches.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def due_query(now: datetime) -> dict:
+    """Unpublished posts whose time has come; drafts have no publish_at and never match"""
+    return {"published": False, "publish_at": {"$lte": now}}
+
+
+class PublishScheduler:
+    """Publishes posts whose ``publish_at`` has passed, every ``interval`` seconds"""
+
+    def __init__(self, posts_collection, interval: float = 30.0, batch_size: int = 100,
+                 on_published: Optional[Callable[[List[dict]], Awaitable[None]]] = None):
+        self.posts_collection = posts_collection
+        self.interval = interval
+        self.batch_size = batch_size
+        self.on_published = on_published
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, ids: List[str], now: Optional[datetime] = None,
+                      publish_at: Optional[datetime] = None) -> List[dict]:
+        """Publish the unpublished posts among ``ids``; returns the ones this call changed
+
+        ``publish_at`` overwrites the scheduled time, for posts published early.
+        """
+        now = now or datetime.utcnow()
+        token = uuid.uuid4().hex
+        update = {"published": True, "updated_at": now, "publish_token": token}
+        if publish_at is not None:
+            update["publish_at"] = publish_at
+        result = await self.posts_collection.update_many(
+            {"id": {"$in": ids}, "published": False}, {"$set": update}
+        )
+        if not result.modified_count:
+            return []
+        posts = await self.posts_collection.find(
+            {"id": {"$in": ids}, "publish_token": token}, {"_id": 0, "recent_comments": 0, "publish_token": 0}
+        ).to_list(length=None)
+        if posts and self.on_published is not None:
+            await self.on_published(posts)
+        return posts
+
+    async def publish_due(self, now: Optional[datetime] = None) -> int:
+        """Publish every post due at ``now``; returns how many this worker published"""
+        now = now or datetime.utcnow()
+        published = 0
+        while True:
+            due = await self.posts_collection.find(
+                due_query(now), {"_id": 0, "id": 1}
+            ).sort([("publish_at", 1)]).limit(self.batch_size).to_list(length=self.batch_size)
+            changed = len(await self.publish([post["id"] for post in due], now)) if due else 0
+            published += changed
+            # A full batch may mean more are due; if another worker took this
+            # one, leave the rest to the next tick rather than spin
+            if len(due) < self.batch_size or not changed:
+                break
+        if published:
+            logger.info(f"Published {published} scheduled posts")
+        return published
+
+    async def start(self):
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.publish_due()
+            except Exception as e:
+                logger.error(f"Scheduled publishing failed: {str(e)}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,358 @@
+"""In-process full-text search over blog posts and comments.
+
+Each worker keeps an inverted index (term -> {doc number: weight}) built from
+Mongo at startup and kept current incrementally: ``create_blog_post`` and
+``create_comment`` add their document directly, and a periodic sync picks up
+posts written by other workers via an ``updated_at`` watermark. Timestamps
+are set before the write commits, so a write can become visible after a
+later-stamped one; each sync re-reads an overlap window behind the watermark
+and skips the versions it has already indexed. Only short
+fields are kept in memory; snippets for a result page are built from one
+``$in`` query.
+"""
+import asyncio
+import heapq
+import html
+import logging
+import math
+import re
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how in is it its of on or that the this to was were "
+    "what when which who why will with you your".split()
+)
+
+POST_FIELD_WEIGHTS = {"title": 4.0, "tags": 3.0, "excerpt": 2.0, "content": 1.0}
+COMMENT_FIELD_WEIGHTS = {"content": 1.0, "author_name": 0.5}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _field_text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value or "")
+
+
+class InvertedIndex:
+    """Weighted-term inverted index with AND queries and top-k scoring
+
+    When ``facet_field`` is set (e.g. ``tags``), its values are kept as
+    per-value document sets for filtering, and per-term facet counts are
+    maintained on write so single-term queries never count at read time.
+    The top of each queried term's ranking is kept in a small LRU that is
+    invalidated whenever that term's postings change.
+    """
+
+    def __init__(self, field_weights: Dict[str, float], stored_fields: Iterable[str],
+                 facet_field: Optional[str] = None, term_cache_size: int = 1024, ranked_depth: int = 100):
+        self.field_weights = field_weights
+        self.stored_fields = list(stored_fields)
+        self.facet_field = facet_field
+        self.term_cache_size = term_cache_size
+        self.ranked_depth = ranked_depth
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._facet_docs: Dict[str, Set[int]] = defaultdict(set)
+        self._term_facets: Dict[str, Counter] = defaultdict(Counter)
+        self._doc_terms: Dict[int, List[str]] = {}
+        self._stored: Dict[int, dict] = {}
+        self._doc_nums: Dict[str, int] = {}
+        self._next_num = 0
+        # term -> highest-weighted doc nums, best first
+        self._top_docs: "OrderedDict[str, List[int]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._stored)
+
+    def _facet_values(self, stored: dict) -> list:
+        return list(stored.get(self.facet_field) or ()) if self.facet_field else []
+
+    def add(self, doc: dict):
+        """Index ``doc`` by its ``id``, replacing any earlier version"""
+        self.remove(doc["id"])
+        weights: Dict[str, float] = defaultdict(float)
+        for field, weight in self.field_weights.items():
+            for token in tokenize(_field_text(doc.get(field))):
+                weights[token] += weight
+        if not weights:
+            return
+
+        num = self._next_num
+        self._next_num += 1
+        stored = {field: doc.get(field) for field in self.stored_fields}
+        facet_values = self._facet_values(stored)
+
+        # Log-scaled term weight, normalised by document length
+        scaled = {token: 1 + math.log1p(weight) for token, weight in weights.items()}
+        norm = math.sqrt(sum(w * w for w in scaled.values()))
+        for token, weight in scaled.items():
+            self._postings[token][num] = weight / norm
+            self._top_docs.pop(token, None)
+            if facet_values:
+                self._term_facets[token].update(facet_values)
+        for value in facet_values:
+            self._facet_docs[value].add(num)
+        self._doc_terms[num] = list(scaled)
+        self._stored[num] = stored
+        self._doc_nums[doc["id"]] = num
+
+    def remove(self, doc_id: str):
+        num = self._doc_nums.pop(doc_id, None)
+        if num is None:
+            return
+        stored = self._stored.pop(num, {})
+        facet_values = self._facet_values(stored)
+        for token in self._doc_terms.pop(num, []):
+            self._top_docs.pop(token, None)
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(num, None)
+                if not postings:
+                    del self._postings[token]
+            if facet_values:
+                self._term_facets[token].subtract(facet_values)
+                self._term_facets[token] = +self._term_facets[token]
+                if not self._term_facets[token]:
+                    del self._term_facets[token]
+        for value in facet_values:
+            docs = self._facet_docs.get(value)
+            if docs is not None:
+                docs.discard(num)
+                if not docs:
+                    del self._facet_docs[value]
+
+    def _count_facets(self, candidates: Set[int]) -> Dict[str, int]:
+        if not self.facet_field:
+            return {}
+        counts = {value: len(candidates & docs) for value, docs in self._facet_docs.items()}
+        return {value: n for value, n in sorted(counts.items(), key=lambda item: -item[1]) if n}
+
+    def _top(self, term: str, postings: Dict[int, float], n: int) -> List[int]:
+        if n > self.ranked_depth:
+            return heapq.nlargest(n, postings, key=postings.__getitem__)
+        top = self._top_docs.get(term)
+        if top is None:
+            top = heapq.nlargest(self.ranked_depth, postings, key=postings.__getitem__)
+            self._top_docs[term] = top
+            while len(self._top_docs) > self.term_cache_size:
+                self._top_docs.popitem(last=False)
+        else:
+            self._top_docs.move_to_end(term)
+        return top
+
+    def search(self, query: str, limit: int = 10, skip: int = 0, tags: Optional[List[str]] = None
+               ) -> Tuple[int, List[Tuple[float, dict]], Dict[str, int]]:
+        """Return (total matches, ranked page of (score, stored doc), facet counts)"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0, [], {}
+        postings = [self._postings.get(term) for term in terms]
+        if any(p is None for p in postings):
+            return 0, [], {}
+        idfs = [(p, math.log(1 + len(self._stored) / len(p))) for p in postings]
+
+        if len(terms) == 1 and not tags:
+            p, idf = idfs[0]
+            ranked = self._top(terms[0], p, skip + limit)
+            page = [(round(idf * p[num], 4), self._stored[num]) for num in ranked[skip:skip + limit]]
+            facets = dict(self._term_facets[terms[0]].most_common()) if self.facet_field else {}
+            return len(p), page, facets
+
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                return 0, [], {}
+        for tag in tags or ():
+            candidates &= self._facet_docs.get(tag, set())
+
+        if len(idfs) == 1:
+            p, idf = idfs[0]
+            scored = [(idf * p[num], num) for num in heapq.nlargest(skip + limit, candidates, key=p.__getitem__)]
+        else:
+            scored = heapq.nlargest(
+                skip + limit,
+                ((sum(idf * p[num] for p, idf in idfs), num) for num in candidates),
+            )
+        page = [(round(score, 4), self._stored[num]) for score, num in scored[skip:skip + limit]]
+        return len(candidates), page, self._count_facets(candidates)
+
+
+def highlight(text: str, terms: List[str], width: int = 160) -> str:
+    """HTML-escaped excerpt of ``text`` around the first match, with matches in <mark>"""
+    if not text:
+        return ""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE) if terms else None
+    match = pattern.search(text) if pattern else None
+    start = max(0, match.start() - width // 3) if match else 0
+    window = text[start:start + width]
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(text) else ""
+    if pattern is None:
+        return prefix + html.escape(window) + suffix
+
+    pieces, last = [], 0
+    for m in pattern.finditer(window):
+        pieces.append(html.escape(window[last:m.start()]))
+        pieces.append("<mark>" + html.escape(m.group(0)) + "</mark>")
+        last = m.end()
+    pieces.append(html.escape(window[last:]))
+    return prefix + "".join(pieces) + suffix
+
+
+class Watermark:
+    """Newest timestamp synced from one field, re-read with an overlap for late commits"""
+
+    def __init__(self, field: str, overlap: float):
+        self.field = field
+        self.overlap = timedelta(seconds=overlap)
+        self.value: Optional[datetime] = None
+        # id -> timestamp of the version already applied, within the overlap
+        self._seen: Dict[str, datetime] = {}
+
+    def _since(self) -> datetime:
+        return self.value - self.overlap if self.value - datetime.min > self.overlap else datetime.min
+
+    def query(self) -> dict:
+        if self.value is None:
+            return {}
+        return {self.field: {"$gte": self._since()}}
+
+    def advance(self, doc: dict) -> bool:
+        """Record ``doc``; False if this version of it was already applied"""
+        stamp = doc.get(self.field)
+        if stamp is None:
+            return True
+        if self._seen.get(doc["id"]) == stamp:
+            return False
+        self._seen[doc["id"]] = stamp
+        if self.value is None or stamp > self.value:
+            self.value = stamp
+        return True
+
+    def prune(self):
+        """Forget versions that have fallen behind the overlap window"""
+        if self.value is None:
+            return
+        since = self._since()
+        self._seen = {doc_id: stamp for doc_id, stamp in self._seen.items() if stamp >= since}
+
+
+class SearchService:
+    """Post and comment indexes for one worker, kept in sync with Mongo"""
+
+    def __init__(self, posts_collection, comments_collection, sync_interval: float = 30.0,
+                 sync_overlap: float = 10.0):
+        self.posts_collection = posts_collection
+        self.comments_collection = comments_collection
+        self.sync_interval = sync_interval
+        self.posts = InvertedIndex(POST_FIELD_WEIGHTS, ["id", "title", "excerpt", "tags", "author", "created_at"],
+                                   facet_field="tags")
+        self.comments = InvertedIndex(COMMENT_FIELD_WEIGHTS, ["id", "post_id", "author_name", "created_at"])
+        self.ready = asyncio.Event()
+        self._posts_watermark = Watermark("updated_at", sync_overlap)
+        self._comments_watermark = Watermark("created_at", sync_overlap)
+        self._moderated_watermark = Watermark("moderated_at", sync_overlap)
+        self._task: Optional[asyncio.Task] = None
+
+    def add_post(self, post: dict):
+        if post.get("published"):
+            self.posts.add(post)
+        else:
+            self.posts.remove(post["id"])
+
+    def add_comment(self, comment: dict):
+        if comment.get("approved"):
+            self.comments.add(comment)
+        else:
+            self.comments.remove(comment["id"])
+
+    async def sync(self):
+        """Index posts and comments written since the last sync"""
+        posts = self._posts_watermark
+        async for post in self.posts_collection.find(posts.query(), {"_id": 0}).sort("updated_at", 1):
+            if posts.advance(post):
+                self.add_post(post)
+        posts.prune()
+
+        comments, moderated = self._comments_watermark, self._moderated_watermark
+        first_pass = moderated.value is None
+        async for comment in self.comments_collection.find(
+            comments.query(), {"_id": 0, "email": 0}
+        ).sort("created_at", 1):
+            if comments.advance(comment):
+                self.add_comment(comment)
+            if first_pass:
+                moderated.advance(comment)
+        comments.prune()
+
+        # Approvals and rejections of older comments, made by any worker
+        if first_pass:
+            moderated.value = moderated.value or datetime.min
+            return
+        async for comment in self.comments_collection.find(
+            moderated.query(), {"_id": 0, "email": 0}
+        ).sort("moderated_at", 1):
+            if moderated.advance(comment):
+                self.add_comment(comment)
+        moderated.prune()
+
+    async def start(self):
+        self.ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sync()
+                if not self.ready.is_set():
+                    self.ready.set()
+                    logger.info(f"Search index built: {len(self.posts)} posts, {len(self.comments)} comments")
+            except Exception as e:
+                logger.error(f"Search index sync failed: {str(e)}")
+            await asyncio.sleep(self.sync_interval)
+
+    async def search_posts(self, query: str, limit: int = 10, skip: int = 0, tags: Optional[List[str]] = None) -> dict:
+        total, page, facets = self.posts.search(query, limit=limit, skip=skip, tags=tags)
+        terms = tokenize(query)
+        bodies = {}
+        if page:
+            ids = [doc["id"] for _, doc in page]
+            async for post in self.posts_collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "content": 1}):
+                bodies[post["id"]] = post.get("content", "")
+        results = [
+            dict(doc, score=score,
+                 title_highlighted=highlight(doc.get("title") or "", terms, width=len(doc.get("title") or "")),
+                 snippet=highlight(bodies.get(doc["id"]) or doc.get("excerpt") or "", terms))
+            for score, doc in page
+        ]
+        return {"total": total, "results": results, "facets": {"tags": facets}}
+
+    async def search_comments(self, query: str, limit: int = 10, skip: int = 0) -> dict:
+        total, page, _ = self.comments.search(query, limit=limit, skip=skip)
+        terms = tokenize(query)
+        bodies = {}
+        if page:
+            ids = [doc["id"] for _, doc in page]
+            async for comment in self.comments_collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "content": 1}):
+                bodies[comment["id"]] = comment.get("content", "")
+        results = [dict(doc, score=score, snippet=highlight(bodies.get(doc["id"], ""), terms)) for score, doc in page]
+        return {"total": total, "results": results, "facets": {}}
@@ -0,0 +1,218 @@
+"""Production entry point: a preforking uvicorn supervisor.
+
+    python backend/serve.py            # SERVER_WORKERS processes on SERVER_PORT
+
+The parent imports the app once, binds the listening socket, then forks
+``SERVER_WORKERS`` children that share it (the kernel spreads connections
+between them). Each child runs its own event loop and app lifespan, so the
+MongoDB client, background tasks and in-memory buffers are created per worker
+after the fork; none is inherited from the parent, which never opens one.
+uvloop and httptools are used when installed.
+
+On SIGTERM or SIGINT the parent forwards SIGTERM to every worker. A worker
+stops accepting connections, waits up to SERVER_GRACEFUL_TIMEOUT seconds for
+in-flight requests, then runs the lifespan shutdown, which flushes buffered
+view counts and stops the email outbox. Workers still alive after that are
+killed. A worker that dies on its own is replaced.
+
+SIGHUP to the parent is relayed to every worker, which then runs the
+``on_reload`` hook (for the app, a catalog reload if the file changed) on
+its event loop.
+Workers find the parent through SERVER_SUPERVISOR_PID, so
+/api/catalog/reload on any one worker reloads them all.
+
+Per-worker state to keep in mind when running more than one: rate limits
+are per process unless RATE_LIMIT_BACKEND=mongo, the response cache is per
+process unless RESPONSE_CACHE_SHARED=true, and every worker starts its own
+PASSWORD_HASH_WORKERS pool.
+"""
+import asyncio
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import uvicorn
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+logger = logging.getLogger("serve")
+
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.environ.get('SERVER_PORT', '8001'))
+# WEB_CONCURRENCY is what most platforms set for the process count
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', os.environ.get('WEB_CONCURRENCY', str(os.cpu_count() or 1))))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', '30'))
+SERVER_KEEPALIVE_TIMEOUT = int(os.environ.get('SERVER_KEEPALIVE_TIMEOUT', '5'))
+SERVER_BACKLOG = int(os.environ.get('SERVER_BACKLOG', '2048'))
+SERVER_ACCESS_LOG = os.environ.get('SERVER_ACCESS_LOG', 'false').lower() == 'true'
+# Restarting a worker that keeps dying straight away would spin the CPU
+WORKER_RESTART_DELAY = 1.0
+
+
+def event_loop() -> str:
+    try:
+        import uvloop  # noqa: F401
+        return "uvloop"
+    except ImportError:
+        return "asyncio"
+
+
+def http_protocol() -> str:
+    try:
+        import httptools  # noqa: F401
+        return "httptools"
+    except ImportError:
+        return "h11"
+
+
+def build_config(app, host: str = SERVER_HOST, port: int = SERVER_PORT) -> uvicorn.Config:
+    return uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop=event_loop(),
+        http=http_protocol(),
+        lifespan="on",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        access_log=SERVER_ACCESS_LOG,
+    )
+
+
+class Supervisor:
+    """Forks workers serving one pre-bound socket and shuts them down together"""
+
+    def __init__(self, config: uvicorn.Config, workers: int, on_reload: Optional[Callable[[], None]] = None):
+        self.config = config
+        self.workers = max(1, workers)
+        self.on_reload = on_reload
+        self.children: Dict[int, int] = {}  # pid -> worker number
+        self.should_exit = False
+
+    def run(self):
+        sock = self.config.bind_socket()
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        signal.signal(signal.SIGHUP, self.handle_reload)
+        # Inherited by the workers, so they can ask for a reload everywhere
+        os.environ["SERVER_SUPERVISOR_PID"] = str(os.getpid())
+        logger.info(f"Starting {self.workers} workers on {self.config.host}:{self.config.port} "
+                    f"({self.config.loop}, {self.config.http}), supervisor pid {os.getpid()}")
+        try:
+            for number in range(self.workers):
+                self.spawn(number, sock)
+            while not self.should_exit:
+                self.reap(sock)
+                time.sleep(0.2)
+        finally:
+            self.stop()
+            sock.close()
+
+    def handle_exit(self, signum, frame):
+        self.should_exit = True
+
+    def handle_reload(self, signum, frame):
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except ProcessLookupError:
+                pass
+
+    def handle_reload_in_worker(self, signum, frame):
+        # Run the hook on the event loop, not inside whatever the signal interrupted
+        try:
+            asyncio.get_running_loop().call_soon_threadsafe(self.reload_worker)
+        except RuntimeError:
+            self.reload_worker()
+
+    def reload_worker(self):
+        try:
+            self.on_reload()
+        except Exception as e:
+            logger.error(f"Reload in worker pid {os.getpid()} failed: {str(e)}")
+
+    def spawn(self, number: int, sock):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = number
+            return
+        # Worker: uvicorn installs its own SIGTERM/SIGINT handlers
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGHUP, self.handle_reload_in_worker if self.on_reload else signal.SIG_IGN)
+        status = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[sock])
+        except BaseException as e:
+            logger.error(f"Worker {number} crashed: {str(e)}")
+            status = 1
+        finally:
+            logging.shutdown()
+            os._exit(status)
+
+    def reap(self, sock):
+        """Replace workers that exited while the supervisor is still running"""
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            number = self.children.pop(pid, None)
+            if number is None or self.should_exit:
+                continue
+            logger.error(f"Worker {number} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}; "
+                         "restarting")
+            time.sleep(WORKER_RESTART_DELAY)
+            self.spawn(number, sock)
+
+    def stop(self):
+        """SIGTERM every worker, wait for them to drain, then kill stragglers"""
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        # Draining plus the lifespan shutdown, with a margin for the final flush
+        deadline = time.monotonic() + (self.config.timeout_graceful_shutdown or 0) + 10
+        while self.children and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in list(self.children):
+            logger.error(f"Worker pid {pid} did not stop in time; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            self.children.pop(pid, None)
+        logger.info("All workers stopped")
+
+
+def main(app=None, workers: int = SERVER_WORKERS, host: str = SERVER_HOST, port: int = SERVER_PORT,
+         on_reload: Optional[Callable[[], None]] = None):
+    logging.basicConfig(level=logging.INFO)
+    if app is None:
+        # Imported once here so forked workers share the loaded code pages
+        import server
+
+        if server.client is not None:
+            raise RuntimeError("MongoDB client opened before fork; it must be created in the app lifespan")
+        app = server.app
+        on_reload = server.reload_catalog_file
+    config = build_config(app, host=host, port=port)
+    if workers <= 1 or not hasattr(os, "fork"):
+        uvicorn.Server(config).run()
+        return
+    Supervisor(config, workers, on_reload).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,325 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, EmailStr
-from pymongo import MongoClient
-from typing import Optional, List
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, List, Literal
+import math
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import signal
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
+from bulk import BulkPayloadError, ingest
+from catalog import Catalog
+from compression import CompressionMiddleware
+from comment_stats import CommentStatsReconciler, record_comments
+from counts import CountCache
+from email_outbox import EmailOutbox
+from export import MEDIA_TYPES, parse_checkpoint, resume_query, stream_export
+from indexes import ensure_indexes
+from migrations import apply_migrations
+from metrics import (COMMENTS_MODERATED, CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY, SUBMISSIONS_REJECTED,
+                     Counter, MetricsMiddleware, MongoCommandTimer, PoolMonitor)
+from moderation import APPROVED, PENDING, REJECTED, Moderator, SpamScreen, load_scorer
+from passwords import PasswordHasher
+from rate_limit import MemoryBackend, MongoBackend, RateLimiter, fingerprint, parse_limit
+from pagination import InvalidCursor, after_cursor, next_cursor, sort_spec
+from response_cache import MongoCacheTier, ResponseCache, cache_key, cached_json_response
+from scheduler import PublishScheduler
+from search import SearchService
+from tag_counts import list_tags, parse_tags, record_posts as record_post_tags, record_publication, tags_query
+from view_counter import ViewCounter
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="GoTech Solutions API", version="1.0.0")
+# MongoDB connection
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
+DB_NAME = os.environ.get('DB_NAME', 'gotech_solutions')
+
+# Connection pool and timeouts; unset driver defaults would let a slow primary
+# hold handlers indefinitely
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '10000'))
+
+# Exports may read from secondaries; they are long scans, resumable from a
+# checkpoint, and fill no cache. Everything else stays on the primary: a
+# listing read from a lagging secondary right after a write would put the
+# stale page back into the response or count cache for a full TTL. -1 leaves
+# staleness unbounded.
+READ_PREFERENCES = {
+    'primary': Primary, 'primaryPreferred': PrimaryPreferred, 'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred, 'nearest': Nearest,
+}
+MONGO_EXPORT_READ_PREFERENCE = os.environ.get('MONGO_EXPORT_READ_PREFERENCE', 'secondaryPreferred')
+MONGO_EXPORT_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_EXPORT_MAX_STALENESS_SECONDS', '-1'))
+
+# Email configuration (you'll need to set these environment variables)
+SMTP_SERVER = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', '587'))
+SMTP_USE_TLS = os.environ.get('SMTP_USE_TLS', 'true').lower() == 'true'
+EMAIL_ADDRESS = os.environ.get('EMAIL_ADDRESS', 'geoffreyokoliolukaka@gmail.com')
+EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD', '')
+# Notifications are queued only when credentials are configured, unless forced
+# on (e.g. for an unauthenticated local relay).
+EMAIL_ENABLED = os.environ.get('EMAIL_ENABLED', 'true' if EMAIL_PASSWORD else 'false').lower() == 'true'
+EMAIL_WORKERS = int(os.environ.get('EMAIL_WORKERS', '2'))
+EMAIL_BATCH_SIZE = int(os.environ.get('EMAIL_BATCH_SIZE', '20'))
+EMAIL_MAX_ATTEMPTS = int(os.environ.get('EMAIL_MAX_ATTEMPTS', '5'))
+
+# Listing totals are cached per query shape for this many seconds
+COUNT_CACHE_TTL = float(os.environ.get('COUNT_CACHE_TTL', '30'))
+COUNT_CACHE_MAX_ENTRIES = int(os.environ.get('COUNT_CACHE_MAX_ENTRIES', '256'))
+count_cache = CountCache(ttl=COUNT_CACHE_TTL, max_entries=COUNT_CACHE_MAX_ENTRIES)
+
+# Blog post views are buffered and flushed in batches
+VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', '5'))
+VIEW_FLUSH_THRESHOLD = int(os.environ.get('VIEW_FLUSH_THRESHOLD', '1000'))
+
+# Rendered blog responses are cached in-process; enable the shared tier to let
+# several workers reuse each other's entries through Mongo.
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '10'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+RESPONSE_CACHE_SHARED = os.environ.get('RESPONSE_CACHE_SHARED', 'false').lower() == 'true'
+RESPONSE_CACHE_SHARED_TTL = float(os.environ.get('RESPONSE_CACHE_SHARED_TTL', '60'))
+response_cache = ResponseCache(max_entries=RESPONSE_CACHE_MAX_ENTRIES, ttl=RESPONSE_CACHE_TTL)
+
+# Bulk ingestion: items per insert_many and per request, and the largest
+# JSON array body (NDJSON is streamed and only bounded by the item count)
+BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE', '500'))
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '50000'))
+BULK_MAX_BYTES = int(os.environ.get('BULK_MAX_BYTES', str(10 * 1024 * 1024)))
+
+# Streaming exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '1000'))
+CONTACT_EXPORT_FIELDS = ["id", "name", "email", "company", "message", "service", "submitted_at", "status"]
+COMMENT_EXPORT_FIELDS = ["id", "post_id", "author_name", "content", "created_at", "approved", "likes"]
+
+# Password hashing runs in a process pool; the first scheme hashes new
+# passwords and the others are still accepted, then upgraded on login.
+# (passlib's bcrypt backend needs bcrypt<4.1, hence pbkdf2_sha256 by default.)
+PASSWORD_SCHEMES = [s.strip() for s in os.environ.get('PASSWORD_SCHEMES', 'pbkdf2_sha256').split(',') if s.strip()]
+PASSWORD_ROUNDS = int(os.environ['PASSWORD_ROUNDS']) if os.environ.get('PASSWORD_ROUNDS') else None
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# Public submission limits, as "<burst>/<seconds>" per client IP and email;
+# CONTACT_RATE_LIMIT, COMMENT_RATE_LIMIT and BULK_RATE_LIMIT override them.
+# Bulk imports are charged once per request per IP, not per item, and their
+# items are only checked for duplicates. The mongo backend shares buckets
+# between workers; identical content is refused for SUBMISSION_DEDUP_WINDOW
+# seconds.
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_DEFAULTS = {"contact": "5/300", "comment": "10/60", "bulk": "10/3600"}
+RATE_LIMITS = {route: parse_limit(os.environ.get(f'{route.upper()}_RATE_LIMIT', spec))
+               for route, spec in RATE_LIMIT_DEFAULTS.items()}
+SUBMISSION_DEDUP_WINDOW = float(os.environ.get('SUBMISSION_DEDUP_WINDOW', '600'))
+# Only behind a proxy that sets X-Forwarded-For itself
+RATE_LIMIT_TRUST_FORWARDED = os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+
+# Posts embed their newest approved comments and a comment total; the
+# reconciler recomputes both from the comments collection (0 disables it)
+RECENT_COMMENTS_LIMIT = int(os.environ.get('RECENT_COMMENTS_LIMIT', '5'))
+COMMENT_RECONCILE_INTERVAL = float(os.environ.get('COMMENT_RECONCILE_INTERVAL', '3600'))
+
+# Moderation: "post" publishes comments at once and the spam screen pulls
+# suspicious ones back; "pre" holds every comment until a moderator approves.
+# SPAM_SCORER names a module:Class with async score(comment) -> 0..1 (empty disables)
+COMMENT_MODERATION = os.environ.get('COMMENT_MODERATION', 'post')
+SPAM_SCORER = os.environ.get('SPAM_SCORER', 'moderation:HeuristicSpamScorer')
+SPAM_HOLD_THRESHOLD = float(os.environ.get('SPAM_HOLD_THRESHOLD', '0.5'))
+SPAM_REJECT_THRESHOLD = float(os.environ.get('SPAM_REJECT_THRESHOLD', '0.9'))
+SPAM_SCREEN_WORKERS = int(os.environ.get('SPAM_SCREEN_WORKERS', '2'))
+SPAM_SWEEP_INTERVAL = float(os.environ.get('SPAM_SWEEP_INTERVAL', '300'))
+MODERATION_BATCH_SIZE = int(os.environ.get('MODERATION_BATCH_SIZE', '500'))
+MODERATION_MAX_IDS = int(os.environ.get('MODERATION_MAX_IDS', '10000'))
+
+# How often each worker publishes scheduled posts that have come due (0 disables)
+PUBLISH_SCHEDULER_INTERVAL = float(os.environ.get('PUBLISH_SCHEDULER_INTERVAL', '30'))
+PUBLISH_SCHEDULER_BATCH_SIZE = int(os.environ.get('PUBLISH_SCHEDULER_BATCH_SIZE', '100'))
+
+SEARCH_SYNC_INTERVAL = float(os.environ.get('SEARCH_SYNC_INTERVAL', '30'))
+# Seconds each sync re-reads behind its watermark, for writes that commit late
+SEARCH_SYNC_OVERLAP = float(os.environ.get('SEARCH_SYNC_OVERLAP', '10'))
+
+# Response compression (gzip, and Brotli when installed) above a size threshold
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Portfolio projects and testimonials, pre-serialized at startup
+CATALOG_PATH = os.environ.get('CATALOG_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog.json'))
+catalog = Catalog(CATALOG_PATH, compress_min_size=COMPRESSION_MIN_SIZE)
+
+# The client and collections are bound in lifespan so the motor client is
+# created on the event loop that serves requests.
+client: Optional[AsyncIOMotorClient] = None
+db = None
+contacts_collection = None
+blog_posts_collection = None
+comments_collection = None
+users_collection = None
+email_outbox_collection = None
+blog_tags_collection = None
+# Contacts and comments for the streaming exports, which may read from secondaries
+contacts_export = None
+comments_export = None
+email_outbox: Optional[EmailOutbox] = None
+view_counter: Optional[ViewCounter] = None
+search_service: Optional[SearchService] = None
+password_hasher: Optional[PasswordHasher] = None
+rate_limiter: Optional[RateLimiter] = None
+comment_reconciler: Optional[CommentStatsReconciler] = None
+moderator: Optional[Moderator] = None
+spam_screen: Optional[SpamScreen] = None
+publish_scheduler: Optional[PublishScheduler] = None
+
+mongo_command_timer = MongoCommandTimer()
+mongo_pool_monitor = PoolMonitor(max_pool_size=MONGO_MAX_POOL_SIZE)
+
+def export_read_preference():
+    if MONGO_EXPORT_READ_PREFERENCE == 'primary':
+        return Primary()
+    return READ_PREFERENCES[MONGO_EXPORT_READ_PREFERENCE](max_staleness=MONGO_EXPORT_MAX_STALENESS_SECONDS)
+
+def connect_to_mongo():
+    """Open the motor client and bind the collections"""
+    global client, db, contacts_collection, blog_posts_collection, comments_collection, users_collection
+    global email_outbox_collection, blog_tags_collection, contacts_export, comments_export
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        event_listeners=[mongo_command_timer, mongo_pool_monitor],
+    )
+    db = client[DB_NAME]
+    contacts_collection = db.contacts
+    blog_posts_collection = db.blog_posts
+    comments_collection = db.comments
+    users_collection = db.users
+    email_outbox_collection = db.email_outbox
+    blog_tags_collection = db.blog_tags
+    read_preference = export_read_preference()
+    contacts_export = db.get_collection("contacts", read_preference=read_preference)
+    comments_export = db.get_collection("comments", read_preference=read_preference)
+    logger.info("MongoDB client opened")
+
+def close_mongo_connection():
+    """Close the motor client"""
+    global client
+    if client is not None:
+        client.close()
+        client = None
+        logger.info("MongoDB client closed")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global email_outbox, view_counter, search_service, password_hasher, rate_limiter, comment_reconciler
+    global moderator, spam_screen, publish_scheduler
+    catalog.load()
+    connect_to_mongo()
+    count_cache.clear()
+    response_cache.clear()
+    response_cache.shared = MongoCacheTier(db.response_cache, ttl=RESPONSE_CACHE_SHARED_TTL) if RESPONSE_CACHE_SHARED else None
+    try:
+        await ensure_indexes(db)
+    except Exception as e:
+        logger.error(f"Failed to ensure indexes: {str(e)}")
+    try:
+        await apply_migrations(db)
+    except Exception as e:
+        logger.error(f"Failed to apply migrations: {str(e)}")
+    rate_limit_backend = MongoBackend(db.rate_limits, db.submission_fingerprints) if RATE_LIMIT_BACKEND == 'mongo' else MemoryBackend()
+    rate_limiter = RateLimiter(rate_limit_backend, {route: limit for route, limit in RATE_LIMITS.items() if limit},
+                               dedup_window=SUBMISSION_DEDUP_WINDOW)
+    if EMAIL_ENABLED:
+        email_outbox = EmailOutbox(
+            email_outbox_collection,
+            host=SMTP_SERVER,
+            port=SMTP_PORT,
+            sender=EMAIL_ADDRESS,
+            username=EMAIL_ADDRESS,
+            password=EMAIL_PASSWORD,
+            use_tls=SMTP_USE_TLS,
+            workers=EMAIL_WORKERS,
+            batch_size=EMAIL_BATCH_SIZE,
+            max_attempts=EMAIL_MAX_ATTEMPTS,
+        )
+        await email_outbox.start()
+    view_counter = ViewCounter(
+        blog_posts_collection,
+        flush_interval=VIEW_FLUSH_INTERVAL,
+        flush_threshold=VIEW_FLUSH_THRESHOLD,
+    )
+    await view_counter.start()
+    search_service = SearchService(blog_posts_collection, comments_collection, sync_interval=SEARCH_SYNC_INTERVAL,
+                                   sync_overlap=SEARCH_SYNC_OVERLAP)
+    await search_service.start()
+    password_hasher = PasswordHasher(PASSWORD_SCHEMES, rounds=PASSWORD_ROUNDS, workers=PASSWORD_HASH_WORKERS)
+    password_hasher.start()
+    comment_reconciler = CommentStatsReconciler(blog_posts_collection, comments_collection,
+                                                recent_limit=RECENT_COMMENTS_LIMIT, interval=COMMENT_RECONCILE_INTERVAL)
+    await comment_reconciler.start()
+    moderator = Moderator(comments_collection, blog_posts_collection, comment_reconciler.recent,
+                          on_change=moderation_changed, batch_size=MODERATION_BATCH_SIZE)
+    if SPAM_SCORER:
+        spam_screen = SpamScreen(comments_collection, moderator, load_scorer(SPAM_SCORER),
+                                 hold_threshold=SPAM_HOLD_THRESHOLD, reject_threshold=SPAM_REJECT_THRESHOLD,
+                                 workers=SPAM_SCREEN_WORKERS, sweep_interval=SPAM_SWEEP_INTERVAL)
+        await spam_screen.start()
+    publish_scheduler = PublishScheduler(blog_posts_collection, interval=PUBLISH_SCHEDULER_INTERVAL,
+                                         batch_size=PUBLISH_SCHEDULER_BATCH_SIZE, on_published=posts_published)
+    await publish_scheduler.start()
+    try:
+        yield
+    finally:
+        # Flush buffered writes first, while the client is certainly usable
+        try:
+            await view_counter.stop()
+        except Exception as e:
+            logger.error(f"Failed to flush pending views on shutdown: {str(e)}")
+        await publish_scheduler.stop()
+        if spam_screen is not None:
+            await spam_screen.stop()
+            spam_screen = None
+        await comment_reconciler.stop()
+        password_hasher.shutdown()
+        await search_service.stop()
+        if email_outbox is not None:
+            await email_outbox.stop()
+            email_outbox = None
+        close_mongo_connection()
+
+# orjson encodes every response, including the pre-rendered cached ones
+app = FastAPI(title="GoTech Solutions API", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
+
+# Compression runs inside the metrics middleware, so its cost shows in latencies
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+    )
+# Per-route latency, request and error metrics, served on /metrics
+app.add_middleware(MetricsMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -26,17 +330,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB connection
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017/')
-client = MongoClient(MONGO_URL)
-db = client.gotech_solutions
-
-# Collections
-contacts_collection = db.contacts
-blog_posts_collection = db.blog_posts
-comments_collection = db.comments
-users_collection = db.users
-
 # Pydantic models
 class ContactForm(BaseModel):
     name: str
@@ -51,6 +344,34 @@ class BlogPost(BaseModel):
     excerpt: str
     author: str = "Geoffrey Okoli"
     tags: List[str] = []
+    # A draft is never published until scheduled; a future publish_at schedules the post
+    draft: bool = False
+    publish_at: Optional[datetime] = None
+
+class PublishRequest(BaseModel):
+    # Omitted or in the past: publish now
+    publish_at: Optional[datetime] = None
+
+# Fields returned by blog listings; "summary" leaves out the article body.
+# comment_count in a cached listing may lag by up to RESPONSE_CACHE_TTL.
+POST_SUMMARY_FIELDS = ["id", "title", "excerpt", "author", "tags", "created_at", "updated_at", "published",
+                       "publish_at", "views", "likes", "comment_count"]
+POST_FULL_FIELDS = POST_SUMMARY_FIELDS + ["content"]
+
+def post_projection(view: str, fields: Optional[str] = None, sort_field: str = "created_at") -> dict:
+    """Mongo projection for a listing view or an explicit comma-separated field list"""
+    if fields:
+        requested = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in requested if name not in POST_FULL_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # id and the sort field are always needed for cursors
+        selected = ["id", sort_field] + [name for name in requested if name not in ("id", sort_field)]
+    else:
+        selected = POST_FULL_FIELDS if view == "full" else POST_SUMMARY_FIELDS
+    projection = {name: 1 for name in selected}
+    projection["_id"] = 0
+    return projection
 
 class Comment(BaseModel):
     post_id: str
@@ -63,184 +384,526 @@ class User(BaseModel):
     email: EmailStr
     password: str
 
-# Email configuration (you'll need to set these environment variables)
-SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
-EMAIL_ADDRESS = "geoffreyokoliolukaka@gmail.com"
-EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD', '')
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
 
-def send_email(to_email: str, subject: str, body: str):
-    """Send email notification"""
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_ADDRESS
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        
-        msg.attach(MIMEText(body, 'plain'))
-        
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        text = msg.as_string()
-        server.sendmail(EMAIL_ADDRESS, to_email, text)
-        server.quit()
-        
-        logger.info(f"Email sent successfully to {to_email}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send email: {str(e)}")
-        return False
+# Response models; list routes validate and serialize through these in one
+# pydantic-core pass instead of jsonable_encoder
+class ContactRecord(BaseModel):
+    id: str
+    name: str
+    email: str
+    company: Optional[str] = None
+    message: str
+    service: Optional[str] = None
+    submitted_at: datetime
+    status: str = "new"
+
+class ContactList(BaseModel):
+    contacts: List[ContactRecord]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+class CommentRecord(BaseModel):
+    id: str
+    post_id: str
+    author_name: str
+    content: str
+    created_at: datetime
+    approved: bool = True
+    likes: int = 0
+
+class CommentList(BaseModel):
+    comments: List[CommentRecord]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+class BlogPostRecord(BaseModel):
+    # Every field is optional because listings project a subset
+    id: str
+    title: Optional[str] = None
+    excerpt: Optional[str] = None
+    content: Optional[str] = None
+    author: Optional[str] = None
+    tags: Optional[List[str]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    published: Optional[bool] = None
+    publish_at: Optional[datetime] = None
+    views: Optional[int] = None
+    likes: Optional[int] = None
+    comment_count: Optional[int] = None
+
+class BlogPostList(BaseModel):
+    posts: List[BlogPostRecord]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+class BlogPostDetail(BlogPostRecord):
+    comments: Optional[CommentList] = None
+
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class TagList(BaseModel):
+    tags: List[TagCount]
+
+class ModerationRequest(BaseModel):
+    ids: List[str]
+
+class ModerationRecord(CommentRecord):
+    status: Literal["approved", "pending", "rejected"] = "approved"
+    spam_score: Optional[float] = None
+    moderated_at: Optional[datetime] = None
+    moderated_by: Optional[str] = None
+
+class ModerationList(BaseModel):
+    comments: List[ModerationRecord]
+    total: Optional[int] = None
+    skip: int
+    limit: int
+    next_cursor: Optional[str] = None
+
+def bson_time(moment: datetime) -> datetime:
+    """Naive UTC at BSON date precision, so built documents match what is stored"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment.replace(microsecond=moment.microsecond // 1000 * 1000)
+
+def utc_now() -> datetime:
+    return bson_time(datetime.utcnow())
+
+# Document builders shared by the single and bulk write routes
+def build_contact_doc(contact: ContactForm) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "name": contact.name,
+        "email": contact.email,
+        "company": contact.company,
+        "message": contact.message,
+        "service": contact.service,
+        "submitted_at": utc_now(),
+        "status": "new"
+    }
+
+def contact_notification(contact_doc: dict):
+    """Subject and body of the notification email to Geoffrey"""
+    email_subject = f"New Contact Form Submission - {contact_doc['service'] or 'General Inquiry'}"
+    email_body = f"""
+New contact form submission received:
+
+Name: {contact_doc['name']}
+Email: {contact_doc['email']}
+Company: {contact_doc['company'] or 'Not provided'}
+Service: {contact_doc['service'] or 'Not specified'}
+
+Message:
+{contact_doc['message']}
+
+Submitted at: {contact_doc['submitted_at']}
+Contact ID: {contact_doc['id']}
+        """
+    return email_subject, email_body
+
+def build_post_doc(post: BlogPost) -> dict:
+    now = utc_now()
+    if post.draft:
+        publish_at = None
+    else:
+        publish_at = bson_time(post.publish_at) if post.publish_at else now
+    return {
+        "id": str(uuid.uuid4()),
+        "title": post.title,
+        "content": post.content,
+        "excerpt": post.excerpt,
+        "author": post.author,
+        "tags": post.tags,
+        "created_at": now,
+        "updated_at": now,
+        "published": publish_at is not None and publish_at <= now,
+        "publish_at": publish_at,
+        "views": 0,
+        "likes": 0,
+        "comment_count": 0,
+        "recent_comments": []
+    }
+
+def build_comment_doc(post_id: str, comment: Comment) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "post_id": post_id,
+        "author_name": comment.author_name,
+        "content": comment.content,
+        "email": comment.email,
+        "created_at": utc_now(),
+        "status": APPROVED if COMMENT_MODERATION == 'post' else PENDING,
+        "approved": COMMENT_MODERATION == 'post',
+        "spam_score": None,  # Set by the spam screen after the response
+        "likes": 0
+    }
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "GoTech Solutions API", "version": "1.0.0"}
 
 @app.get("/api/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        db.command('ping')
-        return {"status": "healthy", "database": "connected"}
+        await db.command('ping')
+        servers = mongo_pool_monitor.snapshot()
+        # Operations queued for a connection mean the pool is the bottleneck
+        saturated = any(pool["waiting"] > 0 for pool in servers.values())
+        return {
+            "status": "degraded" if saturated else "healthy",
+            "database": "connected",
+            "pool": {
+                "max_size": MONGO_MAX_POOL_SIZE,
+                "min_size": MONGO_MIN_POOL_SIZE,
+                "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                "servers": servers
+            }
+        }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Service unhealthy")
 
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else ""
+
+async def guard_submission(request: Request, route: str, email: Optional[str], *content) -> Optional[str]:
+    """Refuse over-limit or duplicate submissions; returns the content fingerprint"""
+    clients = ["ip:" + client_ip(request), "email:" + email.lower() if email else ""]
+    digest = fingerprint(*content)
+    try:
+        retry_after = await rate_limiter.check(route, *clients)
+        first = retry_after is None and await rate_limiter.first_submission(route, digest)
+    except Exception as e:
+        # Fail open: a limiter outage should not take the forms down with it
+        logger.error(f"Rate limiter unavailable: {str(e)}")
+        return None
+    if retry_after is not None:
+        SUBMISSIONS_REJECTED.inc(route, "rate_limited")
+        raise HTTPException(status_code=429, detail="Too many submissions, please try again later",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+    if not first:
+        SUBMISSIONS_REJECTED.inc(route, "duplicate")
+        raise HTTPException(status_code=409, detail="Duplicate submission")
+    return digest
+
+async def guard_bulk_import(request: Request):
+    """Refuse a bulk import over the client's "bulk" limit; one token per request, whatever its size"""
+    try:
+        retry_after = await rate_limiter.check("bulk", "ip:" + client_ip(request))
+    except Exception as e:
+        logger.error(f"Rate limiter unavailable: {str(e)}")
+        return
+    if retry_after is not None:
+        SUBMISSIONS_REJECTED.inc("bulk", "rate_limited")
+        raise HTTPException(status_code=429, detail="Too many imports, please try again later",
+                            headers={"Retry-After": str(math.ceil(retry_after))})
+
+async def duplicate_bulk_items(route: str, chunk, *fields: str) -> Dict[int, str]:
+    """Items of a bulk chunk already submitted within the dedup window (index -> reason)
+
+    Fingerprints are shared with the single route, so replaying queued
+    submissions that already arrived one by one stores nothing twice.
+    """
+    refused = {}
+    try:
+        for index, doc in chunk:
+            if not await rate_limiter.first_submission(route, fingerprint(*(doc.get(field) for field in fields))):
+                refused[index] = "Duplicate submission"
+    except Exception as e:
+        logger.error(f"Rate limiter unavailable: {str(e)}")
+    if refused:
+        SUBMISSIONS_REJECTED.inc(route, "duplicate", amount=len(refused))
+    return refused
+
+async def release_submission(route: str, digest: Optional[str]):
+    """Forget the fingerprint of a submission that was not stored, so it can be retried"""
+    if digest is None:
+        return
+    try:
+        await rate_limiter.forget_submission(route, digest)
+    except Exception as e:
+        logger.error(f"Failed to release submission fingerprint: {str(e)}")
+
+async def posts_published(posts: List[dict]):
+    """Bring scheduled posts that just went live into tag counts, search and listings"""
+    for post in posts:
+        search_service.add_post(post)
+    await record_publication(blog_tags_collection, posts)
+    count_cache.invalidate(blog_posts_collection.name)
+    await response_cache.invalidate("/api/blog/posts")
+    await response_cache.invalidate("/api/blog/tags")
+
+async def moderation_changed(comments: List[dict]):
+    """Make approvals and rejections visible to readers of this worker straight away"""
+    for comment in comments:
+        search_service.add_comment(comment)
+        COMMENTS_MODERATED.inc(comment["status"], comment["moderated_by"])
+    count_cache.invalidate(comments_collection.name)
+    # Post pages and listings both embed comment stats
+    await response_cache.invalidate("/api/blog/posts")
+
 @app.post("/api/contact")
-def submit_contact_form(contact: ContactForm):
+async def submit_contact_form(contact: ContactForm, request: Request):
     """Submit contact form"""
+    digest = await guard_submission(request, "contact", contact.email, contact.email, contact.message)
     try:
         # Create contact document
-        contact_doc = {
-            "id": str(uuid.uuid4()),
-            "name": contact.name,
-            "email": contact.email,
-            "company": contact.company,
-            "message": contact.message,
-            "service": contact.service,
-            "submitted_at": datetime.utcnow().isoformat(),
-            "status": "new"
-        }
+        contact_doc = build_contact_doc(contact)
         
         # Save to database
-        result = contacts_collection.insert_one(contact_doc)
+        result = await contacts_collection.insert_one(contact_doc)
+        count_cache.record_insert(contacts_collection.name, contact_doc)
         logger.info(f"Contact form submitted: {contact_doc['id']}")
         
-        # Send notification email to Geoffrey
-        email_subject = f"New Contact Form Submission - {contact.service or 'General Inquiry'}"
-        email_body = f"""
-New contact form submission received:
-
-Name: {contact.name}
-Email: {contact.email}
-Company: {contact.company or 'Not provided'}
-Service: {contact.service or 'Not specified'}
-
-Message:
-{contact.message}
-
-Submitted at: {contact_doc['submitted_at']}
-Contact ID: {contact_doc['id']}
-        """
-        
-        # Send email (if email credentials are configured)
-        if EMAIL_PASSWORD:
-            send_email(EMAIL_ADDRESS, email_subject, email_body)
+        # Queue the notification; delivery happens off the request path
+        if email_outbox is not None:
+            await email_outbox.enqueue(EMAIL_ADDRESS, *contact_notification(contact_doc))
         
         return {"message": "Contact form submitted successfully", "id": contact_doc['id']}
         
     except Exception as e:
+        await release_submission("contact", digest)
         logger.error(f"Error submitting contact form: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to submit contact form")
 
-@app.get("/api/contacts")
-def get_contacts(skip: int = 0, limit: int = 50):
+@app.get("/api/contacts", response_model=ContactList)
+async def get_contacts(skip: int = 0, limit: int = 50, cursor: Optional[str] = None, include_total: bool = True):
     """Get contact form submissions (admin endpoint)"""
     try:
-        contacts = list(contacts_collection.find(
-            {},
+        contacts = await contacts_collection.find(
+            after_cursor({}, "submitted_at", cursor),
             {"_id": 0}
-        ).skip(skip).limit(limit).sort("submitted_at", -1))
+        ).skip(0 if cursor else skip).limit(limit).sort(sort_spec("submitted_at")).to_list(length=limit)
         
-        total = contacts_collection.count_documents({})
+        total = await count_cache.count(contacts_collection, {}) if include_total else None
         
         return {
             "contacts": contacts,
             "total": total,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor(contacts, "submitted_at", limit)
         }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching contacts: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch contacts")
 
+def export_response(request: Request, cursor, fields: List[str], format: str, batch_size: int,
+                    compress: bool, filename: str) -> StreamingResponse:
+    """Stream ``cursor`` as NDJSON or CSV, gzip-encoded when the client accepts it"""
+    compress = compress and "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}.{format}"'}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    else:
+        # compress=false asks for an identity stream; keep the middleware off it
+        headers["Cache-Control"] = "no-transform"
+    return StreamingResponse(
+        stream_export(cursor, fields, format, batch_size, compress),
+        media_type=MEDIA_TYPES[format],
+        headers=headers,
+    )
+
+def checkpoint(since: Optional[str]) -> Optional[datetime]:
+    try:
+        return parse_checkpoint(since)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since must be an ISO 8601 timestamp")
+
+@app.get("/api/contacts/export")
+async def export_contacts(request: Request, format: Literal["ndjson", "csv"] = "ndjson",
+                          since: Optional[str] = None, after_id: Optional[str] = None,
+                          batch_size: int = EXPORT_BATCH_SIZE, compress: bool = True):
+    """Stream all contact submissions, oldest first, resumable from a submitted_at checkpoint"""
+    cursor = contacts_export.find(
+        resume_query({}, "submitted_at", checkpoint(since), after_id),
+        {"_id": 0}
+    ).sort([("submitted_at", 1), ("id", 1)])
+    return export_response(request, cursor, CONTACT_EXPORT_FIELDS, format, max(1, batch_size), compress, "contacts")
+
+@app.get("/api/comments/export")
+async def export_comments(request: Request, post_id: Optional[str] = None,
+                          format: Literal["ndjson", "csv"] = "ndjson",
+                          since: Optional[str] = None, after_id: Optional[str] = None,
+                          batch_size: int = EXPORT_BATCH_SIZE, compress: bool = True):
+    """Stream comments (optionally for one post), oldest first, resumable from a created_at checkpoint"""
+    query = {"post_id": post_id} if post_id else {}
+    cursor = comments_export.find(
+        resume_query(query, "created_at", checkpoint(since), after_id),
+        {"_id": 0, "email": 0}  # Don't expose email addresses
+    ).sort([("created_at", 1), ("id", 1)])
+    return export_response(request, cursor, COMMENT_EXPORT_FIELDS, format, max(1, batch_size), compress, "comments")
+
 @app.post("/api/blog/posts")
-def create_blog_post(post: BlogPost):
+async def create_blog_post(post: BlogPost):
     """Create a new blog post"""
     try:
-        post_doc = {
-            "id": str(uuid.uuid4()),
-            "title": post.title,
-            "content": post.content,
-            "excerpt": post.excerpt,
-            "author": post.author,
-            "tags": post.tags,
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat(),
-            "published": True,
-            "views": 0,
-            "likes": 0
-        }
+        post_doc = build_post_doc(post)
         
-        result = blog_posts_collection.insert_one(post_doc)
+        result = await blog_posts_collection.insert_one(post_doc)
+        count_cache.record_insert(blog_posts_collection.name, post_doc)
+        await record_post_tags(blog_tags_collection, [post_doc])
+        await response_cache.invalidate("/api/blog/posts")
+        await response_cache.invalidate("/api/blog/tags")
+        search_service.add_post(post_doc)
         logger.info(f"Blog post created: {post_doc['id']}")
         
-        return {"message": "Blog post created successfully", "id": post_doc['id']}
+        return {"message": "Blog post created successfully", "id": post_doc['id'],
+                "published": post_doc['published'], "publish_at": post_doc['publish_at']}
         
     except Exception as e:
         logger.error(f"Error creating blog post: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create blog post")
 
-@app.get("/api/blog/posts")
-def get_blog_posts(published: bool = True, skip: int = 0, limit: int = 10):
-    """Get blog posts"""
+@app.post("/api/blog/posts/{post_id}/publish")
+async def publish_blog_post(post_id: str, schedule: Optional[PublishRequest] = None):
+    """Publish a draft or scheduled post now, or schedule it for ``publish_at``"""
     try:
+        now = utc_now()
+        publish_at = bson_time(schedule.publish_at) if schedule and schedule.publish_at else now
+        published = publish_at <= now
+        if published:
+            changed = len(await publish_scheduler.publish([post_id], now, publish_at=publish_at))
+        else:
+            result = await blog_posts_collection.update_one(
+                {"id": post_id, "published": False}, {"$set": {"publish_at": publish_at, "updated_at": now}}
+            )
+            changed = result.matched_count
+        if not changed:
+            post = await blog_posts_collection.find_one({"id": post_id}, {"_id": 0, "published": 1})
+            if not post:
+                raise HTTPException(status_code=404, detail="Blog post not found")
+            raise HTTPException(status_code=409, detail="Blog post is already published")
+        logger.info(f"Blog post {'published' if published else 'scheduled'}: {post_id}")
+        return {"message": "Blog post published" if published else "Blog post scheduled", "id": post_id,
+                "published": published, "publish_at": publish_at}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error publishing blog post: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to publish blog post")
+
+@app.get("/api/blog/posts", response_model=BlogPostList, response_model_exclude_unset=True)
+async def get_blog_posts(request: Request, published: bool = True, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, include_total: bool = True, view: Literal["summary", "full"] = "summary", fields: Optional[str] = None, tags: Optional[str] = None):
+    """Get blog posts, optionally only those carrying every tag in the comma-separated ``tags``"""
+    try:
+        key = cache_key(request)
+        cached = await response_cache.get(key)
+        if cached is not None:
+            return cached_json_response(request, cached)
+        generation = response_cache.generation
+        
         query = {"published": published} if published else {}
+        query.update(tags_query(parse_tags(tags)))
+        # Readers see posts in publication order; published=false lists every post, drafts included
+        sort_field = "publish_at" if published else "created_at"
         
-        posts = list(blog_posts_collection.find(
-            query,
-            {"_id": 0}
-        ).skip(skip).limit(limit).sort("created_at", -1))
+        posts = await blog_posts_collection.find(
+            after_cursor(query, sort_field, cursor),
+            post_projection(view, fields, sort_field)
+        ).skip(0 if cursor else skip).limit(limit).sort(sort_spec(sort_field)).to_list(length=limit)
         
-        total = blog_posts_collection.count_documents(query)
+        total = await count_cache.count(blog_posts_collection, query) if include_total else None
         
-        return {
+        entry = await response_cache.set(key, {
             "posts": posts,
             "total": total,
             "skip": skip,
-            "limit": limit
-        }
+            "limit": limit,
+            "next_cursor": next_cursor(posts, sort_field, limit)
+        }, generation)
+        return cached_json_response(request, entry)
+    except HTTPException:
+        raise
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching blog posts: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog posts")
 
-@app.get("/api/blog/posts/{post_id}")
-def get_blog_post(post_id: str):
-    """Get a specific blog post"""
+@app.get("/api/blog/search")
+async def search_blog(q: str, type: Literal["posts", "comments"] = "posts", tags: Optional[str] = None,
+                      skip: int = 0, limit: int = 10):
+    """Ranked full-text search over blog posts or comments"""
+    if not search_service.ready.is_set():
+        raise HTTPException(status_code=503, detail="Search index is warming up")
     try:
-        post = blog_posts_collection.find_one({"id": post_id}, {"_id": 0})
-        
-        if not post:
-            raise HTTPException(status_code=404, detail="Blog post not found")
-        
-        # Increment view count
-        blog_posts_collection.update_one(
-            {"id": post_id},
-            {"$inc": {"views": 1}}
-        )
+        if type == "comments":
+            results = await search_service.search_comments(q, limit=limit, skip=skip)
+        else:
+            results = await search_service.search_posts(q, limit=limit, skip=skip, tags=parse_tags(tags) or None)
+        return {"query": q, "type": type, "skip": skip, "limit": limit, **results}
+    except Exception as e:
+        logger.error(f"Error searching blog: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to search blog")
+
+@app.get("/api/blog/tags", response_model=TagList)
+async def get_blog_tags(request: Request, published: bool = True, limit: int = 100):
+    """Tags with their post counts, most used first, from the materialized tag counts"""
+    try:
+        key = cache_key(request)
+        cached = await response_cache.get(key)
+        if cached is None:
+            generation = response_cache.generation
+            tags = await list_tags(blog_tags_collection, published=published, limit=limit)
+            cached = await response_cache.set(key, {"tags": tags}, generation)
+        return cached_json_response(request, cached)
+    except Exception as e:
+        logger.error(f"Error fetching blog tags: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch blog tags")
+
+@app.get("/api/blog/posts/{post_id}", response_model=BlogPostDetail, response_model_exclude_unset=True)
+async def get_blog_post(post_id: str, request: Request, include_comments: bool = False, preview: bool = False):
+    """Get a specific blog post, optionally with its first page of comments; drafts need ``preview``"""
+    try:
+        key = cache_key(request)
+        cached = await response_cache.get(key)
+        if cached is None:
+            generation = response_cache.generation
+            projection = {"_id": 0} if include_comments else {"_id": 0, "recent_comments": 0}
+            query = {"id": post_id} if preview else {"id": post_id, "published": True}
+            post = await blog_posts_collection.find_one(query, projection)
+            
+            if not post:
+                raise HTTPException(status_code=404, detail="Blog post not found")
+            
+            # Include views not yet flushed
+            post["views"] = post.get("views", 0) + view_counter.pending(post_id)
+            if include_comments:
+                # Same shape as get_comments; next_cursor continues there
+                recent = post.pop("recent_comments", None) or []
+                total = post.get("comment_count", 0)
+                post["comments"] = {
+                    "comments": recent,
+                    "total": total,
+                    "skip": 0,
+                    "limit": RECENT_COMMENTS_LIMIT,
+                    "next_cursor": next_cursor(recent, "created_at", len(recent)) if total > len(recent) else None
+                }
+            cached = await response_cache.set(key, post, generation)
         
-        return post
+        view_counter.increment(post_id)
+        return cached_json_response(request, cached)
         
     except HTTPException:
         raise
@@ -249,83 +912,241 @@ def get_blog_post(post_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch blog post")
 
 @app.post("/api/blog/posts/{post_id}/comments")
-def create_comment(post_id: str, comment: Comment):
+async def create_comment(post_id: str, comment: Comment, request: Request):
     """Create a comment on a blog post"""
+    digest = await guard_submission(request, "comment", comment.email, post_id, comment.author_name, comment.content)
     try:
-        # Verify post exists
-        post = blog_posts_collection.find_one({"id": post_id})
+        # Verify post exists and readers can see it
+        post = await blog_posts_collection.find_one({"id": post_id, "published": True}, {"_id": 0, "id": 1})
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        comment_doc = {
-            "id": str(uuid.uuid4()),
-            "post_id": post_id,
-            "author_name": comment.author_name,
-            "content": comment.content,
-            "email": comment.email,
-            "created_at": datetime.utcnow().isoformat(),
-            "approved": True,  # Auto-approve for now
-            "likes": 0
-        }
+        comment_doc = build_comment_doc(post_id, comment)
         
-        result = comments_collection.insert_one(comment_doc)
+        result = await comments_collection.insert_one(comment_doc)
+        count_cache.record_insert(comments_collection.name, comment_doc)
+        await record_comments(blog_posts_collection, [comment_doc], RECENT_COMMENTS_LIMIT)
+        await response_cache.invalidate(f"/api/blog/posts/{post_id}")
+        search_service.add_comment(comment_doc)
+        if spam_screen is not None:
+            spam_screen.submit(comment_doc)
         logger.info(f"Comment created: {comment_doc['id']}")
         
-        return {"message": "Comment created successfully", "id": comment_doc['id']}
+        return {"message": "Comment created successfully", "id": comment_doc['id'], "status": comment_doc['status']}
         
     except HTTPException:
+        await release_submission("comment", digest)
         raise
     except Exception as e:
+        await release_submission("comment", digest)
         logger.error(f"Error creating comment: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to create comment")
 
-@app.get("/api/blog/posts/{post_id}/comments")
-def get_comments(post_id: str, approved: bool = True, skip: int = 0, limit: int = 50):
+@app.get("/api/blog/posts/{post_id}/comments", response_model=CommentList)
+async def get_comments(post_id: str, approved: bool = True, skip: int = 0, limit: int = 50, cursor: Optional[str] = None, include_total: bool = True):
     """Get comments for a blog post"""
     try:
         query = {"post_id": post_id}
         if approved:
             query["approved"] = True
         
-        comments = list(comments_collection.find(
-            query,
+        comments = await comments_collection.find(
+            after_cursor(query, "created_at", cursor),
             {"_id": 0, "email": 0}  # Don't expose email addresses
-        ).skip(skip).limit(limit).sort("created_at", -1))
+        ).skip(0 if cursor else skip).limit(limit).sort(sort_spec("created_at")).to_list(length=limit)
         
-        total = comments_collection.count_documents(query)
+        total = await count_cache.count(comments_collection, query) if include_total else None
         
         return {
             "comments": comments,
             "total": total,
             "skip": skip,
-            "limit": limit
+            "limit": limit,
+            "next_cursor": next_cursor(comments, "created_at", limit)
         }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching comments: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to fetch comments")
 
+@app.post("/api/contact/bulk")
+async def bulk_submit_contact_forms(request: Request, notify: bool = False):
+    """Import contact form submissions from a JSON array or NDJSON stream"""
+    await guard_bulk_import(request)
+
+    async def check_duplicates(chunk):
+        return await duplicate_bulk_items("contact", chunk, "email", "message")
+
+    async def on_inserted(docs):
+        for doc in docs:
+            count_cache.record_insert(contacts_collection.name, doc)
+            if notify and email_outbox is not None:
+                await email_outbox.enqueue(EMAIL_ADDRESS, *contact_notification(doc))
+
+    try:
+        result = await ingest(request, ContactForm, build_contact_doc, contacts_collection,
+                              BULK_CHUNK_SIZE, BULK_MAX_ITEMS, BULK_MAX_BYTES,
+                              check=check_duplicates, on_inserted=on_inserted)
+        logger.info(f"Bulk contact import: {len(result.ids)} inserted, {len(result.errors)} failed")
+        return result.as_dict()
+    except BulkPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing contacts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import contacts")
+
+@app.post("/api/blog/posts/bulk")
+async def bulk_create_blog_posts(request: Request):
+    """Import blog posts from a JSON array or NDJSON stream"""
+    await guard_bulk_import(request)
+
+    async def on_inserted(docs):
+        for doc in docs:
+            count_cache.record_insert(blog_posts_collection.name, doc)
+            search_service.add_post(doc)
+        await record_post_tags(blog_tags_collection, docs)
+        await response_cache.invalidate("/api/blog/posts")
+        await response_cache.invalidate("/api/blog/tags")
+
+    try:
+        result = await ingest(request, BlogPost, build_post_doc, blog_posts_collection,
+                              BULK_CHUNK_SIZE, BULK_MAX_ITEMS, BULK_MAX_BYTES, on_inserted=on_inserted)
+        logger.info(f"Bulk blog post import: {len(result.ids)} inserted, {len(result.errors)} failed")
+        return result.as_dict()
+    except BulkPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing blog posts: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import blog posts")
+
+@app.post("/api/blog/comments/bulk")
+async def bulk_create_comments(request: Request):
+    """Import comments from a JSON array or NDJSON stream; each item names its post_id"""
+    await guard_bulk_import(request)
+
+    async def check_posts(chunk):
+        # One $in lookup per chunk instead of a find_one per comment; drafts and
+        # scheduled posts take no comments, as on the single route
+        post_ids = list({doc["post_id"] for _, doc in chunk})
+        existing = {
+            post["id"] async for post in blog_posts_collection.find(
+                {"id": {"$in": post_ids}, "published": True}, {"_id": 0, "id": 1}
+            )
+        }
+        refused = {index: "Blog post not found" for index, doc in chunk if doc["post_id"] not in existing}
+        remaining = [(index, doc) for index, doc in chunk if index not in refused]
+        refused.update(await duplicate_bulk_items("comment", remaining, "post_id", "author_name", "content"))
+        return refused
+
+    async def on_inserted(docs):
+        for doc in docs:
+            count_cache.record_insert(comments_collection.name, doc)
+            search_service.add_comment(doc)
+            if spam_screen is not None:
+                spam_screen.submit(doc)
+        await record_comments(blog_posts_collection, docs, RECENT_COMMENTS_LIMIT)
+        await response_cache.invalidate("/api/blog/posts/")
+
+    try:
+        result = await ingest(request, Comment, lambda comment: build_comment_doc(comment.post_id, comment),
+                              comments_collection, BULK_CHUNK_SIZE, BULK_MAX_ITEMS, BULK_MAX_BYTES,
+                              check=check_posts, on_inserted=on_inserted)
+        logger.info(f"Bulk comment import: {len(result.ids)} inserted, {len(result.errors)} failed")
+        return result.as_dict()
+    except BulkPayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing comments: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to import comments")
+
+@app.post("/api/blog/comments/reconcile")
+async def reconcile_comment_stats(full: bool = False):
+    """Recompute comment totals and latest comments stored on posts"""
+    try:
+        repaired = await comment_reconciler.reconcile(full=full)
+        if repaired:
+            await response_cache.invalidate("/api/blog/posts")
+        return {"message": "Comment stats reconciled", "repaired": repaired}
+    except Exception as e:
+        logger.error(f"Error reconciling comment stats: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reconcile comment stats")
+
+@app.get("/api/moderation/comments", response_model=ModerationList)
+async def get_moderation_queue(status: Literal["pending", "rejected", "approved"] = "pending", skip: int = 0,
+                               limit: int = 50, cursor: Optional[str] = None, include_total: bool = True):
+    """Comments awaiting (or past) moderation, newest first"""
+    try:
+        query = {"status": status}
+        comments = await comments_collection.find(
+            after_cursor(query, "created_at", cursor),
+            {"_id": 0, "email": 0, "moderation_token": 0}
+        ).skip(0 if cursor else skip).limit(limit).sort(sort_spec("created_at")).to_list(length=limit)
+        
+        total = await comments_collection.count_documents(query) if include_total else None
+        
+        return {
+            "comments": comments,
+            "total": total,
+            "skip": skip,
+            "limit": limit,
+            "next_cursor": next_cursor(comments, "created_at", limit)
+        }
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching moderation queue: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to fetch moderation queue")
+
+async def moderate(ids: List[str], status: str) -> dict:
+    if len(ids) > MODERATION_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MODERATION_MAX_IDS} ids per request")
+    updated = await moderator.set_status(ids, status)
+    logger.info(f"Moderation: {updated} of {len(ids)} comments {status}")
+    return {"message": f"Comments {status}", "requested": len(ids), "updated": updated}
+
+@app.post("/api/moderation/comments/approve")
+async def approve_comments(request: ModerationRequest):
+    """Approve comments by id; they are visible to readers as soon as this returns"""
+    try:
+        return await moderate(request.ids, APPROVED)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error approving comments: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to approve comments")
+
+@app.post("/api/moderation/comments/reject")
+async def reject_comments(request: ModerationRequest):
+    """Reject comments by id, withdrawing any that were published"""
+    try:
+        return await moderate(request.ids, REJECTED)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rejecting comments: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reject comments")
+
 @app.post("/api/users/register")
-def register_user(user: User):
+async def register_user(user: User):
     """Register a new user"""
     try:
         # Check if user already exists
-        existing_user = users_collection.find_one({"email": user.email})
+        existing_user = await users_collection.find_one({"email": user.email})
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
         
-        # For now, we're storing passwords in plain text
-        # In production, you should hash passwords using bcrypt
         user_doc = {
             "id": str(uuid.uuid4()),
             "name": user.name,
             "email": user.email,
-            "password": user.password,  # Should be hashed in production
+            "password_hash": await password_hasher.hash(user.password),
             "avatar": None,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": utc_now(),
             "active": True
         }
         
-        result = users_collection.insert_one(user_doc)
+        result = await users_collection.insert_one(user_doc)
         logger.info(f"User registered: {user_doc['id']}")
         
         return {
@@ -337,80 +1158,98 @@ def register_user(user: User):
         
     except HTTPException:
         raise
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     except Exception as e:
         logger.error(f"Error registering user: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to register user")
 
+@app.post("/api/users/login")
+async def login_user(credentials: UserLogin):
+    """Verify a user's password, upgrading outdated hashes"""
+    try:
+        user = await users_collection.find_one({"email": credentials.email, "active": True}, {"_id": 0})
+        if not user:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        if user.get("password_hash"):
+            valid, new_hash = await password_hasher.verify(credentials.password, user["password_hash"])
+        else:
+            # Accounts registered before hashing still hold the plain password
+            valid, new_hash = await password_hasher.verify_legacy(credentials.password, user.get("password") or "")
+        if not valid:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        if new_hash:
+            await users_collection.update_one(
+                {"id": user["id"]},
+                {"$set": {"password_hash": new_hash}, "$unset": {"password": ""}}
+            )
+            logger.info(f"Password hash upgraded for user: {user['id']}")
+
+        return {
+            "message": "Login successful",
+            "user_id": user['id'],
+            "name": user['name'],
+            "email": user['email']
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error logging in user: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to log in")
+
+RESPONSE_CACHE_EVENTS = REGISTRY.register(Counter(
+    "response_cache_events_total", "Response cache lookups by outcome", ["outcome"]))
+
+def collect_cache_metrics():
+    stats = response_cache.stats()
+    for outcome in ("hits", "shared_hits", "misses"):
+        RESPONSE_CACHE_EVENTS.set(outcome, value=stats[outcome])
+
+REGISTRY.add_collector(collect_cache_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Response cache hit/miss counters"""
+    return response_cache.stats()
+
 @app.get("/api/portfolio/projects")
-def get_portfolio_projects(category: Optional[str] = None):
+async def get_portfolio_projects(request: Request, category: Optional[str] = None):
     """Get portfolio projects"""
-    # For now, return static data
-    # In a real implementation, this would come from the database
-    projects = [
-        {
-            "id": 1,
-            "title": "E-commerce Mobile App Redesign",
-            "category": "ux-ui",
-            "description": "Complete mobile app redesign focusing on user experience and conversion optimization",
-            "image": "https://images.pexels.com/photos/6373086/pexels-photo-6373086.jpeg",
-            "client": "TechCorp Solutions",
-            "technologies": ["Figma", "Adobe XD", "Principle"],
-            "year": "2024"
-        },
-        {
-            "id": 2,
-            "title": "SaaS Dashboard Interface",
-            "category": "ux-ui",
-            "description": "Modern dashboard design with intuitive navigation and data visualization",
-            "image": "https://images.pexels.com/photos/6612388/pexels-photo-6612388.jpeg",
-            "client": "DataFlow Inc",
-            "technologies": ["Figma", "React", "D3.js"],
-            "year": "2024"
-        },
-        # Add more projects as needed
-    ]
-    
-    if category and category != 'all':
-        projects = [p for p in projects if p['category'] == category]
-    
-    return {"projects": projects}
+    return cached_json_response(request, catalog.projects(category))
 
 @app.get("/api/testimonials")
-def get_testimonials():
+async def get_testimonials(request: Request):
     """Get client testimonials"""
-    # Static testimonials for now
-    testimonials = [
-        {
-            "id": 1,
-            "name": "Sarah Johnson",
-            "company": "TechCorp Solutions",
-            "text": "Geoffrey's UX design transformed our mobile app completely. User engagement increased by 150% after the redesign.",
-            "rating": 5,
-            "service": "UX/UI Design",
-            "date": "2024-01-15"
-        },
-        {
-            "id": 2,
-            "name": "Michael Chen",
-            "company": "DataFlow Inc",
-            "text": "The dashboard design exceeded our expectations. GoTech Solutions delivered exceptional quality on time.",
-            "rating": 5,
-            "service": "UX/UI Design",
-            "date": "2024-01-10"
-        },
-        {
-            "id": 3,
-            "name": "Emily Rodriguez",
-            "company": "StartupX",
-            "text": "The copywriting and brand strategy work was outstanding. Our conversion rates improved significantly.",
-            "rating": 5,
-            "service": "Copywriting",
-            "date": "2024-01-05"
-        }
-    ]
-    
-    return {"testimonials": testimonials}
+    return cached_json_response(request, catalog.testimonials())
+
+def reload_catalog_file():
+    """SIGHUP hook for serve.py workers; reloads only if the file changed since this worker read it"""
+    catalog.reload()
+
+@app.post("/api/catalog/reload")
+async def reload_catalog(force: bool = False):
+    """Reload portfolio projects and testimonials from the catalog file, in every worker"""
+    try:
+        reloaded = catalog.reload(force=force)
+        # Under serve.py each worker holds its own copy; the supervisor relays
+        # SIGHUP to all of them (force applies to this worker only)
+        supervisor_pid = os.environ.get('SERVER_SUPERVISOR_PID')
+        if supervisor_pid:
+            os.kill(int(supervisor_pid), signal.SIGHUP)
+        return {"message": "Catalog reloaded" if reloaded else "Catalog unchanged", "reloaded": reloaded}
+    except Exception as e:
+        logger.error(f"Error reloading catalog: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reload catalog")
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001)
+    # SERVER_WORKERS processes, uvloop/httptools when installed; see serve.py
+    from serve import main
+    main(app, on_reload=reload_catalog_file)
@@ -0,0 +1,107 @@
+"""Materialized per-tag post counts.
+
+The ``blog_tags`` collection holds one document per tag with the number of
+posts carrying it (``post_count``) and how many of those are published
+(``published_count``). Writes fold new posts in with ``$inc`` upserts, one
+per distinct tag, so ``/api/blog/tags`` is a small indexed read rather than
+an ``$unwind``/``$group`` over every post. ``rebuild`` recomputes the
+collection from the posts for backfills and repairs.
+"""
+import logging
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+
+def parse_tags(value: Optional[str]) -> List[str]:
+    """Comma-separated tag list from a query string, without blanks or repeats"""
+    if not value:
+        return []
+    return list(dict.fromkeys(tag.strip() for tag in value.split(",") if tag.strip()))
+
+
+def tags_query(tags: List[str]) -> dict:
+    """Filter for posts carrying every one of ``tags``; served by the multikey tags index"""
+    if not tags:
+        return {}
+    if len(tags) == 1:
+        return {"tags": tags[0]}
+    return {"tags": {"$all": tags}}
+
+
+def tag_deltas(posts: Iterable[dict]) -> Dict[str, Counter]:
+    """Per-tag post and published increments for ``posts``; a tag repeated on one post counts once"""
+    deltas: Dict[str, Counter] = {}
+    for post in posts:
+        for tag in dict.fromkeys(post.get("tags") or ()):
+            delta = deltas.setdefault(tag, Counter())
+            delta["post_count"] += 1
+            if post.get("published"):
+                delta["published_count"] += 1
+    return deltas
+
+
+async def record_posts(tags_collection, posts: Iterable[dict]) -> int:
+    """Fold new ``posts`` into the tag counts; returns the number of tags touched"""
+    deltas = tag_deltas(posts)
+    if not deltas:
+        return 0
+    await tags_collection.bulk_write(
+        [UpdateOne({"tag": tag}, {"$inc": {"post_count": delta["post_count"],
+                                           "published_count": delta["published_count"]}}, upsert=True)
+         for tag, delta in deltas.items()],
+        ordered=False,
+    )
+    return len(deltas)
+
+
+async def record_publication(tags_collection, posts: Iterable[dict]) -> int:
+    """Count scheduled or draft ``posts`` that have just been published"""
+    tags = Counter(tag for post in posts for tag in dict.fromkeys(post.get("tags") or ()))
+    if not tags:
+        return 0
+    await tags_collection.bulk_write(
+        [UpdateOne({"tag": tag}, {"$inc": {"published_count": count}}, upsert=True) for tag, count in tags.items()],
+        ordered=False,
+    )
+    return len(tags)
+
+
+async def list_tags(tags_collection, published: bool = True, limit: int = 100) -> List[dict]:
+    """Tags with at least one matching post, most used first"""
+    field = "published_count" if published else "post_count"
+    cursor = tags_collection.find(
+        {field: {"$gt": 0}}, {"_id": 0, "tag": 1, field: 1}
+    ).sort([(field, -1), ("tag", 1)]).limit(limit)
+    return [{"tag": doc["tag"], "count": doc[field]} async for doc in cursor]
+
+
+async def rebuild(posts_collection, tags_collection) -> int:
+    """Recompute every tag count from the posts; returns the number of tags stored"""
+    counts = {}
+    async for row in posts_collection.aggregate([
+        {"$project": {"_id": 0, "id": 1, "tags": 1, "published": 1}},
+        {"$unwind": "$tags"},
+        # A post listing the same tag twice still counts once
+        {"$group": {"_id": {"tag": "$tags", "post": "$id"}, "published": {"$first": "$published"}}},
+        {"$group": {
+            "_id": "$_id.tag",
+            "post_count": {"$sum": 1},
+            "published_count": {"$sum": {"$cond": [{"$eq": ["$published", True]}, 1, 0]}},
+        }},
+    ]):
+        counts[row["_id"]] = row
+
+    operations = [
+        UpdateOne({"tag": tag}, {"$set": {"post_count": row["post_count"],
+                                          "published_count": row["published_count"]}}, upsert=True)
+        for tag, row in counts.items()
+    ]
+    if operations:
+        await tags_collection.bulk_write(operations, ordered=False)
+    await tags_collection.delete_many({"tag": {"$nin": list(counts)}})
+    logger.info(f"Tag counts rebuilt for {len(counts)} tags")
+    return len(counts)
@@ -0,0 +1,119 @@
+"""Write-behind view counter for blog posts.
+
+Reads bump an in-memory counter instead of issuing an ``update_one`` per
+request. Counters are spread over a few shards, each behind its own lock, and
+flushed to Mongo as one unordered ``bulk_write`` either on a timer or once
+enough views are pending. Anything still buffered is flushed on shutdown.
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts: Dict[str, int] = defaultdict(int)
+
+
+class ViewCounter:
+    """Buffered ``$inc`` of the ``views`` field, keyed by post ``id``"""
+
+    def __init__(self, collection, shards: int = 8, flush_interval: float = 5.0,
+                 flush_threshold: int = 1000):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._shards = [_Shard() for _ in range(shards)]
+        self._pending = 0
+        self._flush_requested = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _shard(self, post_id: str) -> _Shard:
+        return self._shards[hash(post_id) % len(self._shards)]
+
+    def increment(self, post_id: str, count: int = 1):
+        shard = self._shard(post_id)
+        with shard.lock:
+            shard.counts[post_id] += count
+        self._pending += count
+        if self._pending >= self.flush_threshold:
+            self._flush_requested.set()
+
+    def pending(self, post_id: str) -> int:
+        """Views recorded for ``post_id`` but not yet written"""
+        shard = self._shard(post_id)
+        with shard.lock:
+            return shard.counts.get(post_id, 0)
+
+    def _swap(self) -> Dict[str, int]:
+        drained: Dict[str, int] = {}
+        for shard in self._shards:
+            with shard.lock:
+                counts, shard.counts = shard.counts, defaultdict(int)
+            drained.update(counts)
+        self._pending = 0
+        return drained
+
+    async def flush(self) -> int:
+        """Write all buffered views; returns the number of posts updated"""
+        drained = self._swap()
+        if not drained:
+            return 0
+        pending = list(drained.items())
+        operations: List[UpdateOne] = [
+            UpdateOne({"id": post_id}, {"$inc": {"views": count}})
+            for post_id, count in pending
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # The other $incs were applied; retrying them would count them twice
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            for index in failed:
+                self.increment(*pending[index])
+            logger.error(f"Failed to flush {len(failed)} of {len(operations)} view counts: {str(e)}")
+            raise
+        except Exception as e:
+            # Nothing is known to have been written; put the counts back so the next flush retries them
+            for post_id, count in pending:
+                self.increment(post_id, count)
+            logger.error(f"Failed to flush view counts: {str(e)}")
+            raise
+        return len(operations)
+
+    async def start(self):
+        self._stopping = False
+        self._flush_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still buffered"""
+        self._stopping = True
+        self._flush_requested.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            if self._stopping:
+                break
+            try:
+                await self.flush()
+            except Exception:
+                pass
@@ -0,0 +1,70 @@
+"""Throughput of /api/blog/posts: motor handlers vs the legacy sync pymongo handler.
+
+    python benchmarks/bench_async_driver.py [--mongo-url mongodb://localhost:27017/]
+
+The sync variant reproduces the pre-motor handler (a ``def`` route calling a
+blocking ``MongoClient``), so every request occupies a threadpool slot.
+"""
+import asyncio
+from datetime import datetime
+
+from fastapi import FastAPI
+
+from common import app_client, parse_args, print_stats, run_load, server, use_mongo
+
+SEED_POSTS = 200
+
+
+def build_sync_app(mongo_url):
+    if mongo_url:
+        from pymongo import MongoClient
+        sync_client = MongoClient(mongo_url)
+    else:
+        import mongomock
+        sync_client = mongomock.MongoClient()
+    collection = sync_client.gotech_solutions_bench.blog_posts
+    collection.delete_many({})
+    collection.insert_many([
+        {"id": str(i), "title": f"Post {i}", "content": "x" * 2000, "excerpt": "e",
+         "tags": [], "published": True, "created_at": datetime.utcnow()}
+        for i in range(SEED_POSTS)
+    ])
+
+    sync_app = FastAPI()
+
+    @sync_app.get("/api/blog/posts")
+    def get_blog_posts(published: bool = True, skip: int = 0, limit: int = 10):
+        query = {"published": published} if published else {}
+        posts = list(collection.find(query, {"_id": 0}).skip(skip).limit(limit).sort("created_at", -1))
+        total = collection.count_documents(query)
+        return {"posts": posts, "total": total, "skip": skip, "limit": limit}
+
+    return sync_app
+
+
+async def seed_async():
+    await server.blog_posts_collection.delete_many({})
+    await server.blog_posts_collection.insert_many([
+        {"id": str(i), "title": f"Post {i}", "content": "x" * 2000, "excerpt": "e",
+         "tags": [], "published": True, "created_at": datetime.utcnow()}
+        for i in range(SEED_POSTS)
+    ])
+
+
+async def main():
+    args = parse_args(__doc__)
+    use_mongo(args.mongo_url)
+
+    async with app_client(build_sync_app(args.mongo_url)) as client:
+        sync_stats = await run_load(client, "GET", "/api/blog/posts", args.requests, args.concurrency)
+    async with app_client() as client:
+        await seed_async()
+        async_stats = await run_load(client, "GET", "/api/blog/posts", args.requests, args.concurrency)
+
+    print_stats("sync pymongo (threadpool)", sync_stats)
+    print_stats("async motor", async_stats)
+    print(f"speedup: {async_stats['throughput_rps'] / sync_stats['throughput_rps']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""CPU cost versus bytes saved for each compression setting.
+
+    python benchmarks/bench_compression.py [--mongo-url ...] [--link-mbps 10]
+
+Renders real list responses through the app (full blog page, contacts,
+comments), then compresses each body with gzip and Brotli at several levels.
+For each setting it reports the ratio, the CPU time per response, and the
+total of CPU time plus transfer time on the given link. Also shows the
+per-request CPU that precompressed catalog payloads avoid.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import app_client, server, use_mongo
+from compression import available_encodings, compress
+
+SETTINGS = [("gzip", 1), ("gzip", 6), ("gzip", 9), ("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+
+
+async def seed():
+    start = datetime(2024, 1, 1)
+    await server.blog_posts_collection.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Post {i}", "excerpt": "A short teaser for the listing card.",
+         "content": "Article body with some words that repeat across posts. " * 80, "author": "Geoffrey Okoli",
+         "tags": ["design", "ux"], "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i),
+         "publish_at": start + timedelta(minutes=i), "published": True, "views": i, "likes": 0, "comment_count": 0}
+        for i in range(50)
+    ])
+    await server.contacts_collection.insert_many([
+        {"id": str(uuid.uuid4()), "name": f"Client {i}", "email": f"client{i}@example.com", "company": "Acme",
+         "message": f"We would like a quote for project {i}. " * 4, "service": "web-development",
+         "submitted_at": start + timedelta(minutes=i), "status": "new"}
+        for i in range(200)
+    ])
+    await server.comments_collection.insert_many([
+        {"id": str(uuid.uuid4()), "post_id": "p", "author_name": f"Reader {i}", "content": f"Great article, {i}!",
+         "created_at": start + timedelta(minutes=i), "approved": True, "likes": 0}
+        for i in range(200)
+    ])
+
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--link-mbps", type=float, default=10.0)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    use_mongo(args.mongo_url)
+    bytes_per_ms = args.link_mbps * 1e6 / 8 / 1000
+
+    async with app_client() as client:
+        await seed()
+        headers = {"Accept-Encoding": "identity"}
+        payloads = {
+            "blog posts (full, 50)": (await client.get("/api/blog/posts", params={"view": "full", "limit": 50},
+                                                       headers=headers)).content,
+            "contacts (200)": (await client.get("/api/contacts", params={"limit": 200}, headers=headers)).content,
+            "comments (200)": (await client.get("/api/blog/posts/p/comments", params={"limit": 200},
+                                                headers=headers)).content,
+        }
+
+    print(f"link {args.link_mbps:g} Mbit/s; total = compress CPU + transfer")
+    for label, body in payloads.items():
+        print(f"\n{label}: {len(body) / 1024:.1f} KiB, identity transfer {len(body) / bytes_per_ms:.2f}ms")
+        for encoding, level in SETTINGS:
+            if encoding not in available_encodings():
+                continue
+            options = {"gzip_level": level} if encoding == "gzip" else {"brotli_quality": level}
+            size = len(compress(body, encoding, **options))
+            cpu_ms = best_of(args.rounds, lambda: compress(body, encoding, **options)) * 1000
+            print(f"  {encoding:<4} {level:>2}  {size / 1024:7.1f} KiB  ratio {len(body) / size:5.1f}x  "
+                  f"cpu {cpu_ms:7.2f}ms  total {cpu_ms + size / bytes_per_ms:7.2f}ms")
+
+    server.catalog.load()
+    body = server.catalog.projects().body
+    cpu_ms = best_of(args.rounds, lambda: compress(body, "br", brotli_quality=11)) * 1000
+    print(f"\ncatalog projects: {len(body)} bytes, br 11 per request would cost {cpu_ms:.2f}ms; "
+          f"precompressed at load it costs nothing")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,61 @@
+"""Peak RSS growth while streaming /api/contacts/export.
+
+    python benchmarks/bench_export.py --mongo-url mongodb://localhost:27017/ --contacts 1000000
+
+Seeds the contacts collection, then consumes the gzip NDJSON export and
+reports how much the process's peak RSS grew during the export itself. Use a
+real mongod: mongomock keeps the whole collection (and sorted copies of it) in
+this process, which swamps the measurement.
+"""
+import argparse
+import asyncio
+import resource
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import app_client, server, use_mongo
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(total):
+    await server.contacts_collection.delete_many({})
+    start = datetime(2020, 1, 1)
+    for offset in range(0, total, 10000):
+        await server.contacts_collection.insert_many([
+            {"id": str(uuid.uuid4()), "name": f"Contact {i}", "email": "bench@example.com", "company": "Acme",
+             "message": "Interested in a redesign " * 4, "service": "ux-ui", "status": "new",
+             "submitted_at": (start + timedelta(seconds=i))}
+            for i in range(offset, min(total, offset + 10000))
+        ])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--contacts", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    use_mongo(args.mongo_url)
+
+    async with app_client() as client:
+        await seed(args.contacts)
+        before = peak_rss_mb()
+        started = time.perf_counter()
+        received = 0
+        async with client.stream("GET", "/api/contacts/export",
+                                 params={"batch_size": args.batch_size},
+                                 headers={"Accept-Encoding": "gzip"}) as response:
+            async for chunk in response.aiter_raw():
+                received += len(chunk)
+        elapsed = time.perf_counter() - started
+
+    print(f"exported {args.contacts} contacts in {elapsed:.1f}s, {received / 1e6:.1f} MB gzip on the wire")
+    print(f"peak RSS before {before:.0f} MB, after {peak_rss_mb():.0f} MB (+{peak_rss_mb() - before:.0f} MB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+"""Overhead of MetricsMiddleware on /api/blog/posts.
+
+    python benchmarks/bench_metrics_overhead.py [--mongo-url ...]
+
+Runs the same load with and without the middleware (alternating rounds to
+even out noise) and reports the throughput difference; the budget is 2%.
+"""
+import asyncio
+import statistics
+from datetime import datetime
+
+from common import app_client, parse_args, run_load, server, use_mongo
+from metrics import MetricsMiddleware
+
+
+def set_metrics_enabled(enabled):
+    app = server.app
+    app.user_middleware = [m for m in app.user_middleware if m.cls is not MetricsMiddleware]
+    if enabled:
+        from starlette.middleware import Middleware
+        app.user_middleware.insert(0, Middleware(MetricsMiddleware))
+    app.middleware_stack = None
+
+
+async def main():
+    args = parse_args(__doc__, requests=2000, concurrency=20)
+    use_mongo(args.mongo_url)
+    results = {True: [], False: []}
+
+    async with app_client() as client:
+        await server.blog_posts_collection.insert_many([
+            {"id": str(i), "title": f"Post {i}", "excerpt": "e", "content": "c", "tags": [],
+             "published": True, "created_at": datetime.utcnow(), "publish_at": datetime.utcnow()}
+            for i in range(50)
+        ])
+        # Vary the query so the response cache does not hide the handler
+        counter = iter(range(10 ** 9))
+        path = lambda: f"/api/blog/posts?limit=10&n={next(counter)}"
+        for _ in range(5):
+            for enabled in (True, False):
+                set_metrics_enabled(enabled)
+                stats = await run_load(client, "GET", path, args.requests, args.concurrency)
+                results[enabled].append(stats["throughput_rps"])
+    set_metrics_enabled(True)
+
+    with_metrics = statistics.median(results[True])
+    without = statistics.median(results[False])
+    overhead = (without - with_metrics) / without * 100
+    print(f"without metrics {without:9.1f} req/s")
+    print(f"with metrics    {with_metrics:9.1f} req/s")
+    print(f"overhead        {overhead:9.2f}%  (budget 2%)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Latency of page 1 vs a deep page on /api/contacts: skip/limit vs keyset cursor.
+
+    python benchmarks/bench_pagination.py --mongo-url mongodb://localhost:27017/ --pages 1000
+
+Keyset pages should stay flat while skip pages grow with depth. mongomock
+evaluates every query with a full scan, so use a real mongod for meaningful
+numbers.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import app_client, server, use_mongo
+
+LIMIT = 50
+
+
+async def seed(total):
+    await server.contacts_collection.delete_many({})
+    start = datetime(2020, 1, 1)
+    batch = []
+    for i in range(total):
+        batch.append({
+            "id": str(uuid.uuid4()), "name": f"Contact {i}", "email": "bench@example.com",
+            "company": None, "message": "hello", "service": None, "status": "new",
+            "submitted_at": (start + timedelta(seconds=i)),
+        })
+        if len(batch) == 5000:
+            await server.contacts_collection.insert_many(batch)
+            batch = []
+    if batch:
+        await server.contacts_collection.insert_many(batch)
+
+
+async def timed(client, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = await client.get("/api/contacts", params=params)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    use_mongo(args.mongo_url)
+
+    async with app_client() as client:
+        await seed(args.pages * LIMIT)
+
+        # Walk to the deep page once to obtain its cursor
+        cursor = None
+        for _ in range(args.pages - 1):
+            page = (await client.get("/api/contacts", params={"limit": LIMIT, "cursor": cursor or ""})).json()
+            cursor = page["next_cursor"]
+        deep_skip = (args.pages - 1) * LIMIT
+
+        results = {
+            "skip page 1": await timed(client, {"limit": LIMIT}, args.repeat),
+            f"skip page {args.pages}": await timed(client, {"limit": LIMIT, "skip": deep_skip}, args.repeat),
+            "cursor page 1": await timed(client, {"limit": LIMIT, "cursor": ""}, args.repeat),
+            f"cursor page {args.pages}": await timed(client, {"limit": LIMIT, "cursor": cursor}, args.repeat),
+        }
+
+    for label, median_ms in results.items():
+        print(f"{label:<24} median {median_ms:8.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""Bytes on the wire per /api/blog/posts page for the summary and full views.
+
+    python benchmarks/bench_post_projection.py [--mongo-url ...] [--content-kb 8]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from common import app_client, server, use_mongo
+
+
+async def seed(posts, content_kb):
+    await server.blog_posts_collection.delete_many({})
+    start = datetime(2024, 1, 1)
+    await server.blog_posts_collection.insert_many([
+        {"id": str(uuid.uuid4()), "title": f"Post {i}", "excerpt": "A short teaser for the listing card.",
+         "content": "lorem ipsum " * (content_kb * 1024 // 12), "author": "Geoffrey Okoli",
+         "tags": ["design", "ux"], "created_at": (start + timedelta(minutes=i)),
+         "updated_at": (start + timedelta(minutes=i)), "publish_at": (start + timedelta(minutes=i)), "published": True,
+         "views": 0, "likes": 0}
+        for i in range(posts)
+    ])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--content-kb", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    use_mongo(args.mongo_url)
+
+    async with app_client() as client:
+        await seed(args.limit * 5, args.content_kb)
+        for view in ("summary", "full"):
+            sizes, samples = [], []
+            for i in range(args.repeat):
+                # Vary the key so every request misses the response cache
+                params = {"view": view, "limit": args.limit, "skip": i % 5 * args.limit, "_": i}
+                start = time.perf_counter()
+                response = await client.get("/api/blog/posts", params=params)
+                samples.append(time.perf_counter() - start)
+                sizes.append(len(response.content))
+            samples.sort()
+            print(f"view={view:<8} {sum(sizes) / len(sizes) / 1024:9.1f} KiB/page  "
+                  f"median {samples[len(samples) // 2] * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
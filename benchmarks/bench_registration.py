@@ -0,0 +1,70 @@
+"""Registration throughput, and read latency while registrations run.
+
+    PASSWORD_ROUNDS=600000 python benchmarks/bench_registration.py [--mongo-url ...]
+
+Runs a burst of registrations alongside a steady stream of
+/api/testimonials reads, once with hashing in the process pool and once
+with hashing inline on the event loop, and reports both sides.
+"""
+import asyncio
+import itertools
+import time
+
+from common import app_client, parse_args, print_stats, run_load, server, summarize, use_mongo
+from passwords import build_context
+
+
+def hash_inline():
+    """Hash on the event loop instead of in the pool, as registration used to"""
+    hasher = server.password_hasher
+    context = build_context(hasher.schemes, hasher.rounds)
+
+    async def inline_hash(password):
+        return context.hash(password)
+    hasher.hash = inline_hash
+
+
+async def register_all(client, total, concurrency):
+    counter = itertools.count()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def register():
+        n = next(counter)
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/api/users/register", json={
+                "name": f"User {n}", "email": f"user{n}@example.com", "password": f"password-{n}",
+            })
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(register() for _ in range(total)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+async def run(label, inline, args):
+    async with app_client() as client:
+        if inline:
+            hash_inline()
+        else:
+            # Start the workers up front so spawning is not measured
+            await asyncio.gather(*(server.password_hasher.hash("warm-up") for _ in range(server.PASSWORD_HASH_WORKERS)))
+        registrations = asyncio.create_task(register_all(client, args.requests, args.concurrency))
+        reads = await run_load(client, "GET", "/api/testimonials", args.requests * 5, 10)
+        print_stats(f"{label}: register", await registrations)
+        print_stats(f"{label}: reads alongside", reads)
+
+
+async def main():
+    args = parse_args(__doc__, requests=200, concurrency=20)
+    use_mongo(args.mongo_url)
+    print(f"{server.PASSWORD_SCHEMES[0]}, rounds={server.PASSWORD_ROUNDS or 'default'}, "
+          f"{server.PASSWORD_HASH_WORKERS} workers")
+    await run("process pool", False, args)
+    await run("inline", True, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Search latency over a synthetic corpus.
+
+    python benchmarks/bench_search.py --posts 100000
+
+Builds the in-process post index directly (no Mongo) from a Zipf-distributed
+vocabulary and reports p50/p95 for index lookups, ranking and facets. Snippet
+generation adds one ``$in`` query per result page on top of this.
+"""
+import argparse
+import itertools
+import random
+import sys
+import time
+
+from common import BACKEND_DIR  # noqa: F401  (puts backend/ on sys.path)
+from search import POST_FIELD_WEIGHTS, InvertedIndex
+
+VOCABULARY = 20000
+TAGS = ["design", "ux", "ui", "branding", "copywriting", "strategy", "research", "react", "mobile", "saas"]
+
+
+def words(rng, cum_weights, n):
+    return " ".join(f"w{i}" for i in rng.choices(range(VOCABULARY), cum_weights=cum_weights, k=n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--content-words", type=int, default=150)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY)))
+    index = InvertedIndex(POST_FIELD_WEIGHTS, ["id", "title", "excerpt", "tags", "author", "created_at"],
+                          facet_field="tags")
+
+    started = time.perf_counter()
+    for i in range(args.posts):
+        index.add({
+            "id": str(i), "title": words(rng, weights, 6), "excerpt": words(rng, weights, 20),
+            "content": words(rng, weights, args.content_words), "tags": rng.sample(TAGS, 2),
+        })
+    print(f"indexed {args.posts} posts in {time.perf_counter() - started:.1f}s")
+
+    # Mix of one- and two-term queries drawn from the mid-frequency band, with
+    # some tag-filtered; repeated terms reflect real query popularity
+    queries = []
+    for _ in range(args.queries):
+        terms = " ".join(f"w{rng.randint(20, 2000)}" for _ in range(rng.choice((1, 2))))
+        queries.append((terms, [rng.choice(TAGS)] if rng.random() < 0.2 else None))
+    samples = []
+    for query, tags in queries:
+        start = time.perf_counter()
+        index.search(query, limit=10, tags=tags)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = samples[len(samples) // 2] * 1000
+    p95 = samples[int(len(samples) * 0.95)] * 1000
+    print(f"search p50 {p50:.2f}ms  p95 {p95:.2f}ms  max {samples[-1] * 1000:.2f}ms")
+    return 0 if p95 < 10 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
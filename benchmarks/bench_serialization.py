@@ -0,0 +1,66 @@
+"""Encode time per 1k blog posts for each response serialization path.
+
+    python benchmarks/bench_serialization.py [--rounds N]
+
+Compares FastAPI's old default (jsonable_encoder + json.dumps through
+JSONResponse), the typed response model path (pydantic-core validation and
+serialization, then ORJSONResponse) and rendering raw documents with orjson,
+which is what the response cache stores.
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+import common  # noqa: F401  (puts backend/ on sys.path)
+from response_cache import render_json
+from server import BlogPostList
+
+
+def make_page(n):
+    start = datetime(2024, 1, 1)
+    posts = [
+        {"id": str(uuid.uuid4()), "title": f"Post {i}", "excerpt": "An excerpt " * 5, "content": "Body text. " * 200,
+         "author": "Geoffrey Okoli", "tags": ["design", "ux", "web"], "created_at": start + timedelta(minutes=i),
+         "updated_at": start + timedelta(minutes=i), "publish_at": start + timedelta(minutes=i), "published": True,
+         "views": i, "likes": 0, "comment_count": 3}
+        for i in range(n)
+    ]
+    return {"posts": posts, "total": n, "skip": 0, "limit": n, "next_cursor": None}
+
+
+def best_of(rounds, fn):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    page = make_page(1000)
+    adapter = TypeAdapter(BlogPostList)
+    paths = {
+        "jsonable_encoder + json": lambda: JSONResponse(jsonable_encoder(page)).body,
+        "response model + orjson": lambda: ORJSONResponse(
+            adapter.dump_python(adapter.validate_python(page), mode="json", exclude_unset=True)).body,
+        "orjson (cached render)": lambda: render_json(page),
+    }
+    baseline = None
+    for label, fn in paths.items():
+        ms = best_of(args.rounds, fn)
+        baseline = baseline or ms
+        print(f"{label:<26} {ms:8.2f} ms per 1k posts  ({baseline / ms:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start cost: importing server.py and serving the first response.
+
+    python benchmarks/bench_startup.py [--runs 5] [--mongo-url ...]
+
+Each run is a fresh interpreter, so nothing is already imported or cached.
+It reports the time to ``import server``, and the time until the first
+/api/health response (the import, the app lifespan and the request). It also
+lists which of the lazily loaded modules the import pulled in; that list
+should be empty. tests/test_startup.py runs the same measurement against a
+budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+# Loaded on first use, never by the import
+LAZY_MODULES = ["smtplib", "email.mime.multipart", "email.mime.text", "passlib", "brotli", "gzip",
+                "concurrent.futures.process"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+lazy = [name for name in {lazy!r} if name in sys.modules]
+client_at_import = server.client is not None
+from fastapi.testclient import TestClient
+if not {mongo_url!r}:
+    from mongomock_motor import AsyncMongoMockClient
+    server.AsyncIOMotorClient = AsyncMongoMockClient
+else:
+    server.MONGO_URL = {mongo_url!r}
+    server.DB_NAME = "gotech_solutions_bench"
+ready = time.perf_counter()
+with TestClient(server.app) as client:
+    client.get("/api/health").raise_for_status()
+    answered = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - started,
+    # The harness imports above are not part of the app's start-up
+    "first_response_s": (imported - started) + (answered - ready),
+    "lazy_modules_loaded": lazy,
+    "client_at_import": client_at_import,
+}}))
+"""
+
+
+def measure_once(mongo_url=None) -> dict:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1", COMMENT_RECONCILE_INTERVAL="0")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(lazy=LAZY_MODULES, mongo_url=mongo_url or "")],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(runs: int = 3, mongo_url=None) -> dict:
+    """Medians over ``runs`` fresh interpreters"""
+    samples = [measure_once(mongo_url) for _ in range(runs)]
+    return {
+        "import_s": statistics.median(s["import_s"] for s in samples),
+        "first_response_s": statistics.median(s["first_response_s"] for s in samples),
+        "lazy_modules_loaded": sorted({name for s in samples for name in s["lazy_modules_loaded"]}),
+        "client_at_import": any(s["client_at_import"] for s in samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None, help="Run against a real mongod instead of mongomock")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    result = measure(args.runs, args.mongo_url)
+    print(f"import server          {result['import_s'] * 1000:8.1f} ms")
+    print(f"first response         {result['first_response_s'] * 1000:8.1f} ms")
+    print(f"lazy modules imported  {', '.join(result['lazy_modules_loaded']) or 'none'}")
+    print(f"client at import       {result['client_at_import']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Throughput scaling from 1 to N server workers.
+
+    python benchmarks/bench_workers.py [--max-workers 8] [--mongo-url ...] [--duration 10]
+
+Starts backend/serve.py as a real multi-process server for each worker count
+(1, 2, 4, ... up to ``--max-workers``) and drives it over HTTP from several
+load-generator processes, so the client is not the bottleneck. Reports
+requests per second, latency and the speed-up over one worker. Without
+``--mongo-url`` the server has no database and only the in-memory catalog
+routes are hit; with one, blog listings and posts are included too.
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from common import BACKEND_DIR, print_stats, summarize
+
+CATALOG_PATHS = ["/api/testimonials", "/api/portfolio/projects", "/api/portfolio/projects?category=web-development"]
+DATABASE_PATHS = ["/api/blog/posts", "/api/blog/posts?limit=20&view=full", "/api/blog/tags"]
+
+# One log line per request would cost more than the requests
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, mongo_url):
+    env = dict(os.environ, SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), SERVER_WORKERS=str(workers),
+               SERVER_GRACEFUL_TIMEOUT="5", DB_NAME="gotech_solutions_bench")
+    if mongo_url:
+        env["MONGO_URL"] = mongo_url
+    else:
+        # Nothing listens here; fail the startup index and sync calls fast
+        env.update(MONGO_URL="mongodb://127.0.0.1:1/", MONGO_SERVER_SELECTION_TIMEOUT_MS="100",
+                   COMMENT_RECONCILE_INTERVAL="0")
+    process = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, "serve.py")], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/testimonials", timeout=1).status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f"Server with {workers} workers did not start")
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def generate(base_url: str, paths, duration: float, concurrency: int):
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(offset):
+        nonlocal errors
+        n = offset
+        while time.perf_counter() < deadline:
+            path = paths[n % len(paths)]
+            n += 1
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return latencies, errors
+
+
+def generator_process(args):
+    return asyncio.run(generate(*args))
+
+
+def measure(workers: int, args, paths, pool) -> dict:
+    port = free_port()
+    process = start_server(workers, port, args.mongo_url)
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        # Warm every worker's caches before timing
+        pool.map(generator_process, [(base_url, paths, 1.0, args.concurrency)] * args.clients)
+        started = time.perf_counter()
+        results = pool.map(generator_process, [(base_url, paths, args.duration, args.concurrency)] * args.clients)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop_server(process)
+    latencies = [latency for batch, _ in results for latency in batch]
+    stats = summarize(latencies, elapsed)
+    stats["errors"] = sum(errors for _, errors in results)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mongo-url", default=None, help="Include database routes, served from this mongod")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per worker count")
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 1) // 2),
+                        help="Load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="Connections per load generator")
+    args = parser.parse_args()
+
+    paths = CATALOG_PATHS + (DATABASE_PATHS if args.mongo_url else [])
+    counts = sorted({1, args.max_workers} | {n for n in (2, 4, 8, 16, 32, 64) if n < args.max_workers})
+    print(f"{os.cpu_count()} CPUs, {args.clients} load generators x {args.concurrency} connections, "
+          f"{args.duration:.0f}s per run")
+    baseline = None
+    with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+        for workers in counts:
+            stats = measure(workers, args, paths, pool)
+            baseline = baseline or stats["throughput_rps"]
+            print_stats(f"{workers} workers ({stats['throughput_rps'] / baseline:.2f}x, {stats['errors']} errors)",
+                        stats)
+
+
+if __name__ == "__main__":
+    main()
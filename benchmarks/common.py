@@ -0,0 +1,100 @@
+"""Shared helpers for the in-process load benchmarks.
+
+Benchmarks drive the FastAPI app through httpx's ASGI transport, so no
+server process is needed. Pass ``--mongo-url`` to run against a local
+mongod; otherwise an in-memory mongomock stand-in is used.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+import server  # noqa: E402
+
+
+def parse_args(description, **defaults):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--mongo-url", default=None, help="Run against a real mongod instead of mongomock")
+    parser.add_argument("--requests", type=int, default=defaults.get("requests", 2000))
+    parser.add_argument("--concurrency", type=int, default=defaults.get("concurrency", 50))
+    return parser.parse_args()
+
+
+def use_mongo(mongo_url=None):
+    """Point the app at a real mongod, or at mongomock when no URL is given"""
+    if mongo_url:
+        server.MONGO_URL = mongo_url
+        server.DB_NAME = "gotech_solutions_bench"
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        server.AsyncIOMotorClient = AsyncMongoMockClient
+
+        # mongomock never uses indexes for queries, and enforcing the unique
+        # ones makes every insert a scan; skip them for benchmark runs.
+        async def skip_indexes(db):
+            return {}
+        server.ensure_indexes = skip_indexes
+
+
+@asynccontextmanager
+async def app_client(app=None):
+    """Run the app lifespan and yield an httpx client bound to it"""
+    app = app or server.app
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+async def run_load(client, method, path, total, concurrency, **kwargs):
+    """Fire ``total`` requests with ``concurrency`` in flight and return latency stats"""
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            target = path() if callable(path) else path
+            start = time.perf_counter()
+            response = await client.request(method, target, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed)
+
+
+def summarize(latencies, elapsed):
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))] * 1000
+
+    return {
+        "requests": len(ordered),
+        "throughput_rps": len(ordered) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def print_stats(label, stats):
+    print(
+        f"{label:<32} {stats['throughput_rps']:>9.1f} req/s  "
+        f"p50 {stats['p50_ms']:>7.2f}ms  p95 {stats['p95_ms']:>7.2f}ms  p99 {stats['p99_ms']:>7.2f}ms"
+    )
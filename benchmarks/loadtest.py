@@ -0,0 +1,329 @@
+"""Mixed read/write load test over every public route.
+
+    python benchmarks/loadtest.py [--workload mixed] [--requests 5000] [--concurrency 50]
+    python benchmarks/loadtest.py --base-url http://localhost:8001 ...
+    python benchmarks/loadtest.py --save-baseline           # record this machine's numbers
+    python benchmarks/loadtest.py --threshold 0.2           # exit 1 on a >20% regression
+
+By default the app runs in-process on mongomock (or on a local mongod with
+``--mongo-url``). With ``--base-url`` it drives a running server instead;
+start that server with CONTACT_RATE_LIMIT= and COMMENT_RATE_LIMIT= so the
+limiter does not turn the write mix into 429s. Each run seeds posts,
+comments, contacts and users through the API. Then it fires a weighted,
+seeded random mix of the same calls backend_test.py makes, and reports
+throughput and p50/p95/p99 overall and per operation (medians over
+``--rounds`` repetitions, to damp noise). A result is compared
+with the JSON baseline for the same workload when one exists.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from common import app_client, server, summarize, use_mongo
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Relative weights of each operation per workload
+WORKLOADS = {
+    "read-heavy": {
+        "list_posts": 22, "list_posts_by_tag": 3, "tags": 3, "get_post": 20, "get_post_with_comments": 10,
+        "list_comments": 10, "search_posts": 8, "portfolio": 7, "portfolio_by_category": 4, "testimonials": 6,
+        "health": 2, "list_contacts": 3, "submit_contact": 1, "create_comment": 1,
+    },
+    "mixed": {
+        "list_posts": 16, "list_posts_by_tag": 2, "tags": 2, "get_post": 15, "get_post_with_comments": 8,
+        "list_comments": 8, "search_posts": 6, "portfolio": 5, "portfolio_by_category": 3, "testimonials": 5,
+        "health": 2, "list_contacts": 3, "submit_contact": 8, "create_comment": 8, "create_post": 4, "login": 3,
+        "register": 2, "search_comments": 2, "export_comments": 1,
+    },
+    "write-heavy": {
+        "list_posts": 10, "get_post": 10, "list_comments": 5, "testimonials": 5,
+        "submit_contact": 25, "create_comment": 25, "create_post": 10, "login": 5, "register": 5,
+    },
+}
+
+CATEGORIES = ["web-development", "mobile-development", "ux-ui", "graphics-design"]
+SEARCH_TERMS = ["design", "performance", "python", "mobile", "cloud"]
+PASSWORD = "load-test-password"
+
+
+class Scenario:
+    """Ids seeded at start-up, and the request each operation makes"""
+
+    def __init__(self, run_id: str, post_ids, emails, rng: random.Random):
+        self.run_id = run_id
+        self.post_ids = post_ids
+        self.emails = emails
+        self.rng = rng
+        self.counter = 0
+
+    def unique(self) -> int:
+        self.counter += 1
+        return self.counter
+
+    def request(self, operation: str):
+        """(method, url, keyword arguments) for one call of ``operation``"""
+        rng = self.rng
+        post_id = rng.choice(self.post_ids)
+        if operation == "health":
+            return "GET", "/api/health", {}
+        if operation == "list_posts":
+            return "GET", "/api/blog/posts", {"params": {"limit": rng.choice([10, 20]), "skip": rng.choice([0, 10, 20])}}
+        if operation == "list_posts_by_tag":
+            return "GET", "/api/blog/posts", {"params": {"tags": rng.choice(SEARCH_TERMS), "limit": 10}}
+        if operation == "tags":
+            return "GET", "/api/blog/tags", {}
+        if operation == "get_post":
+            return "GET", f"/api/blog/posts/{post_id}", {}
+        if operation == "get_post_with_comments":
+            return "GET", f"/api/blog/posts/{post_id}", {"params": {"include_comments": True}}
+        if operation == "list_comments":
+            return "GET", f"/api/blog/posts/{post_id}/comments", {"params": {"limit": 20}}
+        if operation == "search_posts":
+            return "GET", "/api/blog/search", {"params": {"q": rng.choice(SEARCH_TERMS)}}
+        if operation == "search_comments":
+            return "GET", "/api/blog/search", {"params": {"q": "comment", "type": "comments"}}
+        if operation == "export_comments":
+            return "GET", "/api/comments/export", {"params": {"post_id": post_id}}
+        if operation == "portfolio":
+            return "GET", "/api/portfolio/projects", {}
+        if operation == "portfolio_by_category":
+            return "GET", "/api/portfolio/projects", {"params": {"category": rng.choice(CATEGORIES)}}
+        if operation == "testimonials":
+            return "GET", "/api/testimonials", {}
+        if operation == "list_contacts":
+            return "GET", "/api/contacts", {"params": {"limit": 50}}
+        n = self.unique()
+        if operation == "submit_contact":
+            return "POST", "/api/contact", {"json": {
+                "name": f"Load {n}", "email": f"load{n}-{self.run_id}@example.com", "company": "Load Co",
+                "message": f"Load test inquiry {self.run_id}-{n}", "service": rng.choice(CATEGORIES),
+            }}
+        if operation == "create_comment":
+            return "POST", f"/api/blog/posts/{post_id}/comments", {"json": {
+                "post_id": post_id, "author_name": f"Reader {n}", "content": f"Comment {self.run_id}-{n}",
+            }}
+        if operation == "create_post":
+            return "POST", "/api/blog/posts", {"json": post_body(f"{self.run_id}-{n}", rng)}
+        if operation == "register":
+            return "POST", "/api/users/register", {"json": {
+                "name": f"User {n}", "email": f"user{n}-{self.run_id}@example.com", "password": PASSWORD,
+            }}
+        if operation == "login":
+            return "POST", "/api/users/login", {"json": {"email": rng.choice(self.emails), "password": PASSWORD}}
+        raise ValueError(f"Unknown operation {operation}")
+
+
+def post_body(label: str, rng: random.Random) -> dict:
+    terms = rng.sample(SEARCH_TERMS, 2)
+    return {
+        "title": f"Notes on {terms[0]} {label}",
+        "excerpt": f"A short piece about {terms[0]} and {terms[1]}.",
+        "content": f"Thoughts on {terms[0]}, {terms[1]} and shipping software. " * 40,
+        "tags": terms,
+    }
+
+
+async def seed(client, args, rng: random.Random, run_id: str) -> Scenario:
+    posts = [post_body(f"seed-{run_id}-{i}", rng) for i in range(args.posts)]
+    response = await client.post("/api/blog/posts/bulk", json=posts)
+    response.raise_for_status()
+    post_ids = response.json()["ids"]
+
+    comments = [{"post_id": rng.choice(post_ids), "author_name": f"Seed {i}", "content": f"Seed comment {i}"}
+                for i in range(args.posts * 5)]
+    (await client.post("/api/blog/comments/bulk", json=comments)).raise_for_status()
+    contacts = [{"name": f"Seed {i}", "email": f"seed{i}@example.com", "message": f"Seed message {i}"}
+                for i in range(args.posts * 2)]
+    (await client.post("/api/contact/bulk", json=contacts)).raise_for_status()
+
+    emails = [f"seed{i}-{run_id}@example.com" for i in range(5)]
+    for i, email in enumerate(emails):
+        response = await client.post("/api/users/register", json={"name": f"Seed {i}", "email": email,
+                                                                  "password": PASSWORD})
+        response.raise_for_status()
+
+    # Search answers 503 until its index is built
+    for _ in range(100):
+        if (await client.get("/api/blog/search", params={"q": "design"})).status_code != 503:
+            break
+        await asyncio.sleep(0.1)
+    return Scenario(run_id, post_ids, emails, rng)
+
+
+async def drive(client, scenario: Scenario, weights: dict, total: int, concurrency: int) -> dict:
+    plan = scenario.rng.choices(list(weights), weights=list(weights.values()), k=total)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    queue = asyncio.Queue()
+    for operation in plan:
+        queue.put_nowait(operation)
+
+    async def worker():
+        while not queue.empty():
+            operation = queue.get_nowait()
+            method, url, kwargs = scenario.request(operation)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies[operation].append(time.perf_counter() - start)
+            if failed:
+                errors[operation] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {"overall": summarize([l for values in latencies.values() for l in values], elapsed), "operations": {}}
+    result["overall"]["errors"] = sum(errors.values())
+    for operation, values in sorted(latencies.items()):
+        stats = summarize(values, elapsed)
+        stats["errors"] = errors[operation]
+        result["operations"][operation] = stats
+    return result
+
+
+def median_of(rounds: list) -> dict:
+    """Combine per-round results: median of every statistic, total of errors"""
+    def combine(samples):
+        combined = {key: statistics.median(sample[key] for sample in samples) for key in samples[0] if key != "errors"}
+        combined["errors"] = sum(sample["errors"] for sample in samples)
+        return combined
+
+    operations = sorted({name for result in rounds for name in result["operations"]})
+    return {
+        "overall": combine([result["overall"] for result in rounds]),
+        "operations": {
+            name: combine([result["operations"][name] for result in rounds if name in result["operations"]])
+            for name in operations
+        },
+    }
+
+
+async def measure(client, args, rng: random.Random, run_id: str) -> dict:
+    scenario = await seed(client, args, rng, run_id)
+    weights = WORKLOADS[args.workload]
+    return median_of([await drive(client, scenario, weights, args.requests, args.concurrency)
+                      for _ in range(args.rounds)])
+
+
+def compare(baseline: dict, current: dict, threshold: float, min_delta_ms: float) -> list:
+    """Human-readable regressions of ``current`` against ``baseline``"""
+    regressions = []
+    base, now = baseline["overall"], current["overall"]
+    if now["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+        regressions.append(f"overall throughput {base['throughput_rps']:.1f} -> {now['throughput_rps']:.1f} req/s")
+    if now["errors"] > base["errors"]:
+        regressions.append(f"overall errors {base['errors']} -> {now['errors']}")
+    for name, new in current["operations"].items():
+        old = baseline["operations"].get(name)
+        if old is None:
+            continue
+        # Latency is gated per operation: the overall p95 of a mix is set by
+        # its slowest routes (password hashing), and p99 over a few hundred
+        # samples is too noisy; small absolute changes are noise too
+        if new["p95_ms"] > old["p95_ms"] * (1 + threshold) and new["p95_ms"] - old["p95_ms"] > min_delta_ms:
+            regressions.append(f"{name} p95 {old['p95_ms']:.2f} -> {new['p95_ms']:.2f} ms")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{name} errors {old['errors']} -> {new['errors']}")
+    return regressions
+
+
+def print_report(result: dict):
+    def line(label, stats):
+        print(f"{label:<24} {stats['requests']:>6}  {stats['throughput_rps']:>9.1f} req/s  "
+              f"p50 {stats['p50_ms']:>7.2f}  p95 {stats['p95_ms']:>7.2f}  p99 {stats['p99_ms']:>7.2f} ms  "
+              f"errors {stats['errors']}")
+
+    line("overall", result["overall"])
+    for name, stats in result["operations"].items():
+        line(f"  {name}", stats)
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}-{os.getpid()}"
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=30.0) as client:
+            return await measure(client, args, rng, run_id)
+
+    use_mongo(args.mongo_url)
+    # One client address sends everything here; the limiter would reject most writes
+    server.RATE_LIMITS = {}
+    server.SUBMISSION_DEDUP_WINDOW = 0
+    async with app_client() as client:
+        if args.mongo_url:
+            for name in await server.db.list_collection_names():
+                if not name.startswith("system."):
+                    await server.db[name].delete_many({})
+        return await measure(client, args, rng, run_id)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3, help="Repeat the mix and report per-statistic medians")
+    parser.add_argument("--posts", type=int, default=200, help="Posts to seed; comments and contacts scale with it")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the request mix")
+    parser.add_argument("--base-url", default=None, help="Drive a running server instead of the in-process app")
+    parser.add_argument("--mongo-url", default=None, help="In-process runs: use this mongod instead of mongomock")
+    parser.add_argument("--baseline", default=None, help="Baseline file (default: baselines/<workload>.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore latency changes smaller than this")
+    parser.add_argument("--output", default=None, help="Also write the result JSON here")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    result["config"] = {
+        "workload": args.workload, "requests": args.requests, "concurrency": args.concurrency, "rounds": args.rounds,
+        "posts": args.posts, "seed": args.seed, "target": args.base_url or ("mongod" if args.mongo_url else "mongomock"),
+    }
+    print_report(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.workload}.json")
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"baseline written to {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"no baseline at {baseline_path}; run with --save-baseline to record one")
+        return 0
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("config", {}).get("target") != result["config"]["target"]:
+        print(f"warning: baseline was recorded against {baseline.get('config', {}).get('target')}")
+    regressions = compare(baseline, result, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print(f"\nno regressions beyond {args.threshold:.0%} against {baseline_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from mongomock_motor import AsyncMongoMockClient
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import server  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """TestClient running the app lifespan against an in-memory Mongo stand-in"""
+    monkeypatch.setattr(server, "AsyncIOMotorClient", AsyncMongoMockClient)
+    # Tests post freely from one client; test_rate_limit installs its own limiter
+    monkeypatch.setattr(server, "RATE_LIMITS", {})
+    monkeypatch.setattr(server, "SUBMISSION_DEDUP_WINDOW", 0)
+    with TestClient(server.app) as test_client:
+        yield test_client
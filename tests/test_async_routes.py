@@ -0,0 +1,48 @@
+import asyncio
+
+import server
+
+
+def test_lifespan_binds_and_closes_client(api):
+    assert server.client is not None
+    health = api.get("/api/health").json()
+    assert (health["status"], health["database"]) == ("healthy", "connected")
+    assert health["pool"]["max_size"] == server.MONGO_MAX_POOL_SIZE
+
+
+def test_blog_post_round_trip(api):
+    created = api.post("/api/blog/posts", json={
+        "title": "Async all the way",
+        "content": "Body",
+        "excerpt": "Short",
+        "tags": ["python"],
+    })
+    assert created.status_code == 200
+    post_id = created.json()["id"]
+
+    listing = api.get("/api/blog/posts").json()
+    assert listing["total"] == 1
+    assert listing["posts"][0]["id"] == post_id
+
+    assert api.get(f"/api/blog/posts/{post_id}").json()["title"] == "Async all the way"
+    assert api.get("/api/blog/posts/missing").status_code == 404
+
+
+def test_comments_and_contacts(api):
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    assert api.post(f"/api/blog/posts/{post_id}/comments", json={
+        "post_id": post_id, "author_name": "Ann", "content": "Nice", "email": "ann@example.com",
+    }).status_code == 200
+    comments = api.get(f"/api/blog/posts/{post_id}/comments").json()
+    assert comments["total"] == 1
+    assert "email" not in comments["comments"][0]
+
+    assert api.post("/api/contact", json={"name": "Bo", "email": "bo@example.com", "message": "Hi"}).status_code == 200
+    assert api.get("/api/contacts").json()["total"] == 1
+
+
+def test_handlers_are_coroutines():
+    for route in server.app.routes:
+        endpoint = getattr(route, "endpoint", None)
+        if endpoint is not None and getattr(endpoint, "__module__", None) == "server":
+            assert asyncio.iscoroutinefunction(endpoint), route.path
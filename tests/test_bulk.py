@@ -0,0 +1,85 @@
+import json
+
+import server
+
+
+def test_json_array_import_reports_per_item_errors(api):
+    posts = [
+        {"title": "One", "content": "c", "excerpt": "e", "tags": ["a"]},
+        {"title": "Missing body"},
+        {"title": "Two", "content": "c", "excerpt": "e"},
+    ]
+    result = api.post("/api/blog/posts/bulk", json=posts).json()
+    assert result["inserted"] == 2
+    assert result["failed"] == 1
+    assert result["errors"][0]["index"] == 1
+    assert {"loc": ["content"], "msg": "Field required"} in result["errors"][0]["error"]
+    assert api.get("/api/blog/posts").json()["total"] == 2
+
+
+def test_ndjson_stream_in_chunks(api, monkeypatch):
+    monkeypatch.setattr(server, "BULK_CHUNK_SIZE", 3)
+    lines = [json.dumps({"name": f"n{i}", "email": "a@example.com", "message": "m"}) for i in range(7)]
+    lines.insert(4, "{not json")
+    body = "\n".join(lines).encode()
+
+    result = api.post("/api/contact/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert result["inserted"] == 7
+    assert result["errors"][0]["index"] == 4
+    assert result["errors"][0]["error"].startswith("Invalid JSON")
+    assert api.get("/api/contacts").json()["total"] == 7
+
+
+def test_comment_import_checks_parents_in_batches(api):
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    draft = {"title": "d", "content": "c", "excerpt": "e", "draft": True}
+    draft_id = api.post("/api/blog/posts", json=draft).json()["id"]
+    comments = [
+        {"post_id": post_id, "author_name": "a", "content": "first"},
+        {"post_id": "missing", "author_name": "b", "content": "orphan"},
+        {"post_id": post_id, "author_name": "c", "content": "second"},
+        {"post_id": draft_id, "author_name": "d", "content": "too early"},
+    ]
+    result = api.post("/api/blog/comments/bulk", json=comments).json()
+    assert result["inserted"] == 2
+    assert result["errors"] == [{"index": 1, "error": "Blog post not found"},
+                                {"index": 3, "error": "Blog post not found"}]
+    assert api.get(f"/api/blog/posts/{post_id}/comments").json()["total"] == 2
+
+
+def test_limits_and_bad_payloads(api, monkeypatch):
+    assert api.post("/api/contact/bulk", json={"not": "a list"}).status_code == 400
+    monkeypatch.setattr(server, "BULK_MAX_ITEMS", 1)
+    assert api.post("/api/contact/bulk", json=[{}, {}]).status_code == 400
+
+
+def test_json_array_body_size_limit_points_to_ndjson(api, monkeypatch):
+    monkeypatch.setattr(server, "BULK_MAX_BYTES", 200)
+    items = [{"name": f"n{i}", "email": "a@example.com", "message": "m"} for i in range(5)]
+    response = api.post("/api/contact/bulk", json=items)
+    assert response.status_code == 400
+    assert "send larger imports as NDJSON" in response.json()["detail"]
+
+    # Without a Content-Length the body is counted as it arrives
+    def chunks():
+        yield json.dumps(items).encode()
+
+    assert api.post("/api/contact/bulk", content=chunks(),
+                    headers={"Content-Type": "application/json"}).status_code == 400
+    assert api.get("/api/contacts").json()["total"] == 0
+
+    # The same items as NDJSON are not bound by the byte limit
+    response = api.post("/api/contact/bulk", content="\n".join(json.dumps(item) for item in items).encode(),
+                        headers={"Content-Type": "application/x-ndjson"})
+    assert response.json()["inserted"] == 5
+
+
+def test_ndjson_stream_stops_at_the_item_limit(api, monkeypatch):
+    monkeypatch.setattr(server, "BULK_MAX_ITEMS", 3)
+    monkeypatch.setattr(server, "BULK_CHUNK_SIZE", 2)
+    lines = [json.dumps({"name": f"n{i}", "email": "a@example.com", "message": "m"}) for i in range(50)]
+    response = api.post("/api/contact/bulk", content="\n".join(lines).encode(),
+                        headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "At most 3 items per request; the 2 items stored before the limit are kept"
+    assert api.get("/api/contacts").json()["total"] == 2
@@ -0,0 +1,37 @@
+import json
+import os
+
+from catalog import Catalog
+
+
+def test_projects_are_served_per_category(api):
+    everything = api.get("/api/portfolio/projects").json()["projects"]
+    assert len(everything) >= 2
+    assert api.get("/api/portfolio/projects", params={"category": "all"}).json()["projects"] == everything
+
+    ux = api.get("/api/portfolio/projects", params={"category": "ux-ui"}).json()["projects"]
+    assert ux and all(p["category"] == "ux-ui" for p in ux)
+    assert api.get("/api/portfolio/projects", params={"category": "nope"}).json() == {"projects": []}
+
+    testimonials = api.get("/api/testimonials")
+    assert len(testimonials.json()["testimonials"]) == 3
+    assert api.get("/api/testimonials", headers={"If-None-Match": testimonials.headers["etag"]}).status_code == 304
+
+
+def test_reload_picks_up_changes(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"projects": [{"id": 1, "category": "a"}], "testimonials": []}))
+    catalog = Catalog(str(path))
+    catalog.load()
+    assert catalog.reload() is False
+
+    path.write_text(json.dumps({"projects": [{"id": 1, "category": "a"}, {"id": 2, "category": "b"}],
+                                "testimonials": [{"id": 1}]}))
+    os.utime(path, (0, catalog.loaded_mtime + 1))
+    assert catalog.reload() is True
+    assert json.loads(catalog.projects("b").body) == {"projects": [{"id": 2, "category": "b"}]}
+    assert json.loads(catalog.testimonials().body) == {"testimonials": [{"id": 1}]}
+
+
+def test_reload_endpoint(api):
+    assert api.post("/api/catalog/reload", params={"force": True}).json()["reloaded"] is True
@@ -0,0 +1,52 @@
+import server
+
+
+def create_post(api):
+    return api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+
+
+def comment(api, post_id, n):
+    return api.post(f"/api/blog/posts/{post_id}/comments",
+                    json={"post_id": post_id, "author_name": f"a{n}", "content": f"comment {n}",
+                          "email": "a@example.com"}).json()["id"]
+
+
+def test_comments_update_embedded_summary(api, monkeypatch):
+    monkeypatch.setattr(server, "RECENT_COMMENTS_LIMIT", 3)
+    post_id = create_post(api)
+    assert "comments" not in api.get(f"/api/blog/posts/{post_id}").json()
+
+    ids = [comment(api, post_id, n) for n in range(5)]
+    post = api.get(f"/api/blog/posts/{post_id}", params={"include_comments": True}).json()
+    assert post["comment_count"] == 5
+    embedded = post["comments"]
+    assert embedded["total"] == 5
+    # A CommentList, like the first page of the comments endpoint
+    assert (embedded["skip"], embedded["limit"]) == (0, 3)
+    required = api.get("/openapi.json").json()["components"]["schemas"]["CommentList"]["required"]
+    assert set(required) <= set(embedded)
+    listed = api.get(f"/api/blog/posts/{post_id}/comments").json()["comments"]
+    assert [c["id"] for c in embedded["comments"]] == [c["id"] for c in listed[:3]]
+    assert sorted(c["id"] for c in listed) == sorted(ids)
+    assert all("email" not in c for c in embedded["comments"])
+    assert "recent_comments" not in post
+
+    rest = api.get(f"/api/blog/posts/{post_id}/comments", params={"cursor": embedded["next_cursor"]}).json()
+    assert [c["id"] for c in rest["comments"]] == [c["id"] for c in listed[3:]]
+
+
+def test_bulk_comments_and_reconciliation(api):
+    first, second = create_post(api), create_post(api)
+    items = [{"post_id": post_id, "author_name": "a", "content": str(n)}
+             for n, post_id in enumerate([first, second, first])]
+    assert api.post("/api/blog/comments/bulk", json=items).json()["inserted"] == 3
+    assert api.get(f"/api/blog/posts/{first}").json()["comment_count"] == 2
+    assert api.post("/api/blog/comments/reconcile").json()["repaired"] == 0
+
+    api.portal.call(server.blog_posts_collection.update_one, {"id": first},
+                    {"$set": {"comment_count": 7, "recent_comments": []}})
+    assert api.post("/api/blog/comments/reconcile").json()["repaired"] == 1
+    post = api.get(f"/api/blog/posts/{first}", params={"include_comments": True}).json()
+    assert post["comment_count"] == 2
+    assert len(post["comments"]["comments"]) == 2
+    assert post["comments"]["next_cursor"] is None
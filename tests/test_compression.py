@@ -0,0 +1,74 @@
+import gzip
+import json
+
+import brotli
+
+import server
+from catalog import Catalog
+from compression import negotiate
+
+
+def test_negotiate_honours_q_values():
+    assert negotiate("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ("br", "gzip")) == "gzip"
+    assert negotiate("*;q=0.2", ("br", "gzip")) == "br"
+    assert negotiate("br;q=0, identity", ("br", "gzip")) is None
+    assert negotiate(None, ("gzip",)) is None
+
+
+def seed_posts(api, n=20):
+    for i in range(n):
+        api.post("/api/blog/posts", json={"title": f"Post {i}", "content": "long body " * 50, "excerpt": "e" * 100})
+
+
+def test_large_responses_are_compressed_by_preference(api):
+    seed_posts(api)
+    params = {"view": "full", "limit": 20}
+    identity = api.get("/api/blog/posts", params=params, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    br = api.get("/api/blog/posts", params=params, headers={"Accept-Encoding": "gzip, br"})
+    assert br.headers["content-encoding"] == "br"
+    assert "Accept-Encoding" in br.headers["vary"]
+    assert int(br.headers["content-length"]) < len(identity.content) / 5
+    assert br.json() == identity.json()
+
+    gz = api.get("/api/blog/posts", params=params, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.json() == identity.json()
+
+    # One strong tag per representation, each revalidating only itself
+    etags = {identity.headers["etag"], br.headers["etag"], gz.headers["etag"]}
+    assert len(etags) == 3 and gz.headers["etag"].endswith('-gzip"')
+    revalidate = {"Accept-Encoding": "gzip", "If-None-Match": gz.headers["etag"]}
+    assert api.get("/api/blog/posts", params=params, headers=revalidate).status_code == 304
+    revalidate["Accept-Encoding"] = "identity"
+    assert api.get("/api/blog/posts", params=params, headers=revalidate).status_code == 200
+
+    small = api.get("/api/health", headers={"Accept-Encoding": "gzip, br"})
+    assert "content-encoding" not in small.headers
+
+
+def test_static_payloads_are_served_precompressed(api, tmp_path, monkeypatch):
+    path = tmp_path / "catalog.json"
+    projects = [{"id": i, "category": "web", "description": "A long description " * 20} for i in range(10)]
+    path.write_text(json.dumps({"projects": projects, "testimonials": []}))
+    catalog = Catalog(str(path), compress_min_size=1024)
+    catalog.load()
+    monkeypatch.setattr(server, "catalog", catalog)
+
+    entry = catalog.projects()
+    assert set(entry.encodings) == {"br", "gzip"}
+    assert brotli.decompress(entry.encodings["br"]) == entry.body
+    assert gzip.decompress(entry.encodings["gzip"]) == entry.body
+
+    response = api.get("/api/portfolio/projects", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) == len(entry.encodings["br"])
+    assert response.json()["projects"] == projects
+    assert response.headers["etag"] == entry.etag[:-1] + '-br"'
+    assert api.get("/api/portfolio/projects", headers={
+        "Accept-Encoding": "br", "If-None-Match": response.headers["etag"]}).status_code == 304
+    assert api.get("/api/portfolio/projects", headers={
+        "Accept-Encoding": "identity", "If-None-Match": response.headers["etag"]}).status_code == 200
+    assert not catalog.testimonials().encodings
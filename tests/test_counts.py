@@ -0,0 +1,90 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from counts import CountCache
+
+
+def test_cache_hits_skip_the_database():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.items
+        await collection.insert_many([{"kind": "a"}, {"kind": "b"}])
+        cache = CountCache(ttl=60)
+        assert await cache.count(collection, {"kind": "a"}) == 1
+        assert await cache.count(collection, {}) == 2
+        await collection.insert_one({"kind": "a"})  # not recorded, so still cached
+        return await cache.count(collection, {"kind": "a"}), await cache.count(collection, {})
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_record_insert_updates_matching_shapes_only():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.items
+        await collection.insert_one({"kind": "a"})
+        cache = CountCache(ttl=60)
+        await cache.count(collection, {"kind": "a"})
+        await cache.count(collection, {"kind": "b"})
+        await cache.count(collection, {"n": {"$gt": 1}})
+        cache.record_insert("items", {"kind": "a"})
+        return (
+            await cache.count(collection, {"kind": "a"}),
+            await cache.count(collection, {"kind": "b"}),
+            len(cache._entries["items"]),
+        )
+
+    assert asyncio.run(scenario()) == (2, 0, 2)
+
+
+def test_expired_totals_are_recounted():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.items
+        cache = CountCache(ttl=0)
+        assert await cache.count(collection, {"kind": "a"}) == 0
+        await collection.insert_one({"kind": "a"})
+        return await cache.count(collection, {"kind": "a"})
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_entries_are_bounded_per_collection():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.items
+        cache = CountCache(ttl=60, max_entries=3)
+        for tag in ["a", "b", "c"]:
+            await cache.count(collection, {"tags": tag})
+        await cache.count(collection, {"tags": "a"})  # used again, so "b" is oldest
+        await cache.count(collection, {"tags": "d"})
+        evicted = list(cache._entries["items"])
+        # Client-chosen filters cannot grow the cache
+        for n in range(100):
+            await cache.count(collection, {"tags": f"spam-{n}"})
+        return evicted, len(cache._entries["items"])
+
+    evicted, size = asyncio.run(scenario())
+    assert evicted == ['{"tags": "c"}', '{"tags": "a"}', '{"tags": "d"}']
+    assert size == 3
+
+
+def test_expired_entries_are_dropped():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.items
+        cache = CountCache(ttl=0)
+        await cache.count(collection, {"kind": "a"})
+        await cache.count(collection, {"kind": "b"})
+        cache.record_insert("items", {"kind": "a"})
+        return len(cache._entries["items"])
+
+    assert asyncio.run(scenario()) == 0
+
+
+def test_listing_totals_follow_writes(api):
+    assert api.get("/api/blog/posts").json()["total"] == 0
+    api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"})
+    assert api.get("/api/blog/posts").json()["total"] == 1
+    assert api.get("/api/blog/posts", params={"published": False}).json()["total"] == 1
+
+    listing = api.get("/api/contacts", params={"include_total": False}).json()
+    assert listing["total"] is None
+    assert server.contacts_collection.name not in server.count_cache._entries
@@ -0,0 +1,134 @@
+import asyncio
+import socket
+from datetime import datetime
+
+import pytest
+from aiosmtpd.controller import Controller
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from email_outbox import FAILED, PENDING, SENT, EmailOutbox
+
+
+class RecordingHandler:
+    def __init__(self, refuse_first=0):
+        self.messages = []
+        self.refuse_remaining = refuse_first
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if self.refuse_remaining:
+            self.refuse_remaining -= 1
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 Message accepted"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(**kwargs):
+        handler = RecordingHandler(**kwargs)
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        return handler, controller.port
+
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def make_outbox(port, **kwargs):
+    collection = AsyncMongoMockClient().test.email_outbox
+    options = dict(host="127.0.0.1", port=port, sender="noreply@example.com", use_tls=False, retry_backoff=60)
+    options.update(kwargs)
+    return EmailOutbox(collection, **options)
+
+
+async def rewind(outbox):
+    """Make every backed-off message due now"""
+    await outbox.collection.update_many({}, {"$set": {"next_attempt_at": datetime.utcnow()}})
+
+
+def test_batch_reuses_one_smtp_session(smtp_server):
+    handler, port = smtp_server()
+    outbox = make_outbox(port, workers=1)
+
+    async def scenario():
+        for i in range(5):
+            await outbox.enqueue("owner@example.com", f"Subject {i}", "body")
+        sent = await outbox.drain()
+        await outbox.stop()
+        statuses = [doc["status"] async for doc in outbox.collection.find({})]
+        return sent, statuses
+
+    sent, statuses = asyncio.run(scenario())
+    assert sent == 5
+    assert statuses == [SENT] * 5
+    assert len(handler.messages) == 5
+    assert outbox.sessions[0].connections_opened == 1
+
+
+def test_failed_delivery_is_retried_then_abandoned(smtp_server):
+    handler, port = smtp_server(refuse_first=1)
+    outbox = make_outbox(port, workers=1, max_attempts=2)
+
+    async def scenario():
+        await outbox.enqueue("owner@example.com", "Hello", "body")
+        assert await outbox.drain() == 0
+        doc = await outbox.collection.find_one({})
+        assert doc["status"] == PENDING and doc["attempts"] == 1
+        assert await outbox.drain() == 0  # backing off
+        await rewind(outbox)
+        assert await outbox.drain() == 1
+        await outbox.stop()
+        return await outbox.collection.find_one({})
+
+    doc = asyncio.run(scenario())
+    assert doc["status"] == SENT
+    assert len(handler.messages) == 1
+
+    _, dead_port = smtp_server(refuse_first=10)
+    outbox = make_outbox(dead_port, workers=1, max_attempts=2)
+
+    async def give_up():
+        await outbox.enqueue("owner@example.com", "Hello", "body")
+        await outbox.drain()
+        await rewind(outbox)
+        await outbox.drain()
+        await outbox.stop()
+        return await outbox.collection.find_one({})
+
+    assert asyncio.run(give_up())["status"] == FAILED
+
+
+def test_contact_form_queues_and_workers_deliver(monkeypatch, smtp_server):
+    handler, port = smtp_server()
+    monkeypatch.setattr(server, "AsyncIOMotorClient", AsyncMongoMockClient)
+    monkeypatch.setattr(server, "EMAIL_ENABLED", True)
+    monkeypatch.setattr(server, "SMTP_SERVER", "127.0.0.1")
+    monkeypatch.setattr(server, "SMTP_PORT", port)
+    monkeypatch.setattr(server, "SMTP_USE_TLS", False)
+
+    from fastapi.testclient import TestClient
+    with TestClient(server.app) as api:
+        response = api.post("/api/contact", json={"name": "Bo", "email": "bo@example.com", "message": "Hi"})
+        assert response.status_code == 200
+        for _ in range(100):
+            if handler.messages:
+                break
+            api.portal.call(asyncio.sleep, 0.05)
+
+    assert len(handler.messages) == 1
+    assert b"New Contact Form Submission" in handler.messages[0].content
@@ -0,0 +1,64 @@
+import csv
+import gzip
+import io
+import json
+
+from export import stream_export
+
+
+def seed_contacts(api, n):
+    for i in range(n):
+        api.post("/api/contact", json={"name": f"n{i}", "email": "a@example.com", "message": f"hello, {i}"})
+
+
+def test_ndjson_export_is_gzipped_and_resumable(api):
+    seed_contacts(api, 5)
+    response = api.get("/api/contacts/export", params={"batch_size": 2},
+                       headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["name"] for row in rows] == [f"n{i}" for i in range(5)]
+
+    checkpoint = rows[2]
+    rest = api.get("/api/contacts/export", params={
+        "since": checkpoint["submitted_at"], "after_id": checkpoint["id"], "compress": False,
+    })
+    assert "content-encoding" not in rest.headers
+    assert [json.loads(line)["name"] for line in rest.text.splitlines()] == ["n3", "n4"]
+
+
+def test_csv_export_of_comments(api):
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    api.post(f"/api/blog/posts/{post_id}/comments", json={
+        "post_id": post_id, "author_name": "Ann", "content": 'Quote "this", please', "email": "ann@example.com",
+    })
+    response = api.get("/api/comments/export", params={"format": "csv", "post_id": post_id})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["content"] == 'Quote "this", please'
+    assert "email" not in rows[0]
+
+
+def test_stream_yields_one_chunk_per_batch():
+    class FakeCursor:
+        def __init__(self, docs):
+            self.docs = docs
+
+        def batch_size(self, n):
+            return self
+
+        def __aiter__(self):
+            async def gen():
+                for doc in self.docs:
+                    yield doc
+            return gen()
+
+    async def collect():
+        docs = [{"id": str(i)} for i in range(5)]
+        return [chunk async for chunk in stream_export(FakeCursor(docs), ["id"], "ndjson", 2, compress=True)]
+
+    import asyncio
+    chunks = asyncio.run(collect())
+    lines = gzip.decompress(b"".join(chunks)).decode().splitlines()
+    assert lines == [json.dumps({"id": str(i)}, separators=(",", ":")) for i in range(5)]
@@ -0,0 +1,106 @@
+"""Index registry checks.
+
+The explain() checks need a real mongod (mongomock has no query planner);
+set MONGO_TEST_URL to run them, e.g. MONGO_TEST_URL=mongodb://localhost:27017/
+"""
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from indexes import INDEXES, ensure_indexes
+from pagination import after_cursor, encode_cursor, sort_spec
+from scheduler import due_query
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL")
+
+# (collection, filter, sort) for every query a route issues
+ROUTE_QUERIES = [
+    ("blog_posts", {"id": "x"}, None),
+    ("blog_posts", {"published": True}, sort_spec("publish_at")),
+    ("blog_posts", after_cursor({"published": True}, "publish_at", encode_cursor("2024", "x")), sort_spec("publish_at")),
+    ("blog_posts", due_query(datetime.utcnow()), [("publish_at", 1)]),
+    ("blog_posts", {}, sort_spec("created_at")),
+    ("blog_posts", {"published": True, "tags": "python"}, sort_spec("publish_at")),
+    ("blog_posts", {"published": True, "tags": {"$all": ["python", "web"]}}, sort_spec("publish_at")),
+    ("blog_tags", {"published_count": {"$gt": 0}}, [("published_count", -1), ("tag", 1)]),
+    ("blog_tags", {"post_count": {"$gt": 0}}, [("post_count", -1), ("tag", 1)]),
+    ("comments", {"post_id": "x", "approved": True}, sort_spec("created_at")),
+    ("comments", after_cursor({"post_id": "x", "approved": True}, "created_at", encode_cursor("2024", "x")),
+     sort_spec("created_at")),
+    ("contacts", {}, sort_spec("submitted_at")),
+    ("contacts", after_cursor({}, "submitted_at", encode_cursor("2024", "x")), sort_spec("submitted_at")),
+    ("users", {"email": "a@example.com"}, None),
+    ("email_outbox", {"$or": [
+        {"status": "pending", "next_attempt_at": {"$lte": datetime.utcnow()}},
+        {"status": "sending", "locked_until": {"$lt": datetime.utcnow()}},
+    ]}, [("next_attempt_at", 1)]),
+    ("blog_posts", {"updated_at": {"$gte": "2024"}}, [("updated_at", 1)]),
+    ("comments", {"created_at": {"$gte": "2024"}}, [("created_at", 1)]),
+    ("contacts", {"submitted_at": {"$gt": "2024"}}, [("submitted_at", 1), ("id", 1)]),
+    ("comments", {}, [("created_at", 1), ("id", 1)]),
+    ("comments", {"status": "pending"}, sort_spec("created_at")),
+    ("comments", {"moderated_at": {"$gte": datetime.min}}, [("moderated_at", 1)]),
+    ("comments", {"created_at": {"$gte": datetime.utcnow()}, "spam_score": None}, [("created_at", 1), ("id", 1)]),
+    ("response_cache", {"key": "/api/blog/posts?", "expires_at": {"$gt": datetime.utcnow()}}, None),
+    ("rate_limits", {"key": "contact:ip:127.0.0.1", "tat": {"$lte": 0}}, None),
+    ("submission_fingerprints", {"key": "contact:x", "expires_at": {"$lte": datetime.utcnow()}}, None),
+]
+
+
+def plan_stages(plan):
+    """Yield every stage name in a winning plan tree"""
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            yield from plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from plan_stages(child)
+
+
+def test_ensure_indexes_is_idempotent():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        await ensure_indexes(db)
+        await ensure_indexes(db)
+        return {name: await db[name].index_information() for name in INDEXES}
+
+    info = asyncio.run(scenario())
+    assert info["users"]["email_unique"]["unique"]
+    assert "post_approved_created_at" in info["comments"]
+
+
+def test_one_failing_collection_does_not_stop_the_rest():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        # Left behind by the old check-then-insert registration race
+        await db.users.insert_many([{"id": "a", "email": "x@example.com"}, {"id": "b", "email": "x@example.com"}])
+        created = await ensure_indexes(db)
+        return created, await db.rate_limits.index_information()
+
+    created, rate_limits = asyncio.run(scenario())
+    assert "users" not in created
+    assert set(created) == set(INDEXES) - {"users"}
+    assert any(info.get("unique") for info in rate_limits.values())
+
+
+@pytest.mark.skipif(not MONGO_TEST_URL, reason="MONGO_TEST_URL not set")
+@pytest.mark.parametrize("collection,query,sort", ROUTE_QUERIES)
+def test_route_queries_use_an_index(collection, query, sort):
+    from pymongo import MongoClient
+
+    client = MongoClient(MONGO_TEST_URL)
+    try:
+        db = client.gotech_solutions_index_test
+        for name, models in INDEXES.items():
+            db[name].create_indexes(models)
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning = cursor.explain()["queryPlanner"]["winningPlan"]
+        assert "COLLSCAN" not in set(plan_stages(winning)), winning
+    finally:
+        client.drop_database("gotech_solutions_index_test")
+        client.close()
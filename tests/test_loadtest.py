@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+
+import pytest
+
+import server
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import loadtest  # noqa: E402
+
+
+def stats(p95, rps=100.0, errors=0):
+    return {"requests": 10, "throughput_rps": rps, "mean_ms": p95, "p50_ms": p95, "p95_ms": p95, "p99_ms": p95,
+            "errors": errors}
+
+
+def test_compare_flags_latency_throughput_and_errors():
+    baseline = {"overall": stats(10.0), "operations": {"get_post": stats(5.0), "login": stats(50.0)}}
+    same = {"overall": stats(11.0), "operations": {"get_post": stats(5.5), "login": stats(51.0)}}
+    assert loadtest.compare(baseline, same, threshold=0.2, min_delta_ms=1.0) == []
+
+    worse = {"overall": stats(10.0, rps=70.0), "operations": {"get_post": stats(9.0), "login": stats(50.0, errors=2)}}
+    regressions = loadtest.compare(baseline, worse, threshold=0.2, min_delta_ms=1.0)
+    assert len(regressions) == 3
+    assert any(r.startswith("get_post p95") for r in regressions)
+
+
+def test_in_process_run_covers_every_operation(tmp_path, monkeypatch):
+    # The suite patches server globals for its own process; restore them afterwards
+    for name in ("AsyncIOMotorClient", "ensure_indexes", "RATE_LIMITS", "SUBMISSION_DEDUP_WINDOW"):
+        monkeypatch.setattr(server, name, getattr(server, name))
+    monkeypatch.setattr(server, "PASSWORD_ROUNDS", 1000)
+    baseline = tmp_path / "mixed.json"
+
+    args = ["--requests", "300", "--concurrency", "10", "--posts", "10", "--rounds", "1", "--baseline", str(baseline)]
+    assert loadtest.main(args + ["--save-baseline"]) == 0
+    result = json.loads(baseline.read_text())
+    assert set(result["operations"]) <= set(loadtest.WORKLOADS["mixed"])
+    assert {"list_posts", "get_post", "submit_contact", "create_comment", "login"} <= set(result["operations"])
+    assert result["overall"]["errors"] == 0
+    assert loadtest.main(args + ["--threshold", "100"]) == 0
@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import server
+from metrics import (HTTP_REQUESTS, MONGO_COMMAND_SECONDS, MONGO_POOL_CHECKOUT_FAILURES, MONGO_POOL_CHECKOUT_SECONDS,
+                     MONGO_POOL_SATURATION, Histogram, MongoCommandTimer, PoolMonitor)
+
+
+def test_routes_are_recorded_by_template(api):
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    before = HTTP_REQUESTS.value("GET", "/api/blog/posts/{post_id}", "200")
+    api.get(f"/api/blog/posts/{post_id}")
+    api.get("/api/blog/posts/missing")
+    assert HTTP_REQUESTS.value("GET", "/api/blog/posts/{post_id}", "200") == before + 1
+
+    body = api.get("/metrics")
+    assert body.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = body.text
+    assert "# TYPE http_request_duration_seconds histogram" in text
+    assert 'http_requests_total{method="GET",route="/api/blog/posts/{post_id}",status="404"}' in text
+    assert 'response_cache_events_total{outcome="misses"}' in text
+    assert post_id not in text
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("h", "test", ["route"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/x")
+    lines = histogram.samples()
+    assert 'h_bucket{route="/x",le="0.1"} 2' in lines
+    assert 'h_bucket{route="/x",le="1.0"} 3' in lines
+    assert 'h_bucket{route="/x",le="+Inf"} 4' in lines
+    assert 'h_count{route="/x"} 4' in lines
+
+
+def test_command_listener_times_by_collection_and_operation():
+    timer = MongoCommandTimer()
+    started = SimpleNamespace(command={"find": "blog_posts"}, command_name="find", connection_id=("h", 1), request_id=7)
+    timer.started(started)
+    timer.succeeded(SimpleNamespace(command_name="find", connection_id=("h", 1), request_id=7, duration_micros=1500))
+    assert MONGO_COMMAND_SECONDS.count("blog_posts", "find") >= 1
+
+    more = SimpleNamespace(command={"getMore": 12345, "collection": "comments"}, command_name="getMore",
+                           connection_id=("h", 1), request_id=8)
+    timer.started(more)
+    timer.succeeded(SimpleNamespace(command_name="getMore", connection_id=("h", 1), request_id=8, duration_micros=900))
+    assert MONGO_COMMAND_SECONDS.count("comments", "getMore") >= 1
+
+
+def test_pool_monitor_tracks_checkouts_and_saturation(api, monkeypatch):
+    monitor = PoolMonitor(max_pool_size=2)
+    event = SimpleNamespace(address=("db1", 27017), reason="timeout")
+    monitor.pool_created(event)
+    for _ in range(2):
+        monitor.connection_created(event)
+        monitor.connection_check_out_started(event)
+        monitor.connection_checked_out(event)
+    monitor.connection_check_out_started(event)
+    assert monitor.snapshot()["db1:27017"] == {"connections": 2, "checked_out": 2, "waiting": 1}
+    assert MONGO_POOL_SATURATION.value("db1:27017") == 1.0
+    assert MONGO_POOL_CHECKOUT_SECONDS.count("db1:27017") >= 2
+
+    monkeypatch.setattr(server, "mongo_pool_monitor", monitor)
+    assert api.get("/api/health").json()["status"] == "degraded"
+
+    monitor.connection_check_out_failed(event)
+    monitor.connection_checked_in(event)
+    assert monitor.snapshot()["db1:27017"] == {"connections": 2, "checked_out": 1, "waiting": 0}
+    assert MONGO_POOL_CHECKOUT_FAILURES.value("db1:27017", "timeout") >= 1
+    assert api.get("/api/health").json()["pool"]["servers"]["db1:27017"]["checked_out"] == 1
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+from migrations import apply_migrations
+
+
+def test_string_timestamps_become_dates_once():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        await db.blog_posts.insert_one({
+            "id": "p", "created_at": "2024-01-02T03:04:05.678000", "updated_at": datetime(2024, 1, 3),
+            "recent_comments": [{"id": "c", "created_at": "2024-01-04T00:00:00"}],
+        })
+        await db.contacts.insert_one({"id": "c", "submitted_at": "2024-01-05T00:00:00"})
+        await apply_migrations(db)
+        await db.contacts.insert_one({"id": "late", "submitted_at": "2024-01-06T00:00:00"})
+        await apply_migrations(db)
+        return (await db.blog_posts.find_one({"id": "p"}), await db.contacts.find_one({"id": "c"}),
+                await db.contacts.find_one({"id": "late"}), await db.migrations.find_one({"_id": "native_datetimes"}))
+
+    post, contact, late, marker = asyncio.run(scenario())
+    assert post["created_at"] == datetime(2024, 1, 2, 3, 4, 5, 678000)
+    assert post["updated_at"] == datetime(2024, 1, 3)
+    assert post["recent_comments"][0]["created_at"] == datetime(2024, 1, 4)
+    assert contact["submitted_at"] == datetime(2024, 1, 5)
+    # Applied once; the marker stops later boots from rescanning
+    assert late["submitted_at"] == "2024-01-06T00:00:00"
+    assert marker["changed"] == 2
+
+
+def test_publish_at_backfilled_from_created_at():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        await db.blog_posts.insert_many([
+            {"id": "live", "published": True, "created_at": datetime(2024, 1, 2)},
+            {"id": "draft", "published": False, "created_at": datetime(2024, 1, 3)},
+        ])
+        await apply_migrations(db)
+        return {p["id"]: p["publish_at"] async for p in db.blog_posts.find({})}
+
+    assert asyncio.run(scenario()) == {"live": datetime(2024, 1, 2), "draft": None}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import server
+from moderation import HeuristicSpamScorer, SpamScreen
+
+
+class FixedScorer:
+    """Scores every comment by the number in its content"""
+
+    async def score(self, comment):
+        return float(comment["content"].split()[-1])
+
+
+def create_post(api):
+    return api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+
+
+def comment(api, post_id, content):
+    response = api.post(f"/api/blog/posts/{post_id}/comments",
+                        json={"post_id": post_id, "author_name": "reader", "content": content}).json()
+    return response["id"], response["status"]
+
+
+def public(api, post_id):
+    return [c["id"] for c in api.get(f"/api/blog/posts/{post_id}/comments").json()["comments"]]
+
+
+def test_pre_moderation_queue_and_batched_decisions(api, monkeypatch):
+    monkeypatch.setattr(server, "COMMENT_MODERATION", "pre")
+    post_id = create_post(api)
+    ids = [comment(api, post_id, f"moderated thoughts {n}")[0] for n in range(3)]
+    assert public(api, post_id) == []
+
+    queue = api.get("/api/moderation/comments").json()
+    assert queue["total"] == 3
+    assert {c["status"] for c in queue["comments"]} == {"pending"}
+
+    approved = api.post("/api/moderation/comments/approve", json={"ids": ids[:2] + ["missing"]}).json()
+    assert approved["updated"] == 2
+    # Visible at once: listing, post stats, embedded comments and search
+    assert sorted(public(api, post_id)) == sorted(ids[:2])
+    post = api.get(f"/api/blog/posts/{post_id}", params={"include_comments": True}).json()
+    assert post["comment_count"] == 2
+    assert [c["id"] for c in post["comments"]["comments"]] == [ids[1], ids[0]]
+    assert api.get("/api/blog/search", params={"q": "moderated", "type": "comments"}).json()["total"] == 2
+    assert api.post("/api/moderation/comments/approve", json={"ids": ids[:2]}).json()["updated"] == 0
+
+    # One published comment withdrawn, one pending comment rejected
+    assert api.post("/api/moderation/comments/reject", json={"ids": [ids[0], ids[2]]}).json()["updated"] == 2
+    assert public(api, post_id) == [ids[1]]
+    assert api.get(f"/api/blog/posts/{post_id}").json()["comment_count"] == 1
+    assert api.get("/api/moderation/comments", params={"status": "rejected"}).json()["total"] == 2
+    assert api.get("/api/moderation/comments").json()["total"] == 0
+    assert api.post("/api/blog/comments/reconcile").json()["repaired"] == 0
+
+
+@pytest.fixture
+def fixed_scorer(monkeypatch):
+    """Configure the scorer by name, as SPAM_SCORER would; list before ``api``"""
+    monkeypatch.setattr(server, "SPAM_SCORER", "tests.test_moderation:FixedScorer")
+
+
+def test_spam_screen_holds_and_rejects(fixed_scorer, api):
+    post_id = create_post(api)
+    clean, clean_status = comment(api, post_id, "fine 0.1")
+    held, held_status = comment(api, post_id, "suspicious 0.6")
+    spam, _ = comment(api, post_id, "spam 0.95")
+    # Published on the request path, before any scoring
+    assert clean_status == held_status == "approved"
+    api.portal.call(server.spam_screen.join)
+
+    assert public(api, post_id) == [clean]
+    assert api.get(f"/api/blog/posts/{post_id}").json()["comment_count"] == 1
+    pending = api.get("/api/moderation/comments").json()["comments"]
+    assert [(c["id"], c["spam_score"], c["moderated_by"]) for c in pending] == [(held, 0.6, "scorer")]
+    assert api.get("/api/moderation/comments", params={"status": "rejected"}).json()["comments"][0]["id"] == spam
+
+
+def test_scorer_never_overrides_a_moderator(api, monkeypatch):
+    monkeypatch.setattr(server, "COMMENT_MODERATION", "pre")
+    post_id = create_post(api)
+    comment_id, _ = comment(api, post_id, "approved by hand 0.99")
+    api.post("/api/moderation/comments/approve", json={"ids": [comment_id]})
+
+    screen = SpamScreen(server.comments_collection, server.moderator, FixedScorer())
+    doc = api.portal.call(server.comments_collection.find_one, {"id": comment_id})
+    assert api.portal.call(screen.screen, doc) is None
+    assert public(api, post_id) == [comment_id]
+
+
+def test_heuristic_scorer():
+    scorer = HeuristicSpamScorer()
+    assert asyncio.run(scorer.score({"content": "Thanks, this helped me fix my deployment."})) == 0.0
+    spam = {"author_name": "SEO services", "content": "BUY NOW!!! click here http://a.example http://b.example"}
+    assert asyncio.run(scorer.score(spam)) >= 0.9
@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    token = encode_cursor("2024-01-01T00:00:00", "abc")
+    assert "=" not in token
+    assert decode_cursor(token) == ("2024-01-01T00:00:00", "abc")
+    moment = datetime(2024, 1, 1, 12, 30, 0, 125000)
+    assert decode_cursor(encode_cursor(moment, "abc")) == (moment, "abc")
+
+
+def test_garbage_cursor_rejected(api):
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+    assert api.get("/api/contacts", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_cursor_pages_match_skip_pages(api):
+    for i in range(7):
+        api.post("/api/contact", json={"name": f"n{i}", "email": "a@example.com", "message": "m"})
+
+    by_skip = []
+    for skip in range(0, 7, 3):
+        by_skip += [c["id"] for c in api.get("/api/contacts", params={"skip": skip, "limit": 3}).json()["contacts"]]
+
+    by_cursor = []
+    page = api.get("/api/contacts", params={"limit": 3}).json()
+    while True:
+        by_cursor += [c["id"] for c in page["contacts"]]
+        if not page["next_cursor"]:
+            break
+        page = api.get("/api/contacts", params={"limit": 3, "cursor": page["next_cursor"]}).json()
+
+    assert by_cursor == by_skip
+    assert len(set(by_cursor)) == 7
+
+
+def test_blog_posts_and_comments_expose_next_cursor(api):
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    api.post("/api/blog/posts", json={"title": "t2", "content": "c", "excerpt": "e"})
+    first = api.get("/api/blog/posts", params={"limit": 1}).json()
+    second = api.get("/api/blog/posts", params={"limit": 1, "cursor": first["next_cursor"]}).json()
+    assert first["posts"][0]["id"] != second["posts"][0]["id"]
+
+    for _ in range(2):
+        api.post(f"/api/blog/posts/{post_id}/comments", json={"post_id": post_id, "author_name": "a", "content": "c"})
+    comments = api.get(f"/api/blog/posts/{post_id}/comments", params={"limit": 1}).json()
+    assert comments["next_cursor"]
+    rest = api.get(f"/api/blog/posts/{post_id}/comments", params={"limit": 5, "cursor": comments["next_cursor"]}).json()
+    assert len(rest["comments"]) == 1 and rest["next_cursor"] is None
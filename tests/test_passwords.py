@@ -0,0 +1,50 @@
+import pytest
+
+import server
+from passwords import build_context
+
+
+@pytest.fixture
+def cheap_hashing(monkeypatch):
+    monkeypatch.setattr(server, "PASSWORD_ROUNDS", 1000)
+    monkeypatch.setattr(server, "PASSWORD_HASH_WORKERS", 1)
+
+
+def register(api, email="ada@example.com", password="correct horse"):
+    return api.post("/api/users/register", json={"name": "Ada", "email": email, "password": password})
+
+
+def stored_user(api, email):
+    return api.portal.call(server.users_collection.find_one, {"email": email})
+
+
+def test_register_stores_hash_and_login_verifies(cheap_hashing, api):
+    assert register(api).status_code == 200
+    user = stored_user(api, "ada@example.com")
+    assert "password" not in user
+    assert user["password_hash"].startswith("$pbkdf2-sha256$1000$")
+
+    response = api.post("/api/users/login", json={"email": "ada@example.com", "password": "correct horse"})
+    assert response.status_code == 200
+    assert response.json()["user_id"] == user["id"]
+
+    assert api.post("/api/users/login", json={"email": "ada@example.com", "password": "wrong"}).status_code == 401
+    assert api.post("/api/users/login", json={"email": "bob@example.com", "password": "x"}).status_code == 401
+
+
+def test_login_upgrades_outdated_and_plain_text_passwords(cheap_hashing, api):
+    weak = build_context(["pbkdf2_sha256"], rounds=500).hash("old secret")
+    api.portal.call(server.users_collection.insert_many, [
+        {"id": "u1", "name": "Old", "email": "old@example.com", "password_hash": weak, "active": True},
+        {"id": "u2", "name": "Legacy", "email": "legacy@example.com", "password": "plain", "active": True},
+    ])
+
+    assert api.post("/api/users/login", json={"email": "old@example.com", "password": "old secret"}).status_code == 200
+    assert stored_user(api, "old@example.com")["password_hash"].startswith("$pbkdf2-sha256$1000$")
+
+    assert api.post("/api/users/login", json={"email": "legacy@example.com", "password": "wrong"}).status_code == 401
+    assert "password_hash" not in stored_user(api, "legacy@example.com")
+    assert api.post("/api/users/login", json={"email": "legacy@example.com", "password": "plain"}).status_code == 200
+    legacy = stored_user(api, "legacy@example.com")
+    assert "password" not in legacy
+    assert legacy["password_hash"].startswith("$pbkdf2-sha256$1000$")
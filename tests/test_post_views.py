@@ -0,0 +1,40 @@
+import server
+
+
+def create_post(api):
+    return api.post("/api/blog/posts", json={
+        "title": "Projection", "content": "long body " * 100, "excerpt": "short", "tags": ["x"],
+    }).json()["id"]
+
+
+def test_listing_defaults_to_summary(api):
+    post_id = create_post(api)
+    post = api.get("/api/blog/posts").json()["posts"][0]
+    assert "content" not in post
+    assert set(post) == set(server.POST_SUMMARY_FIELDS)
+    assert "content" in api.get(f"/api/blog/posts/{post_id}").json()
+
+
+def test_full_view_and_explicit_fields(api):
+    create_post(api)
+    assert "content" in api.get("/api/blog/posts", params={"view": "full"}).json()["posts"][0]
+
+    post = api.get("/api/blog/posts", params={"fields": "title,tags"}).json()["posts"][0]
+    assert set(post) == {"id", "publish_at", "title", "tags"}
+
+    assert api.get("/api/blog/posts", params={"fields": "title,password"}).status_code == 400
+    assert api.get("/api/blog/posts", params={"view": "everything"}).status_code == 422
+
+
+def test_explicit_fields_page_through_with_cursor(api):
+    ids = {create_post(api) for _ in range(5)}
+    seen = []
+    params = {"fields": "title", "limit": 2}
+    while True:
+        page = api.get("/api/blog/posts", params=params).json()
+        seen.extend(post["id"] for post in page["posts"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert page["total"] == 5
+    assert len(seen) == 5 and set(seen) == ids
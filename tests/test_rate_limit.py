@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from indexes import ensure_indexes
+from rate_limit import Limit, MemoryBackend, MongoBackend, RateLimiter, parse_limit
+
+
+def test_parse_limit():
+    assert parse_limit("5/60") == Limit(5, 60.0)
+    assert parse_limit("3") == Limit(3, 60.0)
+    assert parse_limit("0") is None and parse_limit("") is None
+
+
+def mongo_backend():
+    db = AsyncMongoMockClient().test
+    asyncio.run(ensure_indexes(db))
+    return MongoBackend(db.rate_limits, db.submission_fingerprints)
+
+
+@pytest.mark.parametrize("make_backend", [MemoryBackend, mongo_backend])
+def test_bucket_allows_burst_then_waits(make_backend):
+    backend = make_backend()
+
+    async def scenario():
+        limit = Limit(3, 30.0)
+        results = [await backend.acquire("k", limit) for _ in range(4)]
+        other = await backend.acquire("other", limit)
+        first = await backend.remember("digest", 60)
+        again = await backend.remember("digest", 60)
+        await backend.forget("digest")
+        return results, other, first, again, await backend.remember("digest", 60)
+
+    results, other, first, again, after_forget = asyncio.run(scenario())
+    assert results[:3] == [None, None, None]
+    assert 9 < results[3] <= 10
+    assert other is None
+    assert (first, again, after_forget) == (True, False, True)
+
+
+def test_contact_route_limits_and_dedups(api, monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", RateLimiter(MemoryBackend(), {"contact": Limit(2, 60.0)}))
+
+    def submit(message, email="a@example.com"):
+        return api.post("/api/contact", json={"name": "n", "email": email, "message": message})
+
+    assert submit("hello").status_code == 200
+    duplicate = submit("  HELLO ")
+    assert duplicate.status_code == 409
+    assert submit("second").status_code == 429
+    limited = submit("third", email="b@example.com")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+    assert len(api.get("/api/contacts").json()["contacts"]) == 1
+
+
+def test_failed_comment_releases_fingerprint(api, monkeypatch):
+    monkeypatch.setattr(server, "rate_limiter", RateLimiter(MemoryBackend(), {}))
+    body = {"post_id": "missing", "author_name": "a", "content": "same"}
+    assert api.post("/api/blog/posts/missing/comments", json=body).status_code == 404
+    assert api.post("/api/blog/posts/missing/comments", json=body).status_code == 404
+
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    body["post_id"] = post_id
+    assert api.post(f"/api/blog/posts/{post_id}/comments", json=body).status_code == 200
+    assert api.post(f"/api/blog/posts/{post_id}/comments", json=body).status_code == 409
+
+
+def test_bulk_imports_with_production_limits(api, monkeypatch):
+    limits = {route: parse_limit(spec) for route, spec in server.RATE_LIMIT_DEFAULTS.items()}
+    monkeypatch.setattr(server, "rate_limiter", RateLimiter(MemoryBackend(), limits, dedup_window=600))
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+
+    # An archive migration is far larger than any per-submitter burst
+    contacts = [{"name": "n", "email": f"{n}@example.com", "message": f"message {n}"} for n in range(50)]
+    assert api.post("/api/contact/bulk", json=contacts).json()["inserted"] == 50
+    comments = [{"post_id": post_id, "author_name": f"a{n}", "content": f"comment {n}"} for n in range(50)]
+    assert api.post("/api/blog/comments/bulk", json=comments).json()["inserted"] == 50
+
+    # Replaying the same queue within the dedup window stores nothing twice
+    replay = api.post("/api/contact/bulk", json=contacts[:3] + [{"name": "n", "email": "new@example.com",
+                                                                 "message": "new"}]).json()
+    assert replay["inserted"] == 1
+    assert [e["error"] for e in replay["errors"]] == ["Duplicate submission"] * 3
+
+    # The route-level limit counts requests, not items
+    statuses = [api.post("/api/contact/bulk", json=[]).status_code for _ in range(limits["bulk"].capacity)]
+    assert statuses.count(429) == 3
+    limited = api.post("/api/contact/bulk", json=[])
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) > 0
@@ -0,0 +1,35 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.read_preferences import Primary
+
+import server
+
+
+@pytest.fixture
+def lagging_secondary(monkeypatch):
+    """Every handle that may read from a secondary sees a replica that never catches up"""
+    connect = server.connect_to_mongo
+    stale = AsyncMongoMockClient()["stale"]
+
+    def connect_with_lag():
+        connect()
+        for name, value in list(vars(server).items()):
+            if isinstance(value, AsyncIOMotorCollection) and value.read_preference != Primary():
+                monkeypatch.setattr(server, name, stale[value.name])
+
+    monkeypatch.setattr(server, "connect_to_mongo", connect_with_lag)
+
+
+def test_cached_reads_never_refill_from_a_secondary(lagging_secondary, api):
+    assert api.get("/api/blog/posts").json()["total"] == 0
+    post_id = api.post("/api/blog/posts", json={"title": "t", "content": "c", "excerpt": "e"}).json()["id"]
+    # The write invalidated the cached page and total; the refill must see it
+    listing = api.get("/api/blog/posts").json()
+    assert (listing["total"], [p["id"] for p in listing["posts"]]) == (1, [post_id])
+
+    api.post(f"/api/blog/posts/{post_id}/comments", json={"post_id": post_id, "author_name": "a", "content": "c"})
+    comments = api.get(f"/api/blog/posts/{post_id}/comments").json()
+    assert (comments["total"], len(comments["comments"])) == (1, 1)
+    # Exports are the reads allowed to lag
+    assert api.get("/api/comments/export", params={"compress": False}).text == ""
@@ -0,0 +1,77 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+import server
+from response_cache import MongoCacheTier, ResponseCache
+
+
+def create_post(api, title="Cached"):
+    return api.post("/api/blog/posts", json={"title": title, "content": "c", "excerpt": "e"}).json()["id"]
+
+
+def test_listing_hits_cache_and_revalidates_with_etag(api):
+    create_post(api)
+    first = api.get("/api/blog/posts")
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+
+    second = api.get("/api/blog/posts")
+    assert second.content == first.content
+    assert server.response_cache.stats()["hits"] == 1
+
+    not_modified = api.get("/api/blog/posts", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # Different query params are cached separately
+    assert api.get("/api/blog/posts", params={"limit": 1}).headers["etag"] != etag
+
+
+def test_writes_invalidate_cached_pages(api):
+    create_post(api, "one")
+    etag = api.get("/api/blog/posts").headers["etag"]
+    create_post(api, "two")
+    refreshed = api.get("/api/blog/posts", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["total"] == 2
+
+
+def test_cached_post_still_counts_views(api):
+    post_id = create_post(api)
+    for _ in range(3):
+        assert api.get(f"/api/blog/posts/{post_id}").status_code == 200
+    assert server.view_counter.pending(post_id) == 3
+    assert api.get("/api/cache/stats").json()["hits"] == 2
+
+
+def test_shared_tier_serves_other_workers():
+    async def scenario():
+        tier = MongoCacheTier(AsyncMongoMockClient().test.response_cache)
+        worker_a = ResponseCache(shared=tier)
+        worker_b = ResponseCache(shared=tier)
+        entry = await worker_a.set("/api/blog/posts?", {"posts": []})
+        shared = await worker_b.get("/api/blog/posts?")
+        await worker_a.invalidate("/api/blog/posts")
+        gone = await ResponseCache(shared=tier).get("/api/blog/posts?")
+        return entry, shared, gone, worker_b.stats()
+
+    entry, shared, gone, stats = asyncio.run(scenario())
+    assert shared == entry
+    assert gone is None
+    assert stats["shared_hits"] == 1
+
+
+def test_lru_evicts_oldest_and_skips_stale_fills():
+    async def scenario():
+        cache = ResponseCache(max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")
+        await cache.set("c", 3)
+        generation = cache.generation
+        await cache.invalidate("zzz")
+        await cache.set("d", 4, generation)
+        return [await cache.get(key) is not None for key in "abcd"]
+
+    assert asyncio.run(scenario()) == [True, False, True, False]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import server
+
+
+def create_post(api, **fields):
+    body = {"title": "Scheduled", "content": "c", "excerpt": "e", "tags": ["launch"], **fields}
+    return api.post("/api/blog/posts", json=body).json()
+
+
+def listed(api):
+    return [p["id"] for p in api.get("/api/blog/posts").json()["posts"]]
+
+
+def launch_count(api):
+    return {t["tag"]: t["count"] for t in api.get("/api/blog/tags").json()["tags"]}.get("launch", 0)
+
+
+def test_draft_is_hidden_until_published(api):
+    draft = create_post(api, draft=True)
+    assert draft["published"] is False and draft["publish_at"] is None
+    assert listed(api) == [] and launch_count(api) == 0
+    assert api.get(f"/api/blog/posts/{draft['id']}").status_code == 404
+    assert api.get(f"/api/blog/posts/{draft['id']}", params={"preview": True}).json()["id"] == draft["id"]
+    assert api.post(f"/api/blog/posts/{draft['id']}/comments",
+                    json={"post_id": draft["id"], "author_name": "r", "content": "hi"}).status_code == 404
+    # The scheduler never picks up a draft
+    assert api.portal.call(server.publish_scheduler.publish_due, datetime.utcnow() + timedelta(days=365)) == 0
+
+    published = api.post(f"/api/blog/posts/{draft['id']}/publish").json()
+    assert published["published"] is True
+    assert listed(api) == [draft["id"]] and launch_count(api) == 1
+    assert api.post(f"/api/blog/posts/{draft['id']}/publish").status_code == 409
+    assert api.post("/api/blog/posts/missing/publish").status_code == 404
+
+
+def test_scheduled_post_published_when_due(api):
+    api.portal.call(asyncio.wait_for, server.search_service.ready.wait(), 5)
+    publish_at = datetime.utcnow() + timedelta(hours=1)
+    scheduled = create_post(api, title="Quarterly roadmap", publish_at=publish_at.isoformat())
+    now_post = create_post(api)
+    assert scheduled["published"] is False and now_post["published"] is True
+    # Cached before the scheduled post goes out
+    assert listed(api) == [now_post["id"]] and launch_count(api) == 1
+    assert api.portal.call(server.publish_scheduler.publish_due) == 0
+
+    assert api.portal.call(server.publish_scheduler.publish_due, publish_at + timedelta(seconds=1)) == 1
+    assert api.portal.call(server.publish_scheduler.publish_due, publish_at + timedelta(seconds=1)) == 0
+    # Listed in publication order, counted and searchable
+    assert listed(api) == [scheduled["id"], now_post["id"]]
+    assert launch_count(api) == 2
+    assert api.get("/api/blog/search", params={"q": "roadmap"}).json()["total"] == 1
+
+
+def test_publish_endpoint_schedules_and_reschedules(api):
+    post = create_post(api, draft=True)
+    later = datetime.utcnow() + timedelta(days=1)
+    scheduled = api.post(f"/api/blog/posts/{post['id']}/publish", json={"publish_at": later.isoformat()}).json()
+    assert scheduled["published"] is False
+    assert api.portal.call(server.publish_scheduler.publish_due) == 0
+    assert listed(api) == []
+
+    # Publishing early replaces the scheduled time
+    assert api.post(f"/api/blog/posts/{post['id']}/publish").json()["published"] is True
+    detail = api.get(f"/api/blog/posts/{post['id']}").json()
+    assert datetime.fromisoformat(detail["publish_at"]) < later
+    assert api.portal.call(server.publish_scheduler.publish_due, later + timedelta(seconds=1)) == 0
@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+from search import InvertedIndex, POST_FIELD_WEIGHTS, SearchService, highlight, tokenize
+
+import server
+
+
+def wait_until_ready(api):
+    api.portal.call(asyncio.wait_for, server.search_service.ready.wait(), 5)
+
+
+def test_ranking_prefers_title_matches_and_requires_all_terms():
+    index = InvertedIndex(POST_FIELD_WEIGHTS, ["id", "tags"], facet_field="tags")
+    index.add({"id": "body", "title": "Notes", "content": "responsive design systems", "tags": []})
+    index.add({"id": "title", "title": "Responsive design", "content": "notes", "tags": ["ux"]})
+    index.add({"id": "partial", "title": "Responsive", "content": "", "tags": []})
+
+    total, page, facets = index.search("responsive design")
+    assert total == 2
+    assert [doc["id"] for _, doc in page] == ["title", "body"]
+    assert facets == {"ux": 1}
+
+    # Single-term results come from the per-term cache, which writes invalidate
+    assert index.search("design")[2] == {"ux": 1}
+    assert index.search("design", tags=["ux"])[0] == 1
+    index.add({"id": "title", "title": "Renamed", "content": "", "tags": []})
+    assert index.search("design")[2] == {}
+    assert index.search("responsive design")[0] == 1
+    assert index.search("missingterm")[0] == 0
+
+
+def test_highlight_escapes_and_marks():
+    snippet = highlight("Use <b>Design</b> tokens for design systems", tokenize("design"))
+    assert snippet == "Use &lt;b&gt;<mark>Design</mark>&lt;/b&gt; tokens for <mark>design</mark> systems"
+
+
+def test_search_endpoint_indexes_new_posts_and_comments(api):
+    wait_until_ready(api)
+    post_id = api.post("/api/blog/posts", json={
+        "title": "Typography for dashboards", "excerpt": "Picking fonts", "tags": ["design", "ux"],
+        "content": "Good typography makes dense dashboards readable.",
+    }).json()["id"]
+    api.post("/api/blog/posts", json={"title": "Hiring", "excerpt": "e", "content": "c", "tags": ["team"]})
+
+    found = api.get("/api/blog/search", params={"q": "typography dashboards"}).json()
+    assert found["total"] == 1
+    assert found["results"][0]["id"] == post_id
+    assert "<mark>typography</mark>" in found["results"][0]["snippet"].lower()
+    assert found["facets"]["tags"] == {"design": 1, "ux": 1}
+    assert api.get("/api/blog/search", params={"q": "typography", "tags": "team"}).json()["total"] == 0
+
+    api.post(f"/api/blog/posts/{post_id}/comments",
+             json={"post_id": post_id, "author_name": "Ann", "content": "Which typeface did you use?"})
+    comments = api.get("/api/blog/search", params={"q": "typeface", "type": "comments"}).json()
+    assert comments["results"][0]["post_id"] == post_id
+
+
+def test_sync_picks_up_posts_from_other_workers(api):
+    wait_until_ready(api)
+    api.portal.call(server.blog_posts_collection.insert_one, {
+        "id": "external", "title": "Written elsewhere", "content": "", "excerpt": "", "tags": [],
+        "published": True, "created_at": datetime(2030, 1, 1), "updated_at": datetime(2030, 1, 1),
+    })
+    api.portal.call(server.search_service.sync)
+    assert api.get("/api/blog/search", params={"q": "elsewhere"}).json()["total"] == 1
+
+
+def test_sync_catches_writes_that_commit_late():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        base = {"title": "Late", "content": "", "excerpt": "", "tags": [], "published": True}
+        await db.blog_posts.insert_one(dict(base, id="a", title="Prompt arrival",
+                                            updated_at=datetime(2024, 1, 1, 0, 0, 5)))
+        service = SearchService(db.blog_posts, db.comments, sync_overlap=10)
+        await service.sync()
+        # Stamped before "a" but committed after the sync saw "a"
+        await db.blog_posts.insert_one(dict(base, id="b", title="Delayed arrival", updated_at=datetime(2024, 1, 1)))
+        await service.sync()
+        indexed = service.posts._next_num
+        await service.sync()
+        return service.posts.search("arrival")[0], indexed, service.posts._next_num
+
+    total, indexed, after = asyncio.run(scenario())
+    assert total == 2
+    # The overlap is re-read, but versions already indexed are skipped
+    assert indexed == after == 2
+
+def test_sync_picks_up_moderation_of_older_comments():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        await db.comments.insert_one({"id": "c", "post_id": "p", "author_name": "a", "content": "held reply",
+                                      "created_at": datetime(2024, 1, 1), "approved": False})
+        service = SearchService(db.blog_posts, db.comments)
+        await service.sync()
+        before = len(service.comments)
+        await db.comments.update_one({"id": "c"}, {"$set": {"approved": True, "moderated_at": datetime.utcnow()}})
+        await service.sync()
+        return before, len(service.comments)
+
+    assert asyncio.run(scenario()) == (0, 1)
@@ -0,0 +1,75 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, **extra_env):
+    env = dict(os.environ, SERVER_HOST="127.0.0.1", SERVER_PORT=str(port), SERVER_WORKERS="2",
+               SERVER_GRACEFUL_TIMEOUT="2", MONGO_URL="mongodb://127.0.0.1:1/",
+               MONGO_SERVER_SELECTION_TIMEOUT_MS="100", COMMENT_RECONCILE_INTERVAL="0", PASSWORD_HASH_WORKERS="1",
+               **extra_env)
+    process = subprocess.Popen([sys.executable, os.path.join(BACKEND_DIR, "serve.py")], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            response = httpx.get(f"http://127.0.0.1:{port}/api/testimonials", timeout=1)
+            return process, response
+        except httpx.TransportError:
+            assert time.monotonic() < deadline, "server did not start"
+            time.sleep(0.2)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="preforking needs os.fork")
+def test_workers_serve_one_socket_and_drain_on_sigterm():
+    port = free_port()
+    process, response = start_server(port)
+    try:
+        assert response.status_code == 200
+        assert all(httpx.get(f"http://127.0.0.1:{port}/api/testimonials").status_code == 200 for _ in range(10))
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+
+    assert process.returncode == 0
+    assert output.count("Application startup complete") == 2
+    # Each worker ran its own lifespan, including the client close, after the drain
+    assert output.count("MongoDB client closed") == 2
+    assert "All workers stopped" in output
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="preforking needs os.fork")
+def test_catalog_reload_reaches_every_worker(tmp_path):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"projects": [], "testimonials": [{"id": 1}]}))
+    port = free_port()
+    process, _ = start_server(port, CATALOG_PATH=str(path))
+    try:
+        path.write_text(json.dumps({"projects": [], "testimonials": [{"id": 1}, {"id": 2}]}))
+        os.utime(path, (time.time() + 5, time.time() + 5))
+        assert httpx.post(f"http://127.0.0.1:{port}/api/catalog/reload").json()["reloaded"] is True
+        time.sleep(1)
+        # A fresh connection per request, so the kernel spreads them over both workers
+        counts = {len(httpx.get(f"http://127.0.0.1:{port}/api/testimonials").json()["testimonials"])
+                  for _ in range(20)}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+
+    assert counts == {2}
+    assert output.count("Catalog loaded: 0 projects") == 4
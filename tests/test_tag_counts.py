@@ -0,0 +1,59 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from migrations import apply_migrations
+from tag_counts import parse_tags, rebuild, tags_query
+
+
+def create_post(api, title, tags):
+    return api.post("/api/blog/posts", json={"title": title, "content": "c", "excerpt": "e", "tags": tags}).json()["id"]
+
+
+def test_tag_filter_and_counts(api):
+    python = create_post(api, "one", ["python", "web"])
+    create_post(api, "two", ["web"])
+    both = create_post(api, "three", ["python", "web", "python"])
+
+    listed = api.get("/api/blog/posts", params={"tags": "python"}).json()
+    assert [p["id"] for p in listed["posts"]] == [both, python]
+    assert listed["total"] == 2
+    assert api.get("/api/blog/posts", params={"tags": "python, web"}).json()["total"] == 2
+    assert api.get("/api/blog/posts", params={"tags": "missing"}).json()["posts"] == []
+
+    assert api.get("/api/blog/tags").json()["tags"] == [{"tag": "web", "count": 3}, {"tag": "python", "count": 2}]
+    # Cached totals and tag counts both pick up new posts
+    create_post(api, "four", ["python"])
+    assert api.get("/api/blog/posts", params={"tags": "python"}).json()["total"] == 3
+    assert api.get("/api/blog/tags", params={"limit": 1}).json()["tags"] == [{"tag": "python", "count": 3}]
+
+    items = [{"title": "bulk", "content": "c", "excerpt": "e", "tags": ["rust"]}] * 2
+    assert api.post("/api/blog/posts/bulk", json=items).json()["inserted"] == 2
+    assert {"tag": "rust", "count": 2} in api.get("/api/blog/tags").json()["tags"]
+
+
+def test_rebuild_and_backfill_migration():
+    async def scenario():
+        db = AsyncMongoMockClient().test
+        await db.blog_posts.insert_many([
+            {"id": "a", "tags": ["python", "python"], "published": True},
+            {"id": "b", "tags": ["python", "draft"], "published": False},
+            {"id": "c", "tags": [], "published": True},
+        ])
+        await db.blog_tags.insert_one({"tag": "stale", "post_count": 1, "published_count": 1})
+        await apply_migrations(db)
+        first = {doc["tag"]: doc async for doc in db.blog_tags.find({}, {"_id": 0})}
+        assert await rebuild(db.blog_posts, db.blog_tags) == 2
+        return first
+
+    counts = asyncio.run(scenario())
+    assert counts == {
+        "python": {"tag": "python", "post_count": 2, "published_count": 1},
+        "draft": {"tag": "draft", "post_count": 1, "published_count": 0},
+    }
+
+
+def test_parse_tags():
+    assert parse_tags(" a, b,,a ") == ["a", "b"]
+    assert tags_query(parse_tags(None)) == {}
+    assert tags_query(["a", "b"]) == {"tags": {"$all": ["a", "b"]}}
@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+
+import server
+from view_counter import ViewCounter
+
+
+def test_flush_batches_increments():
+    async def scenario():
+        collection = AsyncMongoMockClient().test.blog_posts
+        await collection.insert_many([{"id": "a", "views": 0}, {"id": "b", "views": 5}])
+        counter = ViewCounter(collection, flush_interval=3600)
+        for _ in range(3):
+            counter.increment("a")
+        counter.increment("b")
+        assert counter.pending("a") == 3
+        assert await counter.flush() == 2
+        assert counter.pending("a") == 0
+        return [doc["views"] async for doc in collection.find({}).sort("id", 1)]
+
+    assert asyncio.run(scenario()) == [3, 6]
+
+
+def test_concurrent_reads_produce_exact_counts(monkeypatch):
+    monkeypatch.setattr(server, "AsyncIOMotorClient", AsyncMongoMockClient)
+    monkeypatch.setattr(server, "VIEW_FLUSH_THRESHOLD", 50)
+    reads = {"p1": 300, "p2": 120, "p3": 7}
+
+    async def scenario():
+        async with server.app.router.lifespan_context(server.app):
+            collection = server.blog_posts_collection
+            await collection.insert_many([{"id": post_id, "title": post_id, "published": True, "views": 0}
+                                          for post_id in reads])
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                requests = [client.get(f"/api/blog/posts/{post_id}") for post_id, n in reads.items() for _ in range(n)]
+                responses = await asyncio.gather(*requests)
+            assert all(response.status_code == 200 for response in responses)
+        # Shutdown flushed whatever the threshold/timer had not
+        return {doc["id"]: doc["views"] async for doc in collection.find({})}
+
+    assert asyncio.run(scenario()) == reads
+
+
+class PartlyFailingCollection:
+    """Applies every $inc except the one for ``failing``, like an unordered bulk_write with one bad document"""
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.views = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        errors = []
+        for index, operation in enumerate(operations):
+            post_id = operation._filter["id"]
+            if post_id == self.failing:
+                errors.append({"index": index, "code": 14, "errmsg": "Cannot apply $inc to a value of non-numeric type"})
+            else:
+                self.views[post_id] = self.views.get(post_id, 0) + operation._doc["$inc"]["views"]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nModified": len(operations) - len(errors)})
+
+
+def test_partial_flush_failure_retries_only_failed_posts():
+    async def scenario():
+        collection = PartlyFailingCollection(failing="b")
+        counter = ViewCounter(collection, flush_interval=3600)
+        for post_id in ("a", "b", "c"):
+            counter.increment(post_id, 2)
+        with pytest.raises(BulkWriteError):
+            await counter.flush()
+        pending = {post_id: counter.pending(post_id) for post_id in ("a", "b", "c")}
+        collection.failing = None
+        await counter.flush()
+        return pending, collection.views
+
+    pending, views = asyncio.run(scenario())
+    # "a" and "c" were written by the first flush; only "b" waits for the next one
+    assert pending == {"a": 0, "b": 2, "c": 0}
+    assert views == {"a": 2, "b": 2, "c": 2}